@@ -7,247 +7,132 @@ Comprehensive script to automatically detect and fix Xcode project errors:
 2. Duplicate path prefixes
 3. Incorrect file paths
 4. Orphaned references (references to deleted files)
+5. Broken object references (dangling IDs, wrong isas, duplicate memberships)
+
+    python3 fix_all_project_errors.py                    # check and fix
+    python3 fix_all_project_errors.py --plan fixes.json  # check only, write a plan
+    python3 fix_all_project_errors.py --apply fixes.json # write a reviewed plan
 """
 
-import re
+import argparse
 import sys
-import os
 from pathlib import Path
-from datetime import datetime
 from collections import defaultdict
 
+from pbxtool import PathResolver, checks, load_project
+from pbxtool.backup import backup_project
+from pbxtool.plan import apply_plan, describe, make_plan, read_plan, write_plan
+from pbxtool.snapshot import snapshot
+from pbxtool.validate import validate
+
 PROJECT_DIR = Path("/Users/tobiadegoroye/Developer/SwiftUI/Triply")
 PROJECT_FILE = PROJECT_DIR / "Triply.xcodeproj/project.pbxproj"
 
 
 def create_backup():
-    """Create a backup of the project file."""
-    backup_file = PROJECT_FILE.with_suffix(f".backup.{datetime.now().strftime('%Y%m%d_%H%M%S')}")
-    backup_file.write_bytes(PROJECT_FILE.read_bytes())
-    return backup_file
+    """Back up the project file into the delta store and return the entry."""
+    return backup_project(PROJECT_FILE, label='fix_all_project_errors')
 
 
-def find_groups_with_paths(project_content):
+def find_groups_with_paths(project):
     """Find all groups that have path properties."""
-    groups = {}
-    lines = project_content.split('\n')
-    current_group_id = None
-    in_group = False
-    brace_count = 0
-    is_pbx_group = False
-    
-    for i, line in enumerate(lines):
-        group_match = re.match(r'^\s+([A-F0-9]{24})\s+/\*[^*]+\*/\s*=\s*\{', line)
-        if group_match:
-            current_group_id = group_match.group(1)
-            in_group = True
-            brace_count = 1
-            is_pbx_group = False
-            continue
-        
-        if in_group:
-            brace_count += line.count('{') - line.count('}')
-            
-            if 'isa = PBXGroup;' in line:
-                is_pbx_group = True
-            
-            path_match = re.search(r'path\s*=\s*([^;]+);', line)
-            if path_match and is_pbx_group:
-                path_value = path_match.group(1).strip().strip('"').strip()
-                if path_value and path_value != '.':
-                    groups[current_group_id] = path_value
-            
-            if brace_count == 0:
-                in_group = False
-                current_group_id = None
-                is_pbx_group = False
-    
-    return groups
+    return checks.groups_with_paths(project)
 
 
-def find_all_file_references(project_content):
+def find_all_file_references(project):
     """Find all file references and their paths."""
-    file_refs = []
-    
-    pattern = re.compile(
-        r'^\s+([A-F0-9]{24})\s+/\*[^*]+\*/\s*=\s*\{.*?isa\s*=\s*PBXFileReference.*?path\s*=\s*"([^"]+)";',
-        re.MULTILINE | re.DOTALL
-    )
-    
-    for match in pattern.finditer(project_content):
-        ref_id = match.group(1)
-        file_path = match.group(2)
-        file_refs.append({
-            'id': ref_id,
-            'path': file_path
-        })
-    
-    return file_refs
+    return [
+        {
+            'id': ref.id,
+            'path': ref.path,
+            'source_tree': ref.source_tree,
+        }
+        for ref in project.file_references
+        if ref.path
+    ]
 
 
-def find_build_file_references(project_content):
+def find_build_file_references(project):
     """Find all PBXBuildFile references to file references."""
-    build_files = {}
-    
-    pattern = re.compile(
-        r'^\s+([A-F0-9]{24})\s+/\*[^*]+\*/\s+in\s+Sources\s*=\s*\{.*?fileRef\s*=\s*([A-F0-9]{24})\s+/\*[^*]+\*/\s*;',
-        re.MULTILINE | re.DOTALL
-    )
-    
-    for match in pattern.finditer(project_content):
-        build_id = match.group(1)
-        file_ref_id = match.group(2)
-        build_files[file_ref_id] = build_id
-    
-    return build_files
+    return {
+        build_file.file_ref: build_file.id
+        for build_file in project.build_files
+        if build_file.file_ref
+    }
 
 
-def check_missing_files(file_refs, groups_with_paths):
+def check_missing_files(file_refs, resolver):
     """Check which file references point to non-existent files."""
-    missing = []
-    existing = []
-    
-    for ref in file_refs:
-        file_path = ref['path']
-        
-        # Skip special paths
-        if any(skip in file_path for skip in ['.xcassets', '.entitlements', '.storekit', '.app']):
-            continue
-        
-        # Try direct path first
-        full_path = PROJECT_DIR / file_path
-        
-        # If not found, try with group paths (for nested groups)
-        if not full_path.exists():
-            # Check if path might be relative to a group with path property
-            for group_path in groups_with_paths.values():
-                potential_path = PROJECT_DIR / group_path / file_path
-                if potential_path.exists():
-                    full_path = potential_path
-                    break
-        
-        if full_path.exists():
-            existing.append(ref)
-        else:
-            missing.append(ref)
-    
-    return missing, existing
+    refs_by_id = {ref['id']: ref for ref in file_refs}
+    missing, existing = checks.missing_files(resolver.project, resolver, snapshot(PROJECT_DIR))
+    return (
+        [refs_by_id[ref.id] for ref in missing],
+        [refs_by_id[ref.id] for ref in existing],
+    )
 
 
-def fix_duplicate_paths(project_content, groups_with_paths, file_refs):
-    """Fix duplicate path prefixes."""
-    fixes = []
-    new_content = project_content
-    
-    for file_ref in file_refs:
-        file_path = file_ref['path']
-        
-        for group_id, group_path in groups_with_paths.items():
-            if file_path.startswith(f"{group_path}/"):
-                new_path = file_path[len(group_path) + 1:]
-                old_pattern = f'path = "{file_path}";'
-                new_pattern = f'path = "{new_path}";'
-                
-                if old_pattern in new_content:
-                    new_content = new_content.replace(old_pattern, new_pattern)
-                    fixes.append({
-                        'old': file_path,
-                        'new': new_path,
-                        'type': 'duplicate_path'
-                    })
-                    break
-    
-    return new_content, fixes
+def fix_duplicate_paths(transaction, resolver):
+    """Queue stripping of group folders repeated in file paths, as one batch."""
+    fixes = checks.duplicate_paths(resolver.project, resolver, snapshot(PROJECT_DIR))
+    for fix in fixes:
+        transaction.set_value(fix['id'], 'path', fix['new'])
+    return [{**fix, 'type': 'duplicate_path'} for fix in fixes]
 
 
-def remove_missing_file_references(project_content, missing_refs, build_files):
-    """Remove references to missing files from the project."""
-    fixes = []
-    new_content = project_content
-    
-    for ref in missing_refs:
-        ref_id = ref['id']
-        file_path = ref['path']
-        
-        # Remove PBXFileReference
-        ref_pattern = re.compile(
-            rf'^\s+{re.escape(ref_id)}\s+/\*[^*]+\*/\s*=\s*\{{.*?\}};',
-            re.MULTILINE | re.DOTALL
-        )
-        if ref_pattern.search(new_content):
-            new_content = ref_pattern.sub('', new_content)
-            fixes.append({
-                'file': file_path,
-                'type': 'removed_missing'
-            })
-        
-        # Remove PBXBuildFile if exists
-        if ref_id in build_files:
-            build_id = build_files[ref_id]
-            # Escape braces properly in regex
-            escaped_build_id = re.escape(build_id)
-            build_pattern = re.compile(
-                rf'^\s+{escaped_build_id}\s+/\*[^*]+\*/\s+in\s+Sources\s*=\s*\{{[^}}]+\}};',
-                re.MULTILINE | re.DOTALL
-            )
-            if build_pattern.search(new_content):
-                new_content = build_pattern.sub('', new_content)
-        
-        # Remove from group children lists
-        children_pattern = re.compile(
-            rf'(\s+{re.escape(ref_id)}\s+/\*[^*]+\*/\s*[,)])',
-            re.MULTILINE
-        )
-        new_content = children_pattern.sub('', new_content)
-    
-    # Clean up empty lines
-    new_content = re.sub(r'\n\s*\n\s*\n', '\n\n', new_content)
-    
-    return new_content, fixes
+def remove_missing_file_references(transaction, missing_refs):
+    """Queue removal of references to missing files, their build files and
+    any group the removal leaves empty, as one batch."""
+    transaction.remove_many([ref['id'] for ref in missing_refs], prune_empty_groups=True)
+    return [{'file': ref['path'], 'type': 'removed_missing'} for ref in missing_refs]
+
+
+def check_references(project):
+    """Find dangling IDs, wrong isas and duplicate memberships in the graph."""
+    return list(validate(project))
 
 
-def find_orphaned_files():
+def find_orphaned_files(resolver):
     """Find Swift files that exist but aren't in the project."""
-    orphaned = []
-    
-    # Directories to check
-    dirs_to_check = ['Views', 'Managers', 'Models', 'Extensions', 'Components', 'Widgets', 'Intents']
-    
-    for dir_name in dirs_to_check:
-        dir_path = PROJECT_DIR / dir_name
-        if not dir_path.exists():
-            continue
-        
-        for swift_file in dir_path.rglob('*.swift'):
-            rel_path = str(swift_file.relative_to(PROJECT_DIR))
-            
-            # Check if file is referenced in project
-            project_content = PROJECT_FILE.read_text()
-            if f'path = "{rel_path}"' not in project_content:
-                orphaned.append(rel_path)
-    
-    return orphaned
+    return checks.orphaned_files(resolver.project, resolver, snapshot(PROJECT_DIR))
 
 
-def main():
+def main(argv=None):
     """Main function."""
+    parser = argparse.ArgumentParser(description="Detect and fix Xcode project errors.")
+    parser.add_argument('--plan', metavar='FILE',
+                        help="write every finding and change to FILE as JSON instead of fixing")
+    parser.add_argument('--apply', metavar='FILE',
+                        help="write the changes of a plan made with --plan, without re-checking")
+    args = parser.parse_args(argv)
+    
+    # Read project file
+    project = load_project(PROJECT_FILE)
+    
+    if args.apply:
+        print(f"🔧 Applying {args.apply}...")
+        plan = read_plan(args.apply)
+        backup = apply_plan(project, plan)
+        if backup is None:
+            print("✅ Nothing to change; project file left as is.")
+        else:
+            print(f"✅ Applied {describe(plan)}")
+            print(f"📝 Backup saved as {backup['id']} (restore with: python3 -m pbxtool.backup restore {PROJECT_FILE.parent} {backup['id']})")
+        return
+    
     print("🔧 Fixing all Xcode project errors...")
     print("=" * 60)
     print()
     
-    # Create backup
-    backup_file = create_backup()
-    print(f"✅ Backup created: {backup_file.name}")
-    print()
-    
-    # Read project file
-    project_content = PROJECT_FILE.read_text()
+    resolver = PathResolver(project, PROJECT_DIR)
+    # Every fix is queued here and written in one go at the end
+    transaction = project.transaction()
+    more = "(full list: --plan FILE)"
     
     # Step 1: Find groups with paths
     print("📋 Step 1: Analyzing project structure...")
-    groups_with_paths = find_groups_with_paths(project_content)
-    file_refs = find_all_file_references(project_content)
-    build_files = find_build_file_references(project_content)
+    groups_with_paths = find_groups_with_paths(project)
+    file_refs = find_all_file_references(project)
+    build_files = find_build_file_references(project)
     
     print(f"   Found {len(groups_with_paths)} group(s) with path properties")
     print(f"   Found {len(file_refs)} file reference(s)")
@@ -256,51 +141,49 @@ def main():
     
     all_fixes = []
     
-    # Step 2: Check for missing files
-    print("🔍 Step 2: Checking for missing files...")
-    missing_refs, existing_refs = check_missing_files(file_refs, groups_with_paths)
+    # Step 2: Fix duplicate paths (first, so repaired references don't count as missing)
+    print("🔍 Step 2: Checking for duplicate path prefixes...")
+    duplicates = fix_duplicate_paths(transaction, resolver)
+    repaired = {fix['id'] for fix in duplicates}
+    
+    if duplicates:
+        print(f"   ⚠️  Found {len(duplicates)} duplicate path(s):")
+        for fix in duplicates:
+            print(f"      • {fix['old']} → {fix['new']}")
+        all_fixes.extend(duplicates)
+    else:
+        print("   ✅ No duplicate paths found")
+    print()
+    
+    # Step 3: Check for missing files
+    print("🔍 Step 3: Checking for missing files...")
+    missing_refs, existing_refs = check_missing_files(file_refs, resolver)
+    missing_refs = [ref for ref in missing_refs if ref['id'] not in repaired]
     
     if missing_refs:
         print(f"   ⚠️  Found {len(missing_refs)} missing file(s):")
         for ref in missing_refs[:10]:  # Show first 10
             print(f"      • {ref['path']}")
         if len(missing_refs) > 10:
-            print(f"      ... and {len(missing_refs) - 10} more")
-        print()
+            print(f"      ... and {len(missing_refs) - 10} more {more}")
         
         # Remove missing file references
-        print("   🗑️  Removing missing file references...")
-        project_content, fixes = remove_missing_file_references(project_content, missing_refs, build_files)
+        fixes = remove_missing_file_references(transaction, missing_refs)
         all_fixes.extend(fixes)
-        print(f"   ✅ Removed {len(fixes)} missing file reference(s)")
     else:
         print("   ✅ No missing files found")
     print()
     
-    # Step 3: Fix duplicate paths
-    print("🔍 Step 3: Checking for duplicate path prefixes...")
-    project_content, fixes = fix_duplicate_paths(project_content, groups_with_paths, file_refs)
-    
-    if fixes:
-        print(f"   ⚠️  Found {len(fixes)} duplicate path(s):")
-        for fix in fixes:
-            print(f"      • {fix['old']} → {fix['new']}")
-        all_fixes.extend(fixes)
-        print(f"   ✅ Fixed {len(fixes)} duplicate path(s)")
-    else:
-        print("   ✅ No duplicate paths found")
-    print()
-    
     # Step 4: Find orphaned files (files not in project)
     print("🔍 Step 4: Checking for orphaned files...")
-    orphaned = find_orphaned_files()
+    orphaned = find_orphaned_files(resolver)
     
     if orphaned:
         print(f"   ⚠️  Found {len(orphaned)} file(s) not in project:")
         for file_path in orphaned[:10]:  # Show first 10
             print(f"      • {file_path}")
         if len(orphaned) > 10:
-            print(f"      ... and {len(orphaned) - 10} more")
+            print(f"      ... and {len(orphaned) - 10} more {more}")
         print()
         print("   💡 These files exist but aren't referenced in the project.")
         print("      Add them manually in Xcode if needed.")
@@ -308,12 +191,40 @@ def main():
         print("   ✅ No orphaned files found")
     print()
     
+    # Step 5: Check that every reference points at a valid object
+    print("🔍 Step 5: Checking object references...")
+    # Planning applies the fixes in memory; nothing is written yet
+    plan = make_plan(transaction, 'fix_all_project_errors')
+    findings = check_references(project)
+    plan['report'] = {
+        'duplicate_paths': duplicates,
+        'missing_files': missing_refs,
+        'orphaned_files': orphaned,
+        'integrity': findings,
+    }
+    
+    if findings:
+        print(f"   ⚠️  Found {len(findings)} integrity problem(s):")
+        for item in findings[:10]:  # Show first 10
+            print(f"      • [{item['code']}] {item['message']}")
+        if len(findings) > 10:
+            print(f"      ... and {len(findings) - 10} more {more}")
+    else:
+        print("   ✅ All references point at valid objects")
+    print()
+    
     # Summary
     print("=" * 60)
     print("📊 Summary:")
     print("=" * 60)
     
-    if all_fixes:
+    if args.plan:
+        write_plan(plan, args.plan)
+        print(f"📝 Plan written to {args.plan}: {describe(plan)}")
+        print(f"💡 Review it, then write it with: python3 fix_all_project_errors.py --apply {args.plan}")
+        return
+    
+    if all_fixes and project.modified:
         print(f"✅ Fixed {len(all_fixes)} issue(s):")
         fixes_by_type = defaultdict(int)
         for fix in all_fixes:
@@ -323,15 +234,16 @@ def main():
             type_name = fix_type.replace('_', ' ').title()
             print(f"   • {type_name}: {count}")
         
-        # Write fixed content
-        PROJECT_FILE.write_text(project_content)
+        # Back up only now that there is something to write
+        backup = create_backup()
+        project.save()
         print()
         print("✅ Project file updated!")
+        print()
+        print(f"📝 Backup saved as {backup['id']} (restore with: python3 -m pbxtool.backup restore {PROJECT_FILE.parent} {backup['id']})")
     else:
         print("✅ No issues found! Project file is clean.")
     
-    print()
-    print(f"📝 Backup saved at: {backup_file}")
     print()
     print("💡 Next steps:")
     print("   1. Clean build folder in Xcode (⌘⇧K)")
@@ -4,6 +4,7 @@
 fix_duplicate_paths.py
 Automatically fixes duplicate path prefixes in Xcode project file.
 When a group has a path property, its children should NOT include that path in their paths.
+Only the folders of a reference's own group (and its ancestors) count.
 
 Example:
 - Group has: path = Libraries;
@@ -11,97 +12,42 @@ Example:
 - Should be: path = "CurrencyPicker/CurrencyAdapter.swift";
 """
 
-import re
+import argparse
 import sys
 from pathlib import Path
-from datetime import datetime
+
+from pbxtool import PathResolver, checks, load_project
+from pbxtool.backup import backup_project
+from pbxtool.plan import apply_plan, describe, make_plan, read_plan, write_plan
+from pbxtool.snapshot import snapshot
 
 PROJECT_DIR = Path("/Users/tobiadegoroye/Developer/SwiftUI/Triply")
 PROJECT_FILE = PROJECT_DIR / "Triply.xcodeproj/project.pbxproj"
 
 
-def find_groups_with_paths(project_content):
+def find_groups_with_paths(project):
     """Find all groups that have path properties."""
-    groups = {}
-    
-    # Find all group definitions by looking for PBXGroup with path property
-    # Pattern: ID /* name */ = { ... isa = PBXGroup; ... path = value; ... }
-    lines = project_content.split('\n')
-    current_group_id = None
-    in_group = False
-    brace_count = 0
-    is_pbx_group = False
-    group_start_line = 0
-    
-    for i, line in enumerate(lines):
-        # Check for group start: ID /* name */ = {
-        group_match = re.match(r'^\s+([A-F0-9]{24})\s+/\*[^*]+\*/\s*=\s*\{', line)
-        if group_match:
-            current_group_id = group_match.group(1)
-            in_group = True
-            brace_count = 1
-            is_pbx_group = False
-            group_start_line = i
-            continue
-        
-        if in_group:
-            # Count braces
-            brace_count += line.count('{') - line.count('}')
-            
-            # Check if it's a PBXGroup
-            if 'isa = PBXGroup;' in line:
-                is_pbx_group = True
-            
-            # Check for path property
-            path_match = re.search(r'path\s*=\s*([^;]+);', line)
-            if path_match and is_pbx_group and current_group_id:
-                path_value = path_match.group(1).strip().strip('"').strip()
-                if path_value and path_value != '.':
-                    groups[current_group_id] = path_value
-            
-            # Group ended
-            if brace_count == 0:
-                in_group = False
-                current_group_id = None
-                is_pbx_group = False
-    
-    return groups
-
-
+    return checks.groups_with_paths(project)
 
 
-def find_all_file_references(project_content):
+def find_all_file_references(project):
     """Find all file references and their paths."""
-    file_refs = []
-    
-    # Use regex to find all PBXFileReference entries with paths
-    # Pattern: ID /* name */ = { ... isa = PBXFileReference; ... path = "path"; ... }
-    pattern = re.compile(
-        r'^\s+([A-F0-9]{24})\s+/\*[^*]+\*/\s*=\s*\{.*?isa\s*=\s*PBXFileReference.*?path\s*=\s*"([^"]+)";',
-        re.MULTILINE | re.DOTALL
-    )
-    
-    for match in pattern.finditer(project_content):
-        ref_id = match.group(1)
-        file_path = match.group(2)
-        file_refs.append({
-            'id': ref_id,
-            'path': file_path
-        })
-    
-    return file_refs
-
-
-def fix_duplicate_paths(project_content):
-    """Fix all duplicate path prefixes."""
-    fixes = []
-    new_content = project_content
-    
-    # Find all groups with paths
-    groups_with_paths = find_groups_with_paths(project_content)
-    
-    # Find all file references
-    all_file_refs = find_all_file_references(project_content)
+    return [
+        {
+            'id': ref.id,
+            'path': ref.path,
+            'source_tree': ref.source_tree,
+        }
+        for ref in project.file_references
+        if ref.path
+    ]
+
+
+def fix_duplicate_paths(project, transaction):
+    """Queue the fix of every path that repeats its own group's folders."""
+    # Read groups and file references from the parsed graph
+    groups_with_paths = find_groups_with_paths(project)
+    all_file_refs = find_all_file_references(project)
     
     print(f"   Found {len(groups_with_paths)} group(s) with path properties:")
     for group_id, group_path in groups_with_paths.items():
@@ -109,68 +55,67 @@ def fix_duplicate_paths(project_content):
     
     print(f"   Found {len(all_file_refs)} file reference(s)")
     
-    # Check each file reference against all groups with paths
-    for file_ref in all_file_refs:
-        file_path = file_ref['path']
-        
-        # Check against each group path
-        for group_id, group_path in groups_with_paths.items():
-            if file_path.startswith(f"{group_path}/"):
-                # Found duplicate path!
-                new_path = file_path[len(group_path) + 1:]
-                
-                # Replace in content
-                old_pattern = f'path = "{file_path}";'
-                new_pattern = f'path = "{new_path}";'
-                
-                if old_pattern in new_content:
-                    new_content = new_content.replace(old_pattern, new_pattern)
-                    fixes.append({
-                        'old': file_path,
-                        'new': new_path,
-                        'group': group_path
-                    })
-                    break  # Only fix once per file
-    
-    return new_content, fixes
+    # Each reference is only compared with the folders of its own group
+    resolver = PathResolver(project, PROJECT_DIR)
+    fixes = checks.duplicate_paths(project, resolver, snapshot(PROJECT_DIR))
+    for fix in fixes:
+        transaction.set_value(fix['id'], 'path', fix['new'])
+    return fixes
 
 
-def main():
+def main(argv=None):
     """Main function."""
-    print("🔍 Fixing duplicate path prefixes in Xcode project...")
-    print()
+    parser = argparse.ArgumentParser(description="Strip group folders repeated in file paths.")
+    parser.add_argument('--plan', metavar='FILE', help="write the changes to FILE as JSON instead of fixing")
+    parser.add_argument('--apply', metavar='FILE', help="write the changes of a plan made with --plan")
+    args = parser.parse_args(argv)
+    
+    # Read project file (reusing the cached parse when it is unchanged)
+    project = load_project(PROJECT_FILE)
+    
+    if args.apply:
+        plan = read_plan(args.apply)
+        backup = apply_plan(project, plan)
+        if backup is None:
+            print("✅ Nothing to change; project file left as is.")
+        else:
+            print(f"✅ Applied {describe(plan)}")
+            print(f"📝 Backup saved as {backup['id']} (restore with: python3 -m pbxtool.backup restore {PROJECT_FILE.parent} {backup['id']})")
+        return
     
-    # Create backup
-    backup_file = PROJECT_FILE.with_suffix(f".backup.{datetime.now().strftime('%Y%m%d_%H%M%S')}")
-    backup_file.write_bytes(PROJECT_FILE.read_bytes())
-    print(f"✅ Backup created: {backup_file.name}")
+    print("🔍 Fixing duplicate path prefixes in Xcode project...")
     print()
     
-    # Read project file
-    project_content = PROJECT_FILE.read_text()
-    
     # Fix duplicate paths
     print("🔧 Scanning for duplicate paths...")
     print()
-    new_content, fixes = fix_duplicate_paths(project_content)
+    transaction = project.transaction()
+    fixes = fix_duplicate_paths(project, transaction)
     
-    if fixes:
-        print()
-        print(f"✅ Fixed {len(fixes)} duplicate path(s):")
-        for fix in fixes:
-            print(f"   • {fix['old']}")
-            print(f"     → {fix['new']}")
-            print(f"     (Group: {fix['group']})")
-            print()
-        
-        # Write fixed content
-        PROJECT_FILE.write_text(new_content)
-        print("✅ Project file updated!")
-    else:
+    if not fixes:
         print("   ✅ No duplicate paths found!")
+        return
+    
+    print()
+    print(f"{'📋 Would fix' if args.plan else '✅ Fixed'} {len(fixes)} duplicate path(s):")
+    for fix in fixes:
+        print(f"   • {fix['old']}")
+        print(f"     → {fix['new']}")
+        print(f"     (Group: {fix['group']})")
+        print()
+    
+    if args.plan:
+        plan = make_plan(transaction, 'fix_duplicate_paths', report={'duplicate_paths': fixes})
+        write_plan(plan, args.plan)
+        print(f"📝 Plan written to {args.plan}: {describe(plan)}")
+        return
     
+    # Back up, then write every fix in one pass
+    backup = backup_project(PROJECT_FILE, label='fix_duplicate_paths')
+    transaction.commit()
+    print("✅ Project file updated!")
     print()
-    print(f"📝 Backup saved at: {backup_file}")
+    print(f"📝 Backup saved as {backup['id']} (restore with: python3 -m pbxtool.backup restore {PROJECT_FILE.parent} {backup['id']})")
     print()
     print("💡 Tip: Clean build folder (⌘⇧K) and rebuild (⌘B) after running this script.")
 
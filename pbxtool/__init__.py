@@ -0,0 +1,50 @@
+"""
+pbxtool
+Shared parser and object model for Xcode project.pbxproj files, used by the
+fix_* and add_* scripts in this directory and by `python3 -m pbxtool`.
+
+Names are imported from their submodules on first use, so importing the
+package (and starting the CLI) doesn't pay for subsystems a command never
+touches.
+"""
+
+from importlib import import_module
+
+# Bound eagerly: the function shares its name with its module, and a lazy
+# lookup would find the module once something imported it.
+from .snapshot import FileSnapshot, snapshot
+
+EXPORTS = {
+    'BackupStore': 'backup',
+    'backup_project': 'backup',
+    'IDAllocator': 'ids',
+    'stable_id': 'ids',
+    'PBXObject': 'objects',
+    'make_object': 'objects',
+    'PathResolver': 'paths',
+    'ParseError': 'parser',
+    'parse_plist': 'parser',
+    'tokenize': 'parser',
+    'XcodeProject': 'project',
+    'Transaction': 'transaction',
+    'serialize': 'writer',
+    'serialize_incremental': 'writer',
+}
+
+
+def __getattr__(name):
+    module = EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f'.{module}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def load_project(path, use_cache=True):
+    """Parse the project.pbxproj at `path` (or inside the .xcodeproj at `path`)."""
+    from .project import XcodeProject
+    return XcodeProject.load(path, use_cache)
+
+
+__all__ = sorted([*EXPORTS, 'FileSnapshot', 'load_project', 'snapshot'])
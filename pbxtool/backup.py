@@ -0,0 +1,357 @@
+"""
+backup.py
+Content-addressed, delta-compressed backups of project.pbxproj.
+
+Backups live next to the project in `<name>.xcodeproj/.pbxbackups/`:
+
+    objects/ab/ab12...   one blob per distinct file content, named by its sha256
+    index.json           backup entries (id, time, label, content hash)
+
+A blob is either a zlib-compressed full copy (a base) or a line-level delta
+against a base, so a typical backup of a project with a handful of edits
+costs a few hundred bytes instead of a full copy. Identical contents are
+stored once. Deltas always point at a full base, so restoring never walks a
+chain longer than one.
+
+Usage:
+    python3 -m pbxtool.backup list Itinero.xcodeproj
+    python3 -m pbxtool.backup restore Itinero.xcodeproj 20260106_165715
+    python3 -m pbxtool.backup prune Itinero.xcodeproj --keep-last 10 --keep-daily 7
+    python3 -m pbxtool.backup import Itinero.xcodeproj --delete
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import zlib
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from .project import write_file
+
+STORE_DIR = '.pbxbackups'
+FULL = b'F'
+DELTA = b'D'
+
+# Store a new base instead of a delta when the delta is at least this
+# fraction of the compressed full copy.
+REBASE_RATIO = 0.5
+
+DEFAULT_KEEP_LAST = 10
+DEFAULT_KEEP_DAILY = 7
+
+LEGACY_PATTERNS = ('project.backup.*', 'project.pbxproj.backup*')
+
+
+def make_delta(base_lines, target_lines):
+    """Line-level delta turning `base_lines` into `target_lines`.
+
+    Returns a list of ops: ['c', start, count] copies base lines,
+    ['i', text] inserts literal text. Runs in linear time: every target line
+    is looked up once in a hash of base lines and each copy is extended
+    greedily, preferring to continue where the previous copy ended.
+    """
+    first_seen = {}
+    for index, line in enumerate(base_lines):
+        first_seen.setdefault(line, index)
+    ops = []
+    pending = []
+    next_base = -1
+    i = 0
+    total = len(target_lines)
+    base_total = len(base_lines)
+    while i < total:
+        line = target_lines[i]
+        if 0 <= next_base < base_total and base_lines[next_base] == line:
+            start = next_base
+        else:
+            start = first_seen.get(line)
+        if start is None:
+            pending.append(line)
+            i += 1
+            continue
+        if pending:
+            ops.append(['i', ''.join(pending)])
+            pending = []
+        length = 1
+        while (i + length < total and start + length < base_total
+               and base_lines[start + length] == target_lines[i + length]):
+            length += 1
+        if ops and ops[-1][0] == 'c' and ops[-1][1] + ops[-1][2] == start:
+            ops[-1][2] += length
+        else:
+            ops.append(['c', start, length])
+        next_base = start + length
+        i += length
+    if pending:
+        ops.append(['i', ''.join(pending)])
+    return ops
+
+
+def apply_delta(base_lines, ops):
+    """Rebuild the target text from a base and a delta made by make_delta."""
+    pieces = []
+    for op in ops:
+        if op[0] == 'c':
+            pieces.extend(base_lines[op[1]:op[1] + op[2]])
+        else:
+            pieces.append(op[1])
+    return ''.join(pieces)
+
+
+def split_lines(data):
+    # latin-1 maps every byte to one character, so bytes round-trip exactly
+    return data.decode('latin-1').splitlines(keepends=True)
+
+
+class BackupStore:
+    """Backup store for one project.pbxproj."""
+
+    def __init__(self, project_file, root=None):
+        project_file = Path(project_file)
+        if project_file.suffix == '.xcodeproj':
+            project_file = project_file / 'project.pbxproj'
+        self.project_file = project_file
+        self.root = Path(root) if root else project_file.parent / STORE_DIR
+        self.index_file = self.root / 'index.json'
+
+    # Index
+
+    def entries(self):
+        """All backups, oldest first."""
+        if not self.index_file.exists():
+            return []
+        return json.loads(self.index_file.read_text())['backups']
+
+    def save_entries(self, entries):
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_file.with_suffix('.tmp')
+        tmp.write_text(json.dumps({'version': 1, 'backups': entries}, indent=1))
+        os.replace(tmp, self.index_file)
+
+    def find(self, backup_id):
+        for entry in self.entries():
+            if entry['id'] == backup_id:
+                return entry
+        raise KeyError(f"No backup named {backup_id}")
+
+    # Blobs
+
+    def blob_path(self, digest):
+        return self.root / 'objects' / digest[:2] / digest
+
+    def has_blob(self, digest):
+        return self.blob_path(digest).exists()
+
+    def write_blob(self, digest, blob):
+        path = self.blob_path(digest)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix('.tmp')
+        tmp.write_bytes(blob)
+        os.replace(tmp, path)
+
+    def read_blob(self, digest):
+        """Return (kind, base_digest or None, payload) for a stored blob."""
+        blob = self.blob_path(digest).read_bytes()
+        kind = blob[:1]
+        if kind == DELTA:
+            return kind, blob[1:65].decode('ascii'), blob[65:]
+        return kind, None, blob[1:]
+
+    def read(self, digest):
+        """Full file contents for a content hash."""
+        kind, base, payload = self.read_blob(digest)
+        if kind == FULL:
+            data = zlib.decompress(payload)
+        else:
+            base_lines = split_lines(self.read(base))
+            ops = json.loads(zlib.decompress(payload))
+            data = apply_delta(base_lines, ops).encode('latin-1')
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise ValueError(f"Backup object {digest} is corrupt")
+        return data
+
+    def latest_base(self):
+        """Digest of the newest full copy a backup still uses, or None.
+
+        That is the backup itself when it was stored in full, else the base
+        of its delta, which outlives the entry that stored it when a prune
+        drops that entry.
+        """
+        for entry in reversed(self.entries()):
+            digest = entry['hash'] if entry.get('base') is None else entry['base']
+            if self.has_blob(digest):
+                return digest
+        return None
+
+    def store(self, data):
+        """Store `data` (if new) and return (digest, base digest or None)."""
+        digest = hashlib.sha256(data).hexdigest()
+        if self.has_blob(digest):
+            _, base, _ = self.read_blob(digest)
+            return digest, base
+        full = zlib.compress(data, 9)
+        base = self.latest_base()
+        if base is not None:
+            ops = make_delta(split_lines(self.read(base)), split_lines(data))
+            delta = zlib.compress(json.dumps(ops, separators=(',', ':')).encode('latin-1'), 9)
+            if len(delta) < len(full) * REBASE_RATIO:
+                self.write_blob(digest, DELTA + base.encode('ascii') + delta)
+                return digest, base
+        self.write_blob(digest, FULL + full)
+        return digest, None
+
+    # Commands
+
+    def create(self, label=None, data=None, created=None):
+        """Back up the current project file (or `data`) and return the entry."""
+        if data is None:
+            data = self.project_file.read_bytes()
+        created = created or datetime.now()
+        digest, base = self.store(data)
+        entries = self.entries()
+        backup_id = created.strftime('%Y%m%d_%H%M%S')
+        taken = {entry['id'] for entry in entries}
+        suffix = 1
+        unique_id = backup_id
+        while unique_id in taken:
+            suffix += 1
+            unique_id = f'{backup_id}_{suffix}'
+        entry = {
+            'id': unique_id,
+            'created': created.isoformat(timespec='seconds'),
+            'label': label,
+            'hash': digest,
+            'base': base,
+            'size': len(data),
+            'stored': self.blob_path(digest).stat().st_size,
+        }
+        entries.append(entry)
+        entries.sort(key=lambda e: e['created'])
+        self.save_entries(entries)
+        return entry
+
+    def restore(self, backup_id, target=None):
+        """Write a backup back to the project file (or `target`)."""
+        entry = self.find(backup_id)
+        target = Path(target) if target else self.project_file
+        write_file(target, self.read(entry['hash']))
+        return target
+
+    def prune(self, keep_last=DEFAULT_KEEP_LAST, keep_daily=DEFAULT_KEEP_DAILY, now=None):
+        """Apply the retention policy and delete unreferenced blobs.
+
+        Keeps the newest `keep_last` backups plus the newest backup of each
+        of the last `keep_daily` days. Returns the removed entries.
+        """
+        entries = self.entries()
+        now = now or datetime.now()
+        keep = {entry['id'] for entry in entries[-keep_last:]} if keep_last else set()
+        cutoff = (now - timedelta(days=keep_daily)).date()
+        newest_per_day = {}
+        for entry in entries:
+            day = datetime.fromisoformat(entry['created']).date()
+            if day > cutoff:
+                newest_per_day[day] = entry['id']
+        keep.update(newest_per_day.values())
+
+        kept = [entry for entry in entries if entry['id'] in keep]
+        removed = [entry for entry in entries if entry['id'] not in keep]
+        self.save_entries(kept)
+
+        referenced = set()
+        for entry in kept:
+            referenced.add(entry['hash'])
+            if entry.get('base'):
+                referenced.add(entry['base'])
+        objects_dir = self.root / 'objects'
+        if objects_dir.exists():
+            for blob in objects_dir.glob('*/*'):
+                if blob.name not in referenced:
+                    blob.unlink()
+        return removed
+
+    def import_legacy(self, delete=False):
+        """Move the old full-copy `.backup.*` files into the store."""
+        legacy = []
+        for pattern in LEGACY_PATTERNS:
+            legacy.extend(self.project_file.parent.glob(pattern))
+        imported = []
+        for path in sorted(set(legacy), key=lambda p: p.stat().st_mtime):
+            created = datetime.fromtimestamp(path.stat().st_mtime)
+            imported.append(self.create(label=f'imported {path.name}', data=path.read_bytes(), created=created))
+            if delete:
+                path.unlink()
+        return imported
+
+
+def backup_project(project_file, label=None):
+    """Back up a project.pbxproj into its delta store and return the entry."""
+    return BackupStore(project_file).create(label=label)
+
+
+def format_size(size):
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024 or unit == 'MB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='pbxtool backup', description="Manage project.pbxproj backups")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    list_cmd = commands.add_parser('list', help="List backups")
+    list_cmd.add_argument('project')
+
+    create_cmd = commands.add_parser('create', help="Back up the project file now")
+    create_cmd.add_argument('project')
+    create_cmd.add_argument('--label')
+
+    restore_cmd = commands.add_parser('restore', help="Restore a backup")
+    restore_cmd.add_argument('project')
+    restore_cmd.add_argument('backup_id')
+    restore_cmd.add_argument('--to', help="Write to this path instead of the project file")
+
+    prune_cmd = commands.add_parser('prune', help="Apply the retention policy")
+    prune_cmd.add_argument('project')
+    prune_cmd.add_argument('--keep-last', type=int, default=DEFAULT_KEEP_LAST)
+    prune_cmd.add_argument('--keep-daily', type=int, default=DEFAULT_KEEP_DAILY)
+
+    import_cmd = commands.add_parser('import', help="Import old .backup.* full copies")
+    import_cmd.add_argument('project')
+    import_cmd.add_argument('--delete', action='store_true', help="Delete the old files after importing")
+
+    args = parser.parse_args(argv)
+    store = BackupStore(args.project)
+
+    if args.command == 'list':
+        entries = store.entries()
+        if not entries:
+            print("No backups yet")
+            return 0
+        for entry in entries:
+            kind = 'delta' if entry.get('base') else 'full'
+            print(f"{entry['id']}  {entry['created']}  {format_size(entry['stored']):>9} {kind:<5}  "
+                  f"{entry.get('label') or ''}")
+    elif args.command == 'create':
+        entry = store.create(label=args.label)
+        print(f"✅ Backup created: {entry['id']} ({format_size(entry['stored'])})")
+    elif args.command == 'restore':
+        target = store.restore(args.backup_id, args.to)
+        print(f"✅ Restored {args.backup_id} to {target}")
+    elif args.command == 'prune':
+        removed = store.prune(args.keep_last, args.keep_daily)
+        print(f"🗑️  Removed {len(removed)} backup(s), kept {len(store.entries())}")
+    elif args.command == 'import':
+        imported = store.import_legacy(delete=args.delete)
+        stored = sum(entry['stored'] for entry in imported)
+        original = sum(entry['size'] for entry in imported)
+        print(f"✅ Imported {len(imported)} backup(s): {format_size(original)} → {format_size(stored)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
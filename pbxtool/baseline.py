@@ -0,0 +1,128 @@
+"""
+baseline.py
+The text-and-regex edits the scripts made before pbxtool, frozen for bench.py.
+
+These are copied unchanged from the original fix_all_project_errors.py and
+add_wishkit_to_xcode.py, so the benchmarks keep measuring the engine against
+what it replaced, however the scripts change. Nothing else uses them.
+"""
+
+import os
+import re
+import uuid
+
+
+def generate_uuid():
+    """Generate a 24-character hex string for Xcode UUID"""
+    return uuid.uuid4().hex[:24].upper()
+
+
+def find_all_file_references(project_content):
+    """Find all file references and their paths."""
+    file_refs = []
+
+    pattern = re.compile(
+        r'^\s+([A-F0-9]{24})\s+/\*[^*]+\*/\s*=\s*\{.*?isa\s*=\s*PBXFileReference.*?path\s*=\s*"([^"]+)";',
+        re.MULTILINE | re.DOTALL
+    )
+
+    for match in pattern.finditer(project_content):
+        ref_id = match.group(1)
+        file_path = match.group(2)
+        file_refs.append({
+            'id': ref_id,
+            'path': file_path
+        })
+
+    return file_refs
+
+
+def add_file_to_project(project_content, file_path, libraries_group_id, target_id, sources_phase_id):
+    """Add a single file to the project"""
+    file_name = os.path.basename(file_path)
+    file_ref_id = generate_uuid()
+    build_file_id = generate_uuid()
+
+    # Create file reference
+    file_ref = f'\t\t{file_ref_id} /* {file_name} */ = {{isa = PBXFileReference; lastKnownFileType = sourcecode.swift; path = "{file_path}"; sourceTree = "<group>"; }};\n'
+
+    # Create build file
+    build_file = f'\t\t{build_file_id} /* {file_name} in Sources */ = {{isa = PBXBuildFile; fileRef = {file_ref_id} /* {file_name} */; }};\n'
+
+    # Add file reference section
+    file_ref_section = re.search(r'(/\* Begin PBXFileReference section \*/)', project_content)
+    if file_ref_section:
+        insert_pos = file_ref_section.end()
+        project_content = project_content[:insert_pos] + file_ref + project_content[insert_pos:]
+
+    # Add build file section
+    build_file_section = re.search(r'(/\* Begin PBXBuildFile section \*/)', project_content)
+    if build_file_section:
+        insert_pos = build_file_section.end()
+        project_content = project_content[:insert_pos] + build_file + project_content[insert_pos:]
+
+    # Add to Libraries group
+    if libraries_group_id:
+        group_pattern = rf'({re.escape(libraries_group_id)}.*?children = \()([^)]+)(\))'
+        match = re.search(group_pattern, project_content, re.DOTALL)
+        if match:
+            children = match.group(2)
+            new_child = f'\t\t\t\t{file_ref_id} /* {file_name} */,\n'
+            project_content = project_content[:match.start(2)] + children + new_child + project_content[match.end(2):]
+
+    # Add to Sources build phase
+    if sources_phase_id:
+        phase_pattern = rf'({re.escape(sources_phase_id)}.*?files = \()([^)]+)(\))'
+        match = re.search(phase_pattern, project_content, re.DOTALL)
+        if match:
+            files = match.group(2)
+            new_file = f'\t\t\t\t{build_file_id} /* {file_name} in Sources */,\n'
+            project_content = project_content[:match.start(2)] + files + new_file + project_content[match.end(2):]
+
+    return project_content, file_ref_id, build_file_id
+
+
+def remove_missing_file_references(project_content, missing_refs, build_files):
+    """Remove references to missing files from the project."""
+    fixes = []
+    new_content = project_content
+
+    for ref in missing_refs:
+        ref_id = ref['id']
+        file_path = ref['path']
+
+        # Remove PBXFileReference
+        ref_pattern = re.compile(
+            rf'^\s+{re.escape(ref_id)}\s+/\*[^*]+\*/\s*=\s*\{{.*?\}};',
+            re.MULTILINE | re.DOTALL
+        )
+        if ref_pattern.search(new_content):
+            new_content = ref_pattern.sub('', new_content)
+            fixes.append({
+                'file': file_path,
+                'type': 'removed_missing'
+            })
+
+        # Remove PBXBuildFile if exists
+        if ref_id in build_files:
+            build_id = build_files[ref_id]
+            # Escape braces properly in regex
+            escaped_build_id = re.escape(build_id)
+            build_pattern = re.compile(
+                rf'^\s+{escaped_build_id}\s+/\*[^*]+\*/\s+in\s+Sources\s*=\s*\{{[^}}]+\}};',
+                re.MULTILINE | re.DOTALL
+            )
+            if build_pattern.search(new_content):
+                new_content = build_pattern.sub('', new_content)
+
+        # Remove from group children lists
+        children_pattern = re.compile(
+            rf'(\s+{re.escape(ref_id)}\s+/\*[^*]+\*/\s*[,)])',
+            re.MULTILINE
+        )
+        new_content = children_pattern.sub('', new_content)
+
+    # Clean up empty lines
+    new_content = re.sub(r'\n\s*\n\s*\n', '\n\n', new_content)
+
+    return new_content, fixes
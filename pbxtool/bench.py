@@ -0,0 +1,467 @@
+"""
+bench.py
+Benchmarks for parsing, querying, editing and serializing large projects.
+
+    python3 -m pbxtool bench                          # 1k and 10k objects
+    python3 -m pbxtool bench --sizes 1000 10000 100000 --repeat 5
+    python3 -m pbxtool bench --only parse serialize_incremental --no-save
+
+Projects are generated in memory, shaped like Itinero and Pods: folders of
+about a dozen files under the usual top-level groups, mostly Swift sources
+with some resources, one app target plus a Pods-style target per few
+thousand objects, each with Sources, Frameworks and Resources phases.
+
+Every benchmark runs --repeat times and reports the best time, its
+throughput and (from one extra run under tracemalloc) the peak memory it
+allocated. The regex-based text edits the fix_* and add_* scripts made
+before the engine (frozen in baseline.py) are timed alongside it, on the
+same project with its paths quoted the way those scripts wrote and matched
+them. They grow faster than linearly, so at 100k objects leave them out
+with --only; the regex removal only gets --legacy-limit references, since
+it makes three full-text passes per reference.
+
+Results are appended to .pbxbench/results.jsonl. Each run is compared
+with the previous one on the same machine and Python version, and a
+benchmark that got more than --threshold slower is reported as a
+regression (exit code 1).
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+from . import baseline
+from .objects import make_object
+from .paths import PathResolver
+from .project import XcodeProject
+
+DEFAULT_SIZES = (1_000, 10_000)
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = 0.25
+# Slowdowns smaller than this are timer noise, whatever the ratio.
+MIN_REGRESSION_SECONDS = 0.002
+DEFAULT_LEGACY_LIMIT = 20
+RESULTS_FILE = os.path.join('.pbxbench', 'results.jsonl')
+
+# Share of the files added or removed by the edit benchmarks.
+EDIT_SHARE = 0.01
+
+SKELETON = """// !$*UTF8*$!
+{
+	archiveVersion = 1;
+	classes = {
+	};
+	objectVersion = 77;
+	objects = {
+	};
+	rootObject = %s;
+}
+"""
+
+TOP_FOLDERS = ('Views', 'Managers', 'Models', 'Extensions', 'Components', 'Widgets', 'Intents', 'Libraries')
+
+# (extension, lastKnownFileType, phase isa) with the share of files of each kind
+FILE_KINDS = (
+    (0.88, '.swift', 'sourcecode.swift', 'PBXSourcesBuildPhase'),
+    (0.06, '.png', 'image.png', 'PBXResourcesBuildPhase'),
+    (0.03, '.strings', 'text.plist.strings', 'PBXResourcesBuildPhase'),
+    (0.03, '.json', 'text.json', 'PBXResourcesBuildPhase'),
+)
+
+FILES_PER_GROUP = 12
+OBJECTS_PER_TARGET = 4_000
+PHASE_ISAS = ('PBXSourcesBuildPhase', 'PBXFrameworksBuildPhase', 'PBXResourcesBuildPhase')
+
+# An unquoted `path = value;` in serialized text
+UNQUOTED_PATH_PATTERN = re.compile(r'(\bpath = )([^";]+);')
+
+
+def synthetic_project(objects=10_000, seed=0):
+    """project.pbxproj text with about `objects` objects."""
+    rng = random.Random(seed)
+    used = set()
+
+    def new_id():
+        while True:
+            object_id = f'{rng.getrandbits(96):024X}'
+            if object_id not in used:
+                used.add(object_id)
+                return object_id
+
+    root_id = new_id()
+    project = XcodeProject(SKELETON % root_id)
+
+    def add(props, comment=None, object_id=None):
+        obj = make_object(object_id or new_id(), props, comment)
+        project.add_object(obj)
+        return obj.id
+
+    def configuration_list(comment):
+        configs = [
+            add({
+                'isa': 'XCBuildConfiguration',
+                'buildSettings': {
+                    'PRODUCT_NAME': '$(TARGET_NAME)',
+                    'SWIFT_VERSION': '5.0',
+                    'IPHONEOS_DEPLOYMENT_TARGET': '17.0',
+                    'SWIFT_OPTIMIZATION_LEVEL': '-Onone' if name == 'Debug' else '-O',
+                    'CODE_SIGN_STYLE': 'Automatic',
+                },
+                'name': name,
+            }, name)
+            for name in ('Debug', 'Release')
+        ]
+        return add({
+            'isa': 'XCConfigurationList',
+            'buildConfigurations': configs,
+            'defaultConfigurationIsVisible': '0',
+            'defaultConfigurationName': 'Release',
+        }, comment)
+
+    target_count = 1 + objects // OBJECTS_PER_TARGET
+    fixed = 3 + 3 + target_count * 8
+    file_count = max(1, int((objects - fixed) / (2 + 1 / FILES_PER_GROUP)))
+
+    products = []
+    targets = []
+    phases = []
+    for index in range(target_count):
+        name = 'Itinero' if index == 0 else f'Pod{index}'
+        product = add({
+            'isa': 'PBXFileReference',
+            'explicitFileType': 'wrapper.application' if index == 0 else 'wrapper.framework',
+            'includeInIndex': '0',
+            'path': f'{name}.app' if index == 0 else f'{name}.framework',
+            'sourceTree': 'BUILT_PRODUCTS_DIR',
+        }, f'{name}.app' if index == 0 else f'{name}.framework')
+        products.append(product)
+        target_phases = {
+            isa: add({'isa': isa, 'buildActionMask': '2147483647', 'files': [],
+                      'runOnlyForDeploymentPostprocessing': '0'}, isa[3:-len('BuildPhase')])
+            for isa in PHASE_ISAS
+        }
+        phases.append(target_phases)
+        targets.append(add({
+            'isa': 'PBXNativeTarget',
+            'buildConfigurationList': configuration_list(f'Build configuration list for PBXNativeTarget "{name}"'),
+            'buildPhases': list(target_phases.values()),
+            'buildRules': [],
+            'dependencies': [],
+            'name': name,
+            'productName': name,
+            'productReference': product,
+            'productType': 'com.apple.product-type.application' if index == 0
+            else 'com.apple.product-type.framework',
+        }, name))
+
+    products_group = add({'isa': 'PBXGroup', 'children': products, 'name': 'Products', 'sourceTree': '<group>'},
+                         'Products')
+    top_groups = {
+        folder: add({'isa': 'PBXGroup', 'children': [], 'path': folder, 'sourceTree': '<group>'}, folder)
+        for folder in TOP_FOLDERS
+    }
+    main_group = add({'isa': 'PBXGroup', 'children': [*top_groups.values(), products_group],
+                      'sourceTree': '<group>'})
+
+    weights = [kind[0] for kind in FILE_KINDS]
+    group_id = None
+    for index in range(file_count):
+        if index % FILES_PER_GROUP == 0:
+            folder = TOP_FOLDERS[(index // FILES_PER_GROUP) % len(TOP_FOLDERS)]
+            name = f'Feature{index // FILES_PER_GROUP}'
+            group_id = add({'isa': 'PBXGroup', 'children': [], 'path': name, 'sourceTree': '<group>'}, name)
+            project.add_child(top_groups[folder], group_id)
+            target_phases = phases[(index // FILES_PER_GROUP) % target_count]
+        _, suffix, file_type, phase_isa = rng.choices(FILE_KINDS, weights)[0]
+        file_name = f'File{index}{suffix}'
+        ref = add({'isa': 'PBXFileReference', 'lastKnownFileType': file_type, 'path': file_name,
+                   'sourceTree': '<group>'}, file_name)
+        project.add_child(group_id, ref)
+        phase_id = target_phases[phase_isa]
+        build_file = add({'isa': 'PBXBuildFile', 'fileRef': ref},
+                         f'{file_name} in {project[phase_id].comment}')
+        project.add_to_phase(phase_id, build_file)
+
+    add({
+        'isa': 'PBXProject',
+        'attributes': {'BuildIndependentTargetsInParallel': '1', 'LastSwiftUpdateCheck': '1600'},
+        'buildConfigurationList': configuration_list('Build configuration list for PBXProject "Itinero"'),
+        'compatibilityVersion': 'Xcode 14.0',
+        'developmentRegion': 'en',
+        'hasScannedForEncodings': '0',
+        'knownRegions': ['en', 'Base'],
+        'mainGroup': main_group,
+        'productRefGroup': products_group,
+        'projectDirPath': '',
+        'projectRoot': '',
+        'targets': targets,
+    }, 'Project object', root_id)
+    return project.serialize(full=True)
+
+
+def quoted_paths(text):
+    """`text` with every path quoted, as the regex baselines expect."""
+    return UNQUOTED_PATH_PATTERN.sub(r'\1"\2";', text)
+
+
+def edit_count(project, limit=None):
+    count = max(1, int(len(project.file_references) * EDIT_SHARE))
+    return min(count, limit) if limit else count
+
+
+def removable(project, count):
+    """File references spread over the project, as the baseline dicts."""
+    refs = [ref for ref in project.file_references if ref.source_tree == '<group>']
+    step = max(1, len(refs) // count)
+    return [{'id': ref.id, 'path': ref.path, 'source_tree': ref.source_tree} for ref in refs[::step][:count]]
+
+
+# Benchmarks: each setup(text, options) returns the state its run(state)
+# needs and is not timed; run returns the number of items it processed.
+
+def setup_buffer(text, options):
+    # What XcodeProject.load hands the parser: the file's bytes
+    return text.encode('utf-8')
+
+
+def setup_project(text, options):
+    return XcodeProject(text)
+
+
+def run_parse(buffer):
+    return len(XcodeProject(buffer).objects)
+
+
+def run_index_queries(project):
+    count = 0
+    for ref in project.file_references:
+        project.files_at_path(ref.path)
+        project.parent_of(ref.id)
+        for build_file in project.build_files_for(ref.id):
+            project.target_of(project.phase_of_build_file.get(build_file.id))
+        count += 1
+    return count
+
+
+def run_resolve_paths(project):
+    resolver = PathResolver(project, '/tmp/bench')
+    return sum(1 for ref in project.file_references if resolver.resolve(ref) is not None)
+
+
+def setup_text(text, options):
+    return quoted_paths(text)
+
+
+def run_find_all_file_references(text):
+    return len(baseline.find_all_file_references(text))
+
+
+def setup_add(text, options):
+    project = XcodeProject(text)
+    target = project.main_target
+    group = project.group_named('Feature0')
+    phase = project.build_phase(target)
+    files = [f'Generated{index}.swift' for index in range(edit_count(project))]
+    return project, group.id, target.id, phase.id, files
+
+
+def run_add_transaction(state):
+    project, group_id, _, phase_id, files = state
+    transaction = project.transaction()
+    for path in files:
+        transaction.add_file(path, group_id, phase_id)
+    transaction.commit(write=False)
+    return len(files)
+
+
+def setup_add_text(text, options):
+    project, group_id, target_id, phase_id, files = setup_add(text, options)
+    return quoted_paths(text), group_id, target_id, phase_id, files
+
+
+def run_add_file_to_project(state):
+    text, group_id, target_id, phase_id, files = state
+    for path in files:
+        text, _, _ = baseline.add_file_to_project(text, path, group_id, target_id, phase_id)
+    return len(files)
+
+
+def setup_remove(text, options):
+    project = XcodeProject(text)
+    return project, removable(project, edit_count(project))
+
+
+def run_remove_transaction(state):
+    project, refs = state
+    transaction = project.transaction()
+    for ref in refs:
+        transaction.remove(ref['id'])
+    transaction.commit(write=False)
+    return len(refs)
+
+
+def setup_remove_text(text, options):
+    project = XcodeProject(text)
+    refs = removable(project, edit_count(project, options.legacy_limit))
+    build_files = {
+        build_file.file_ref: build_file.id
+        for build_file in project.build_files
+        if build_file.file_ref
+    }
+    return quoted_paths(text), refs, build_files
+
+
+def run_remove_missing_file_references(state):
+    text, refs, build_files = state
+    baseline.remove_missing_file_references(text, refs, build_files)
+    return len(refs)
+
+
+def run_serialize_full(project):
+    project.serialize(full=True)
+    return len(project.objects)
+
+
+def setup_edited(text, options):
+    project = XcodeProject(text)
+    ref = project.file_references[len(project.file_references) // 2]
+    project.set_value(ref.id, 'path', 'Renamed.swift')
+    return project
+
+
+def run_serialize_incremental(project):
+    project.serialize()
+    return len(project.objects)
+
+
+# name: (setup, run, unit)
+BENCHMARKS = {
+    'parse': (setup_buffer, run_parse, 'objects'),
+    'index_queries': (setup_project, run_index_queries, 'refs'),
+    'resolve_paths': (setup_project, run_resolve_paths, 'refs'),
+    'find_all_file_references': (setup_text, run_find_all_file_references, 'refs'),
+    'add_transaction': (setup_add, run_add_transaction, 'files'),
+    'add_file_to_project': (setup_add_text, run_add_file_to_project, 'files'),
+    'remove_transaction': (setup_remove, run_remove_transaction, 'refs'),
+    'remove_missing_file_references': (setup_remove_text, run_remove_missing_file_references, 'refs'),
+    'serialize_full': (setup_project, run_serialize_full, 'objects'),
+    'serialize_incremental': (setup_edited, run_serialize_incremental, 'objects'),
+}
+
+
+def measure(text, name, options):
+    """Best time, throughput and peak memory of one benchmark on `text`."""
+    setup, run, unit = BENCHMARKS[name]
+    best = None
+    for _ in range(options.repeat):
+        state = setup(text, options)
+        start = time.perf_counter()
+        count = run(state)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    result = {'seconds': best, 'items': count, 'unit': unit, 'per_second': count / best if best else None}
+    if options.memory:
+        state = setup(text, options)
+        tracemalloc.start()
+        run(state)
+        result['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result
+
+
+def environment():
+    return {'python': platform.python_version(), 'machine': platform.node() or platform.machine()}
+
+
+def previous_run(path, env):
+    """Latest stored run from the same environment, or None."""
+    latest = None
+    try:
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                run = json.loads(line)
+                if run.get('environment') == env:
+                    latest = run
+    except (OSError, ValueError):
+        return None
+    return latest
+
+
+def regressions(current, previous, threshold):
+    """(size, benchmark, old seconds, new seconds) for every slowdown above `threshold`."""
+    found = []
+    for size, results in current.items():
+        for name, result in results.items():
+            old = previous.get(size, {}).get(name)
+            if not old:
+                continue
+            slower = result['seconds'] - old['seconds']
+            if slower > MIN_REGRESSION_SECONDS and result['seconds'] > old['seconds'] * (1 + threshold):
+                found.append((size, name, old['seconds'], result['seconds']))
+    return found
+
+
+def format_bytes(count):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if count < 1024 or unit == 'GB':
+            return f'{count:.0f} {unit}' if unit == 'B' else f'{count:.1f} {unit}'
+        count /= 1024
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='pbxtool bench', description="Benchmark the project engine")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES),
+                        help="object counts of the synthetic projects (default: 1000 10000)")
+    parser.add_argument('--only', nargs='+', choices=list(BENCHMARKS), help="run only these benchmarks")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help="runs per benchmark; the best counts")
+    parser.add_argument('--legacy-limit', type=int, default=DEFAULT_LEGACY_LIMIT,
+                        help="references removed by the regex-based baseline removal")
+    parser.add_argument('--no-memory', dest='memory', action='store_false', help="skip the tracemalloc run")
+    parser.add_argument('--results', default=RESULTS_FILE, help=f"results file (default: {RESULTS_FILE})")
+    parser.add_argument('--no-save', dest='save', action='store_false', help="don't store this run")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="slowdown that counts as a regression (default: 0.25 = 25%%)")
+    options = parser.parse_args(argv)
+
+    names = options.only or list(BENCHMARKS)
+    current = {}
+    for size in options.sizes:
+        start = time.perf_counter()
+        text = synthetic_project(size)
+        print(f"📐 ~{size:,} objects, {format_bytes(len(text))} "
+              f"(generated in {time.perf_counter() - start:.2f}s)")
+        results = current[str(size)] = {}
+        for name in names:
+            result = results[name] = measure(text, name, options)
+            memory = f"  peak {format_bytes(result['peak_bytes']):>9}" if 'peak_bytes' in result else ''
+            print(f"   {name:<32} {result['seconds'] * 1000:>10.2f} ms  "
+                  f"{result['per_second']:>12,.0f} {result['unit']}/s{memory}")
+
+    env = environment()
+    previous = previous_run(options.results, env)
+    found = regressions(current, previous['results'], options.threshold) if previous else []
+    if previous:
+        if found:
+            print(f"⚠️  {len(found)} regression(s) since {previous['time']}:")
+            for size, name, old, new in found:
+                print(f"   • {name} @ {size}: {old * 1000:.2f} ms → {new * 1000:.2f} ms")
+        else:
+            print(f"✅ No regressions since {previous['time']}")
+    if options.save:
+        os.makedirs(os.path.dirname(options.results) or '.', exist_ok=True)
+        with open(options.results, 'a', encoding='utf-8') as f:
+            run = {'time': datetime.now().isoformat(timespec='seconds'), 'environment': env, 'results': current}
+            f.write(json.dumps(run) + '\n')
+        print(f"💾 Results appended to {options.results}")
+    return 1 if found else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
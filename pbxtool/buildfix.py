@@ -0,0 +1,120 @@
+"""
+buildfix.py
+Fix the file references behind "file not found" build errors.
+
+    python3 -m pbxtool fix-from-log                       # build*.log in this folder
+    python3 -m pbxtool fix-from-log build_errors.log --dry-run
+    python3 -m pbxtool fix-from-log --plan fixes.json
+
+xcodebuild reports a missing input as "Build input file cannot be found:
+'/path/File.swift'", "<unknown>:0: error: no such file or directory:
+'/path/File.swift'" and the like (see LogIndex.missing_files). Those paths
+are joined to file references through an index of every reference's path
+relative to the source root. A log path is made relative with the folder
+the build ran in (the `cd` lines of the log); a log without them falls
+back to the longest trailing run of the path that some reference has.
+
+Only the matched references are looked at, with a stat or two each instead
+of a scan of the whole project folder:
+
+    exists     the file is there now, so the log is stale; nothing is done
+    repair     the path repeats its group's folders and the stripped path
+               exists; the path is fixed
+    remove     the reference, its build files and any group left empty
+               are removed
+    unmatched  no reference points at the path
+
+Repairs and removals are queued in one transaction.
+"""
+
+import os
+
+from .checks import duplicate_paths
+
+
+def path_index(project, resolver):
+    """{path relative to the source root: [file reference, ...]}."""
+    index = {}
+    for ref in project.file_references:
+        relative = resolver.relative(ref)
+        if relative is not None:
+            index.setdefault(relative.replace(os.sep, '/'), []).append(ref)
+    return index
+
+
+def lookup(index, path, roots=()):
+    """File references a log path stands for.
+
+    `roots` are folders the log's paths may be relative to, tried longest
+    first; without one that contains the path, the longest indexed
+    trailing run of the path wins.
+    """
+    for root in sorted(roots, key=len, reverse=True):
+        root = root.rstrip('/') + '/'
+        if path.startswith(root):
+            return index.get(path[len(root):], [])
+    parts = path.strip('/').split('/')
+    for start in range(len(parts)):
+        refs = index.get('/'.join(parts[start:]))
+        if refs:
+            return refs
+    return []
+
+
+def triage(project, resolver, log_index):
+    """One entry per missing path and reference, with the action to take.
+
+    Each entry has the log path, the number of diagnostics naming it and
+    their targets, the reference ID, its build file IDs, the action and,
+    for a repair, the new path.
+    """
+    index = path_index(project, resolver)
+    roots = [resolver.source_root, *log_index.roots]
+    matched = {}
+    entries = []
+    for path, diagnostics in sorted(log_index.missing_files().items()):
+        refs = lookup(index, path, roots)
+        base = {
+            'path': path,
+            'diagnostics': sum(item['count'] for item in diagnostics),
+            'targets': sorted({target for item in diagnostics for target in item['targets']}),
+        }
+        if not refs:
+            entries.append({**base, 'ref': None, 'build_files': [], 'action': 'unmatched', 'new': None})
+        for ref in refs:
+            matched[ref.id] = ref
+            entries.append({
+                **base,
+                'ref': ref.id,
+                'build_files': [build_file.id for build_file in project.build_files_for(ref.id)],
+                'action': None,
+                'new': None,
+            })
+
+    repairs = {fix['id']: fix for fix in duplicate_paths(project, resolver, refs=matched.values())}
+    for entry in entries:
+        if entry['action'] is not None:
+            continue
+        full_path = resolver.resolve(entry['ref'])
+        fix = repairs.get(entry['ref'])
+        if full_path is not None and os.path.exists(full_path):
+            entry['action'] = 'exists'
+        elif fix and os.path.exists(os.path.join(resolver.resolve(project.parent_of(entry['ref'])), fix['new'])):
+            entry['action'] = 'repair'
+            entry['new'] = fix['new']
+        else:
+            entry['action'] = 'remove'
+    return entries
+
+
+def queue_fixes(transaction, entries):
+    """Queue the repairs and (as one batch) the removals of `entries`."""
+    removals = []
+    for entry in entries:
+        if entry['action'] == 'repair':
+            transaction.set_value(entry['ref'], 'path', entry['new'])
+        elif entry['action'] == 'remove':
+            removals.append(entry['ref'])
+    if removals:
+        transaction.remove_many(removals, prune_empty_groups=True)
+    return transaction
@@ -0,0 +1,240 @@
+"""
+buildlog.py
+Errors and warnings from xcodebuild logs, indexed by source file.
+
+    python3 -m pbxtool log                           # build*.log in this folder
+    python3 -m pbxtool log build_output.log --category deprecation
+    python3 -m pbxtool log --file Managers/PermissionRequestManager.swift
+    xcodebuild ... 2>&1 | tee build_output.log | python3 -m pbxtool log -
+
+Logs are read line by line, so memory grows with the number of distinct
+diagnostics, not with the size of the log. A line is only matched against
+the diagnostic patterns when it contains `error`, `warning` or `note`, which
+skips the compiler invocations that make up most of a log.
+
+Each diagnostic is recorded once per (severity, file, line, column, message),
+however often the compiler repeats it (Swift reports a warning again for
+every file of the module that imports it, and again when emitting the
+module); repeats only raise its count and add the logs and targets it
+appeared in. Notes are attached to the diagnostic they follow. Every
+diagnostic gets a category from its message (deprecation, actor-isolation,
+concurrency, unused, ...), and the index answers per file, severity and
+category. missing_files() picks out the input files the build couldn't
+find, which buildfix.py maps back to file references.
+"""
+
+import os
+import re
+import sys
+
+# /path/File.swift:24:73: warning: message   (clang, swiftc, ld64 with a location)
+LOCATED_PATTERN = re.compile(
+    r'^(?P<file>/[^:]+|<unknown>):(?P<line>\d+):(?:(?P<column>\d+):)? '
+    r'(?P<severity>fatal error|error|warning|note): (?P<message>.*)$'
+)
+# xcodebuild: error: ..., 2025-11-11 14:27:51.474 xcodebuild[73540:34513432] warning: ...,
+# --- xcodebuild: WARNING: ..., ld: warning: ..., error: Build input file cannot be found: ...
+UNLOCATED_PATTERN = re.compile(
+    r'^(?:--- )?(?:\d{4}-\d\d-\d\d [\d:.]+ )?(?:(?P<tool>[\w.+-]+)(?:\[[\d:]+\] |: ))?'
+    r'(?P<severity>(?i:fatal error|error|warning|note)): *(?P<message>.*)$'
+)
+# SwiftCompile normal arm64 /path/File.swift (in target 'Triply' from project 'Triply')
+TARGET_PATTERN = re.compile(r" ?\(in target '(?P<target>[^']*)' from project '[^']*'\)$")
+
+# "    cd /Users/me/Triply" before each step: the folder the build ran in
+CD_PATTERN = re.compile(r'^\s+cd (/.+)$')
+
+# Diagnostics about an input file that isn't where the project says it is
+MISSING_FILE_PATTERN = re.compile(
+    r"Build input file cannot be found|[Cc]annot find file|[Nn]o such file or directory|"
+    r"[Cc]ouldn't load file|lstat\("
+)
+# '/path', "/path" or lstat(/path) inside a message
+QUOTED_PATH_PATTERN = re.compile(r"""['"‘“(](/[^'"’”()]+)['"’”)]""")
+
+# First match wins; anything else is 'other'
+CATEGORIES = [
+    ('deprecation', re.compile(r'deprecated')),
+    ('actor-isolation', re.compile(r'actor-isolated|nonisolated|isolated to|global actor|actor isolation')),
+    ('concurrency', re.compile(r'Sendable|data race|\basync\b|\bawait\b|concurrently')),
+    ('unused', re.compile(r'never used|never mutated|unused')),
+    ('unreachable', re.compile(r'unreachable|will never be executed')),
+    ('project', re.compile(r'malformed project|file reference|Build input file|[Cc]annot find file|[Nn]o such file')),
+    ('signing', re.compile(r'[Ss]igning|provisioning profile|certificate')),
+    ('configuration', re.compile(r'destination|deployment target|[Ss]cheme')),
+]
+
+# Notes kept per diagnostic (fix-it chains can be long)
+MAX_NOTES = 10
+
+LOG_FILES = ('build.log', 'build_output.log', 'build_errors.log')
+
+
+def category_of(message):
+    for name, pattern in CATEGORIES:
+        if pattern.search(message):
+            return name
+    return 'other'
+
+
+def parse_line(line):
+    """(severity, file, line, column, message) for a diagnostic line, else None."""
+    if 'error' not in line and 'warning' not in line and 'note' not in line and 'WARNING' not in line:
+        return None
+    match = LOCATED_PATTERN.match(line)
+    if match:
+        severity = 'error' if match['severity'] == 'fatal error' else match['severity']
+        if match['file'] == '<unknown>':
+            # <unknown>:0: error: ... from the Swift driver carries no location
+            return severity, None, None, None, match['message'].strip()
+        column = match['column']
+        return severity, match['file'], int(match['line']), int(column) if column else None, match['message'].strip()
+    match = UNLOCATED_PATTERN.match(line)
+    if match:
+        severity = match['severity'].lower()
+        return 'error' if severity == 'fatal error' else severity, None, None, None, match['message'].strip()
+    return None
+
+
+class LogIndex:
+    """Distinct diagnostics of one or more build logs, indexed by file."""
+
+    def __init__(self):
+        self.diagnostics = {}
+        self.by_file = {}
+        self.logs = []
+        self.roots = []
+        self.lines = 0
+
+    def add_log(self, path):
+        """Stream one log into the index ('-' reads stdin)."""
+        if path == '-':
+            self.add_lines(sys.stdin, '<stdin>')
+        else:
+            with open(path, encoding='utf-8', errors='replace') as f:
+                self.add_lines(f, str(path))
+        return self
+
+    def add_lines(self, lines, log):
+        """Index an iterable of log lines read from `log`."""
+        self.logs.append(log)
+        target = None
+        last = None
+        for line in lines:
+            self.lines += 1
+            line = line.rstrip('\n')
+            if not line:
+                # Notes directly follow their diagnostic; a blank line ends it
+                last = None
+                continue
+            if line.startswith('    cd '):
+                found = CD_PATTERN.match(line)
+                if found and found[1] not in self.roots:
+                    self.roots.append(found[1])
+                continue
+            found = TARGET_PATTERN.search(line)
+            parsed = parse_line(line)
+            if parsed is None:
+                if found:
+                    # A build step; what follows belongs to its target
+                    target = found['target']
+                    last = None
+                continue
+            severity, file, line_number, column, message = parsed
+            if found:
+                # "error: Build input file cannot be found: '...' (in target 'X' ...)"
+                message = message[:-len(found.group())]
+            if severity == 'note':
+                # Only the first occurrence keeps notes; repeats carry the same ones
+                if file and last is not None and last['count'] == 1 and len(last['notes']) < MAX_NOTES:
+                    last['notes'].append({'file': file, 'line': line_number, 'column': column, 'message': message})
+                continue
+            last = self.record(severity, file, line_number, column, message, log,
+                               found['target'] if found else target)
+
+    def record(self, severity, file, line, column, message, log, target):
+        key = (severity, file, line, column, message)
+        item = self.diagnostics.get(key)
+        if item is None:
+            item = self.diagnostics[key] = {
+                'severity': severity,
+                'category': category_of(message),
+                'file': file,
+                'line': line,
+                'column': column,
+                'message': message,
+                'count': 0,
+                'logs': [],
+                'targets': [],
+                'notes': [],
+            }
+            self.by_file.setdefault(file, []).append(item)
+        item['count'] += 1
+        if log not in item['logs']:
+            item['logs'].append(log)
+        if target and target not in item['targets']:
+            item['targets'].append(target)
+        return item
+
+    def missing_files(self):
+        """{path: [diagnostic, ...]} for every input file a diagnostic says is missing."""
+        paths = {}
+        for item in self.diagnostics.values():
+            if item['severity'] == 'note' or not MISSING_FILE_PATTERN.search(item['message']):
+                continue
+            for path in QUOTED_PATH_PATTERN.findall(item['message']):
+                paths.setdefault(os.path.normpath(path), []).append(item)
+        return paths
+
+    def root(self):
+        """Deepest folder holding every file with diagnostics, for short paths."""
+        folders = [os.path.dirname(file) for file in self.by_file if file]
+        return os.path.commonpath(folders) if folders else None
+
+    def files_matching(self, path):
+        """Indexed files equal to `path` or ending with it as a relative path."""
+        if path in self.by_file:
+            return [path]
+        suffix = '/' + path.strip('/')
+        return [file for file in self.by_file if file and file.endswith(suffix)]
+
+    def query(self, file=None, severity=None, category=None):
+        """Diagnostics matching every given filter, by file and position."""
+        if file is not None:
+            items = [item for match in self.files_matching(file) for item in self.by_file[match]]
+        else:
+            items = self.diagnostics.values()
+        found = [
+            item for item in items
+            if (severity is None or item['severity'] == severity)
+            and (category is None or item['category'] == category)
+        ]
+        return sorted(found, key=lambda item: (item['file'] or '', item['line'] or 0, item['column'] or 0))
+
+    def files(self):
+        """{file: {'error': n, 'warning': n}} for files with diagnostics, worst first."""
+        counts = {}
+        for file, items in self.by_file.items():
+            if file is None:
+                continue
+            tally = counts[file] = {'error': 0, 'warning': 0}
+            for item in items:
+                tally[item['severity']] += 1
+        return dict(sorted(counts.items(), key=lambda entry: (-entry[1]['error'], -entry[1]['warning'], entry[0])))
+
+    def summary(self):
+        """Counts of distinct diagnostics by severity and category, and of repeats."""
+        summary = {'error': 0, 'warning': 0, 'categories': {}, 'repeats': 0}
+        for item in self.diagnostics.values():
+            summary[item['severity']] += 1
+            summary['categories'][item['category']] = summary['categories'].get(item['category'], 0) + 1
+            summary['repeats'] += item['count'] - 1
+        return summary
+
+
+def index_logs(paths):
+    """LogIndex over the logs at `paths`, read in order."""
+    index = LogIndex()
+    for path in paths:
+        index.add_log(path)
+    return index
@@ -0,0 +1,122 @@
+"""
+cache.py
+On-disk cache of parsed projects.
+
+The fix_* and add_* scripts usually run back to back against the same,
+unchanged project.pbxproj. XcodeProject.load() keeps a pickle of the parsed
+project (object graph and indexes included) and reuses it while the file is
+unchanged:
+
+  * same mtime and size as when the cache was written: the pickle is loaded
+    and project.pbxproj is only mapped again (the pickle leaves out the
+    file's bytes), not read or parsed;
+  * different mtime or size: the file is hashed, and the pickle is still
+    used (and re-stamped) when the sha256 matches, e.g. after a checkout
+    that rewrote identical contents;
+  * anything else, or a change to pbxtool itself: the project is parsed
+    again and the cache replaced.
+
+Unpickling runs code, so the pickles live in the user's own cache folder
+(~/Library/Caches/pbxtool on macOS, $XDG_CACHE_HOME/pbxtool or
+~/.cache/pbxtool elsewhere), one per project keyed by the sha256 of its
+absolute path, never next to the project where a checkout could plant one.
+"""
+
+import hashlib
+import os
+import pickle
+import sys
+from pathlib import Path
+
+from .parser import read_buffer
+
+CACHE_NAME = 'pbxtool'
+
+PACKAGE_DIR = Path(__file__).parent
+
+
+def cache_dir():
+    """Per-user folder for the pickles."""
+    if sys.platform == 'darwin':
+        base = Path.home() / 'Library' / 'Caches'
+    else:
+        base = Path(os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache')
+    return base / CACHE_NAME
+
+
+def cache_path(project_file):
+    key = hashlib.sha256(os.fsencode(Path(project_file).resolve())).hexdigest()
+    return cache_dir() / f'{key}.pickle'
+
+
+def code_stamp():
+    """Changes whenever a pbxtool module changes, so old pickles are ignored."""
+    return sorted(
+        (module.name, module.stat().st_mtime_ns, module.stat().st_size)
+        for module in PACKAGE_DIR.glob('*.py')
+    )
+
+
+def file_stamp(project_file):
+    stat = os.stat(project_file)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def read_header(handle):
+    header = pickle.load(handle)
+    if not isinstance(header, dict) or header.get('code') != code_stamp():
+        return None
+    return header
+
+
+def load(project_file):
+    """Cached XcodeProject for `project_file`, or None when it is stale."""
+    project_file = Path(project_file)
+    path = cache_path(project_file)
+    try:
+        with open(path, 'rb') as handle:
+            header = read_header(handle)
+            if header is None:
+                return None
+            stamp = file_stamp(project_file)
+            buffer = read_buffer(project_file)
+            if header['stamp'] != stamp and header['sha256'] != hashlib.sha256(buffer).hexdigest():
+                return None
+            project = pickle.load(handle)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, KeyError):
+        return None
+    project.path = project_file
+    project.buffer = buffer
+    if header['stamp'] != stamp:
+        store(project)
+    return project
+
+
+def store(project):
+    """Write `project` (which must match its file on disk) to the cache."""
+    if project.path is None or project.modified:
+        return False
+    path = cache_path(project.path)
+    header = {
+        'code': code_stamp(),
+        'stamp': file_stamp(project.path),
+        'sha256': hashlib.sha256(project.buffer).hexdigest(),
+    }
+    tmp = path.with_suffix('.tmp')
+    try:
+        path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        with open(tmp, 'wb') as handle:
+            pickle.dump(header, handle, pickle.HIGHEST_PROTOCOL)
+            pickle.dump(project, handle, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except OSError:
+        return False
+    return True
+
+
+def clear(project_file):
+    """Delete the cached parse of `project_file`, if any."""
+    try:
+        cache_path(project_file).unlink()
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,145 @@
+"""
+checks.py
+Project health checks shared by the CLI and the fix_* scripts.
+
+Every check takes a parsed XcodeProject and works from the resolved object
+graph plus one filesystem snapshot, so running all of them costs one walk
+of the project folder and no per-file stat calls.
+"""
+
+import os
+
+from .paths import PathResolver
+from .snapshot import snapshot
+
+# References that are bundles or generated files rather than plain files.
+SKIP_SUFFIXES = ('.xcassets', '.entitlements', '.storekit', '.app')
+
+# sourceTree values that point into the project folder.
+DISK_TREES = ('<group>', 'SOURCE_ROOT', '<absolute>')
+
+# Folders scanned for source files that no reference points at.
+ORPHAN_DIRS = ('Views', 'Managers', 'Models', 'Extensions', 'Components', 'Widgets', 'Intents', 'Libraries')
+
+
+def missing_files(project, resolver=None, files=None):
+    """Split file references into (missing, existing) lists."""
+    resolver = resolver or PathResolver(project)
+    files = files or snapshot(resolver.source_root)
+    missing = []
+    existing = []
+    for ref in project.file_references:
+        file_path = ref.path
+        if not file_path or any(skip in file_path for skip in SKIP_SUFFIXES):
+            continue
+        # SDK frameworks and build products don't live in the project directory
+        if ref.source_tree not in DISK_TREES:
+            continue
+        # None means the reference isn't reachable from mainGroup
+        full_path = resolver.resolve(ref)
+        if full_path is None:
+            continue
+        if files.exists(full_path):
+            existing.append(ref)
+        else:
+            missing.append(ref)
+    return missing, existing
+
+
+def orphaned_files(project, resolver=None, files=None, dirs=ORPHAN_DIRS, suffix='.swift'):
+    """Paths (relative to the project folder) of files no reference points at."""
+    resolver = resolver or PathResolver(project)
+    files = files or snapshot(resolver.source_root)
+    candidates = {
+        rel_path
+        for dir_name in dirs
+        for rel_path in files.files_under(dir_name, suffix)
+    }
+    return sorted(rel_path for rel_path in candidates if not resolver.is_referenced(rel_path))
+
+
+def groups_with_paths(project):
+    """{group ID: path} for every group that sets its own folder."""
+    return {
+        group.id: group.path
+        for group in project.groups
+        if group.path and group.path != '.'
+    }
+
+
+def suffix_trie(parts):
+    """Trie of every trailing run of `parts`.
+
+    Each run ends in a node whose None key holds its length, so walking a
+    path down the trie finds the longest leading run of the path that
+    repeats the end of `parts`.
+    """
+    trie = {}
+    for start in range(len(parts)):
+        node = trie
+        for part in parts[start:]:
+            node = node.setdefault(part, {})
+        node[None] = len(parts) - start
+    return trie
+
+
+def repeated_prefix(trie, parts):
+    """Number of leading `parts` that repeat the folder `trie` was built from."""
+    node = trie
+    longest = 0
+    # The file name itself never counts as a repeated folder
+    for part in parts[:-1]:
+        node = node.get(part)
+        if node is None:
+            break
+        longest = node.get(None, longest)
+    return longest
+
+
+def duplicate_paths(project, resolver=None, files=None, refs=None):
+    """File references whose path repeats the folders of their own group.
+
+    A reference in the group for Views/Components with the path
+    `Components/Card.swift` or `Views/Components/Card.swift` should be just
+    `Card.swift`. Each group's folder chain is turned into a suffix trie
+    once, and every reference walks the trie of its parent only, so a path
+    that merely starts with the name of some unrelated group is left alone
+    and the cost is O(references x depth). With a snapshot in `files`, a
+    reference whose current path exists on disk while the stripped one
+    doesn't is left alone too. `refs` limits the check to those references.
+
+    Returns one dict per reference with its ID, the old and new path and
+    the repeated folder prefix that was stripped.
+    """
+    resolver = resolver or PathResolver(project)
+    tries = {}
+    duplicates = []
+    for ref in project.file_references if refs is None else refs:
+        file_path = ref.path
+        if not file_path or ref.source_tree != '<group>':
+            continue
+        group = project.parent_of(ref.id)
+        if group is None:
+            continue
+        if group.id not in tries:
+            folder = resolver.relative(group)
+            tries[group.id] = suffix_trie(folder.split(os.sep)) if folder and folder != '.' else None
+        trie = tries[group.id]
+        if trie is None:
+            continue
+        parts = file_path.split('/')
+        count = repeated_prefix(trie, parts)
+        if not count:
+            continue
+        new_path = '/'.join(parts[count:])
+        if files is not None:
+            folder = resolver.resolve(group)
+            if files.exists(os.path.join(folder, file_path)) and not files.exists(os.path.join(folder, new_path)):
+                continue
+        duplicates.append({
+            'id': ref.id,
+            'old': file_path,
+            'new': new_path,
+            'group': '/'.join(parts[:count]),
+        })
+    return duplicates
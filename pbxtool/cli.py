@@ -0,0 +1,611 @@
+"""
+cli.py
+`python3 -m pbxtool`: one entry point for the project tools.
+
+    python3 -m pbxtool check -p Itinero.xcodeproj
+    python3 -m pbxtool orphans
+    python3 -m pbxtool validate --json
+    python3 -m pbxtool add Managers/ApplePlacesManager.swift --target Itinero
+    python3 -m pbxtool add --manifest project_files.json
+    python3 -m pbxtool remove Views/OldView.swift
+    python3 -m pbxtool fix-paths --dry-run
+    python3 -m pbxtool fix-paths --plan fix.json + apply fix.json
+    python3 -m pbxtool backup list
+    python3 -m pbxtool check + orphans + fix-paths
+    python3 -m pbxtool watch --dir Managers --dir Views
+    python3 -m pbxtool workspace --also Developer/SwiftUI/Triply/Triply.xcodeproj
+    python3 -m pbxtool log build_output.log --category deprecation
+    python3 -m pbxtool fix-from-log build_errors.log --dry-run
+    python3 -m pbxtool diff old.pbxproj Itinero.xcodeproj/project.pbxproj
+    python3 -m pbxtool merge BASE OURS THEIRS
+    python3 -m pbxtool bench --sizes 1000 10000 100000
+    python3 -m pbxtool daemon start
+
+Without -p the single .xcodeproj in the current directory is used. Several
+commands separated by `+` run in one process against one parsed project.
+Subsystems are imported inside the command that needs them, so `check`
+doesn't load the backup store and `backup` doesn't load the parser.
+"""
+
+import argparse
+import os
+import sys
+
+from .edits import PHASE_ISAS, CommandError, commit, find_group, find_phases, queue_file, resolver_for
+
+SEPARATOR = '+'
+
+
+def find_project(directory='.'):
+    """The single .xcodeproj in `directory`."""
+    found = sorted(name for name in os.listdir(directory) if name.endswith('.xcodeproj'))
+    if len(found) != 1:
+        listing = ', '.join(found) or 'none'
+        raise CommandError(f"Pass the project with -p (found {len(found)} .xcodeproj here: {listing})")
+    return os.path.join(directory, found[0])
+
+
+def project_file(path):
+    """Absolute path of the project.pbxproj for a .xcodeproj or pbxproj path."""
+    path = os.path.abspath(path)
+    if path.endswith('.xcodeproj'):
+        path = os.path.join(path, 'project.pbxproj')
+    if not os.path.isfile(path):
+        raise CommandError(f"No project file at {path}")
+    return path
+
+
+class Session:
+    """Projects loaded by this process, reused by every command it runs."""
+
+    def __init__(self):
+        self.projects = {}
+
+    def project(self, path=None):
+        """Parsed project at `path`, reloaded when the file changed on disk."""
+        from . import load_project
+
+        path = project_file(path or find_project())
+        stat = os.stat(path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        cached = self.projects.get(path)
+        if cached is not None and cached[1] == stamp and not cached[0].modified:
+            return cached[0]
+        project = load_project(path)
+        self.projects[path] = (project, stamp)
+        return project
+
+    def saved(self, project):
+        """Record the new stamp of a project this session just wrote."""
+        stat = os.stat(project.path)
+        self.projects[str(project.path)] = (project, (stat.st_mtime_ns, stat.st_size))
+
+    def run(self, argv, default_project=None):
+        """Run one command; returns (exit code, project path used)."""
+        parser = build_parser()
+        try:
+            args, extra = parser.parse_known_args(argv)
+            if getattr(args, 'passthrough', False):
+                # Commands with their own parser get everything after the
+                # command name, in order
+                args.args = argv[argv.index(args.command) + 1:]
+            elif extra:
+                parser.error(f"unrecognized arguments: {' '.join(extra)}")
+            args.project = args.project or default_project
+            return args.handler(self, args), args.project
+        except CommandError as error:
+            print(f"❌ {error}")
+            return 2, default_project
+        except SystemExit as error:
+            # argparse exits on --help and on usage errors
+            return error.code or 0, default_project
+
+    def run_all(self, argv):
+        """Run `+`-separated commands in order.
+
+        Findings (exit code 1) don't stop the chain; errors (2) do. Returns
+        the highest exit code seen.
+        """
+        segments = [[]]
+        for arg in argv:
+            if arg == SEPARATOR:
+                segments.append([])
+            else:
+                segments[-1].append(arg)
+        project = None
+        worst = 0
+        for segment in segments:
+            code, project = self.run(segment, project)
+            worst = max(worst, code)
+            if code >= 2:
+                break
+        return worst
+
+
+# Commands
+
+def cmd_check(session, args):
+    from .checks import duplicate_paths, missing_files
+    from .snapshot import snapshot
+
+    project = session.project(args.project)
+    resolver = resolver_for(project)
+    files = snapshot(resolver.source_root)
+    missing, existing = missing_files(project, resolver, files)
+    duplicates = duplicate_paths(project, resolver, files)
+
+    print(f"🔍 Checked {len(missing) + len(existing)} file reference(s)")
+    if missing:
+        print(f"⚠️  {len(missing)} missing file(s):")
+        for ref in missing:
+            print(f"   • {resolver.relative(ref) or ref.path}")
+    else:
+        print("✅ No missing files found")
+    if duplicates:
+        print(f"⚠️  {len(duplicates)} duplicate path prefix(es):")
+        for fix in duplicates:
+            print(f"   • {fix['old']} → {fix['new']}")
+    else:
+        print("✅ No duplicate paths found")
+    return 1 if missing or duplicates else 0
+
+
+def cmd_orphans(session, args):
+    from .checks import ORPHAN_DIRS, orphaned_files
+
+    project = session.project(args.project)
+    orphaned = orphaned_files(project, resolver_for(project), dirs=args.dir or ORPHAN_DIRS, suffix=args.ext)
+    if not orphaned:
+        print("✅ No orphaned files found")
+        return 0
+    print(f"⚠️  {len(orphaned)} file(s) not in the project:")
+    for rel_path in orphaned:
+        print(f"   • {rel_path}")
+    return 1
+
+
+def cmd_validate(session, args):
+    from .validate import ERROR, summarize, validate
+
+    project = session.project(args.project)
+    findings = list(validate(project))
+    summary = summarize(findings)
+    if args.json:
+        import json
+        print(json.dumps({
+            'project': str(project.path),
+            'objects': len(project.objects),
+            'errors': summary[ERROR],
+            'warnings': summary['warning'],
+            'codes': summary['codes'],
+            'findings': findings,
+        }, indent=2))
+    elif not findings:
+        print(f"✅ {len(project.objects)} object(s), no broken references")
+    else:
+        print(f"🔍 {len(project.objects)} object(s): {summary[ERROR]} error(s), {summary['warning']} warning(s)")
+        for item in findings:
+            marker = '❌' if item['severity'] == ERROR else '⚠️ '
+            print(f"   {marker} [{item['code']}] {item['message']}")
+    return 1 if summary[ERROR] else 0
+
+
+def cmd_fix_paths(session, args):
+    from .checks import duplicate_paths
+    from .snapshot import snapshot
+
+    project = session.project(args.project)
+    resolver = resolver_for(project)
+    duplicates = duplicate_paths(project, resolver, snapshot(resolver.source_root))
+    if not duplicates:
+        print("✅ No duplicate paths found")
+        return 0
+    for fix in duplicates:
+        print(f"   • {fix['old']} → {fix['new']}  (group: {fix['group']})")
+    if args.dry_run:
+        print(f"💡 {len(duplicates)} path(s) would change")
+        return 0
+    transaction = project.transaction()
+    for fix in duplicates:
+        transaction.set_value(fix['id'], 'path', fix['new'])
+    return commit(session, transaction, 'pbxtool fix-paths', backup=not args.no_backup, plan=args.plan)
+
+
+def cmd_add(session, args):
+    from .filetypes import file_type_for
+
+    if not args.files and not args.manifest:
+        raise CommandError("Pass the files to add or --manifest")
+    project = session.project(args.project)
+    resolver = resolver_for(project)
+    transaction = project.transaction()
+
+    if args.manifest:
+        from .manifest import Manifest
+
+        _, report = Manifest.load(args.manifest).plan(project, transaction, resolver)
+        if not report:
+            print("⚠️  The manifest matched no files")
+        for entry in report:
+            print(f"   • {entry['path']} → {entry['group']}, {', '.join(entry['targets']) or 'no target'} "
+                  f"{entry['phase']} ({'queued' if entry['state'] == 'queued' else 'already in project'})")
+
+    if args.files:
+        phases = find_phases(project, args.target, args.phase)
+        for file_path in args.files:
+            full_path = os.path.abspath(file_path)
+            group = find_group(project, resolver, args.group, os.path.dirname(full_path))
+            group_dir = resolver.resolve(group)
+            if group_dir is None:
+                raise CommandError(f"Can't tell which folder group {group.display_name} maps to")
+            pending = len(transaction)
+            queue_file(
+                transaction,
+                os.path.relpath(full_path, group_dir),
+                group.id,
+                phases,
+                args.type or file_type_for(full_path),
+            )
+            state = 'queued' if len(transaction) > pending else 'already in project'
+            print(f"   • {file_path} → {group.display_name or 'main group'} ({state})")
+
+    if args.dry_run:
+        print(f"💡 {len(transaction)} change(s) would be made")
+        return 0
+    return commit(session, transaction, 'pbxtool add', backup=not args.no_backup, plan=args.plan)
+
+
+def cmd_remove(session, args):
+    project = session.project(args.project)
+    resolver = resolver_for(project)
+    by_path = {}
+    for obj in (*project.file_references, *project.groups):
+        path = resolver.resolve(obj)
+        if path is not None:
+            by_path.setdefault(path, []).append(obj.id)
+
+    doomed = []
+    for item in args.items:
+        object_ids = [item] if item in project else by_path.get(os.path.abspath(item), [])
+        if not object_ids:
+            raise CommandError(f"Nothing in the project matches {item}")
+        for object_id in object_ids:
+            print(f"   • {item} ({project[object_id].isa} {object_id})")
+            doomed.append(object_id)
+    transaction = project.transaction()
+    transaction.remove_many(doomed, prune_empty_groups=args.prune)
+    return commit(session, transaction, 'pbxtool remove', backup=not args.no_backup, plan=args.plan)
+
+
+def cmd_apply(session, args):
+    from .plan import PlanError, apply_plan, describe, read_plan
+
+    try:
+        plan = read_plan(args.plan)
+    except (OSError, ValueError) as error:
+        raise CommandError(f"Can't read plan {args.plan}: {error}")
+    if not plan.get('project'):
+        raise CommandError(f"Plan {args.plan} doesn't name a project file")
+    project = session.project(plan['project'])
+    try:
+        backup = apply_plan(project, plan, backup=not args.no_backup)
+    except PlanError as error:
+        raise CommandError(str(error))
+    if backup is None:
+        print("✅ Nothing to change")
+        return 0
+    session.saved(project)
+    if backup:
+        print(f"✅ Backup created: {backup['id']}")
+    print(f"✅ Applied {describe(plan)} to {project.path}")
+    return 0
+
+
+def cmd_backup(session, args):
+    from . import backup
+
+    action, *rest = args.args or ['list']
+    return backup.main([action, args.project or find_project(), *rest])
+
+
+def cmd_watch(session, args):
+    from .checks import ORPHAN_DIRS
+    from .watch import Watcher, backend_for
+
+    watcher = Watcher(
+        session,
+        args.project or find_project(),
+        dirs=args.dir or ORPHAN_DIRS,
+        suffix=args.ext,
+        targets=args.target,
+        phase=args.phase,
+        file_type=args.type,
+        delay=args.delay,
+        backup=not args.no_backup,
+    )
+    if not watcher.dirs:
+        raise CommandError("None of the folders to watch exist")
+    return watcher.run(backend_for(watcher, args.poll, args.interval))
+
+
+def cmd_workspace(session, args):
+    from .workspace import process, workspace_projects
+
+    workspaces = args.workspaces or sorted(name for name in os.listdir('.') if name.endswith('.xcworkspace'))
+    paths = []
+    for workspace in workspaces:
+        try:
+            members = workspace_projects(workspace)
+        except (OSError, SyntaxError) as error:
+            raise CommandError(f"Can't read {workspace}: {error}")
+        paths.extend(members)
+    paths.extend(os.path.abspath(path) for path in args.also or ())
+    paths = list(dict.fromkeys(paths))
+    if not paths:
+        raise CommandError("No projects found; pass a .xcworkspace or --also")
+
+    reports = process(paths, fix=args.fix, backup=not args.no_backup, jobs=args.jobs)
+    if args.json:
+        import json
+        print(json.dumps(reports, indent=2))
+    else:
+        for report in reports:
+            print(f"📦 {os.path.relpath(report['project'])}")
+            if report['error']:
+                print(f"   ❌ {report['error']}")
+                continue
+            print(f"   🔍 {report['references']} file reference(s), {len(report['missing'])} missing, "
+                  f"{len(report['duplicates'])} duplicate path(s), {len(report['orphans'])} orphaned file(s)")
+            for rel_path in report['missing'][:10]:
+                print(f"      • missing: {rel_path}")
+            if len(report['missing']) > 10:
+                print(f"      ... and {len(report['missing']) - 10} more")
+            if report['fixed']:
+                print(f"   ✅ Applied {report['fixed']} fix(es)" + (f", backup {report['backup']}" if report['backup'] else ''))
+        totals = {key: sum(len(report[key]) for report in reports) for key in ('missing', 'duplicates', 'orphans')}
+        errors = sum(1 for report in reports if report['error'])
+        print(f"📊 {len(reports)} project(s): {totals['missing']} missing, {totals['duplicates']} duplicate path(s), "
+              f"{totals['orphans']} orphaned file(s), {errors} error(s)")
+    if any(report['error'] for report in reports):
+        return 2
+    if args.fix:
+        return 0
+    return 1 if any(report['missing'] or report['duplicates'] for report in reports) else 0
+
+
+def cmd_log(session, args):
+    from .buildlog import LOG_FILES, index_logs
+
+    paths = args.logs or [name for name in LOG_FILES if os.path.isfile(name)]
+    if not paths:
+        raise CommandError(f"No build log here (looked for {', '.join(LOG_FILES)}); pass one")
+    try:
+        index = index_logs(paths)
+    except OSError as error:
+        raise CommandError(f"Can't read {error.filename}: {error.strerror}")
+    items = index.query(file=args.file, severity=args.severity, category=args.category)
+    summary = index.summary()
+    if args.json:
+        import json
+        print(json.dumps({
+            'logs': index.logs,
+            'lines': index.lines,
+            'summary': summary,
+            'files': index.files(),
+            'diagnostics': items,
+        }, indent=2))
+        return 1 if any(item['severity'] == 'error' for item in items) else 0
+
+    root = index.root()
+    print(f"🔍 {index.lines} line(s) in {', '.join(index.logs)}: {summary['error']} error(s), "
+          f"{summary['warning']} warning(s), {summary['repeats']} repeat(s) folded")
+    if summary['categories']:
+        print("   " + ', '.join(f"{name} {count}" for name, count in sorted(summary['categories'].items())))
+    if not items:
+        print("✅ No matching errors or warnings")
+        return 0
+    for item in items:
+        marker = '❌' if item['severity'] == 'error' else '⚠️ '
+        where = 'build'
+        if item['file']:
+            where = os.path.relpath(item['file'], root) if root else item['file']
+            where += f":{item['line']}" + (f":{item['column']}" if item['column'] else '')
+        repeats = f" (×{item['count']})" if item['count'] > 1 else ''
+        print(f"   {marker} {where}: [{item['category']}] {item['message']}{repeats}")
+    return 1 if any(item['severity'] == 'error' for item in items) else 0
+
+
+def cmd_fix_from_log(session, args):
+    from .buildfix import queue_fixes, triage
+    from .buildlog import LOG_FILES, index_logs
+
+    paths = args.logs or [name for name in LOG_FILES if os.path.isfile(name)]
+    if not paths:
+        raise CommandError(f"No build log here (looked for {', '.join(LOG_FILES)}); pass one")
+    try:
+        index = index_logs(paths)
+    except OSError as error:
+        raise CommandError(f"Can't read {error.filename}: {error.strerror}")
+    project = session.project(args.project)
+    resolver = resolver_for(project)
+    entries = triage(project, resolver, index)
+    if not entries:
+        print(f"✅ No missing input files reported in {', '.join(index.logs)}")
+        return 0
+    markers = {'exists': '✅', 'repair': '🔧', 'remove': '🗑️ ', 'unmatched': '❓'}
+    for entry in entries:
+        detail = {
+            'exists': "file exists now (stale log)",
+            'repair': f"path → {entry['new']}",
+            'remove': f"remove {entry['ref']} and {len(entry['build_files'])} build file(s)",
+            'unmatched': "no file reference points here",
+        }[entry['action']]
+        print(f"   {markers[entry['action']]} {entry['path']}: {detail}")
+    transaction = project.transaction()
+    queue_fixes(transaction, entries)
+    if args.dry_run:
+        print(f"💡 {len(transaction)} change(s) would be made")
+        return 0
+    return commit(session, transaction, 'pbxtool fix-from-log', backup=not args.no_backup, plan=args.plan)
+
+
+def cmd_diff(session, args):
+    from .merge import describe, diff_projects, read_project
+
+    old, new = read_project(args.old), read_project(args.new)
+    changes = diff_projects(old, new)
+    if args.json:
+        import json
+        print(json.dumps(changes, indent=2))
+    else:
+        for object_id in changes['added']:
+            print(f"+ {describe(new, object_id)}")
+        for object_id in changes['removed']:
+            print(f"- {describe(old, object_id)}")
+        for object_id, keys in changes['changed'].items():
+            print(f"~ {describe(new, object_id)}: {', '.join(keys)}")
+    return 1 if any(changes.values()) else 0
+
+
+def cmd_merge(session, args):
+    from .merge import install_driver, merge_files
+
+    if args.install:
+        return install_driver()
+    if len(args.files) != 3:
+        raise CommandError("merge needs BASE OURS THEIRS (or --install)")
+    return merge_files(*args.files, output=args.output)
+
+
+def cmd_bench(session, args):
+    from . import bench
+
+    return bench.main(args.args)
+
+
+def cmd_daemon(session, args):
+    from . import daemon
+
+    return daemon.main([args.action, *(['--socket', args.socket] if args.socket else [])])
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='pbxtool',
+        description="Check, fix and edit Xcode project files.",
+        epilog="Separate several commands with ' + ' to run them in one process.",
+    )
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('-p', '--project', default=argparse.SUPPRESS,
+                        help="the .xcodeproj (default: the one in the current directory)")
+    common.add_argument('--no-backup', action='store_true', default=argparse.SUPPRESS,
+                        help="don't back up project.pbxproj before writing it")
+    parser.add_argument('-p', '--project', help=argparse.SUPPRESS)
+    parser.add_argument('--no-backup', action='store_true', help=argparse.SUPPRESS)
+    commands = parser.add_subparsers(dest='command', required=True, metavar='command')
+
+    check = commands.add_parser('check', parents=[common], help="report missing files and duplicate paths")
+    check.set_defaults(handler=cmd_check)
+
+    orphans = commands.add_parser('orphans', parents=[common], help="list source files no reference points at")
+    orphans.add_argument('--dir', action='append', help="folder to scan (repeatable)")
+    orphans.add_argument('--ext', default='.swift', help="file extension to look for (default: .swift)")
+    orphans.set_defaults(handler=cmd_orphans)
+
+    validate = commands.add_parser('validate', parents=[common],
+                                   help="check that every object reference points at a valid object")
+    validate.add_argument('--json', action='store_true', help="print the findings as JSON")
+    validate.set_defaults(handler=cmd_validate)
+
+    fix_paths = commands.add_parser('fix-paths', parents=[common], help="strip group folders repeated in file paths")
+    fix_paths.add_argument('--dry-run', action='store_true', help="show the changes without writing them")
+    fix_paths.add_argument('--plan', metavar='FILE', help="write a reviewable plan of the changes instead (see apply)")
+    fix_paths.set_defaults(handler=cmd_fix_paths)
+
+    add = commands.add_parser('add', parents=[common], help="add files to a group and a target's build phase")
+    add.add_argument('files', nargs='*')
+    add.add_argument('--manifest', help="JSON manifest of globs, groups, targets and phases (see manifest.py)")
+    add.add_argument('--group', help="group name or path (default: the group for the file's folder)")
+    add.add_argument('--target', action='append', help="target name, repeatable (default: the app target)")
+    add.add_argument('--phase', choices=[*PHASE_ISAS, 'none'], default='sources')
+    add.add_argument('--type', help="lastKnownFileType (default: from the extension)")
+    add.add_argument('--dry-run', action='store_true', help="show the changes without writing them")
+    add.add_argument('--plan', metavar='FILE', help="write a reviewable plan of the changes instead (see apply)")
+    add.set_defaults(handler=cmd_add)
+
+    remove = commands.add_parser('remove', parents=[common], help="remove files or groups by path or ID")
+    remove.add_argument('items', nargs='+')
+    remove.add_argument('--prune', action='store_true', help="also remove groups the removal leaves empty")
+    remove.add_argument('--plan', metavar='FILE', help="write a reviewable plan of the changes instead (see apply)")
+    remove.set_defaults(handler=cmd_remove)
+
+    apply = commands.add_parser('apply', parents=[common], help="write the changes of a plan made with --plan")
+    apply.add_argument('plan', help="plan file")
+    apply.set_defaults(handler=cmd_apply)
+
+    backup = commands.add_parser('backup', parents=[common], help="list, create, restore, prune or import backups")
+    backup.add_argument('args', nargs=argparse.REMAINDER, help="list | create | restore ID | prune | import")
+    backup.set_defaults(handler=cmd_backup)
+
+    watch = commands.add_parser('watch', parents=[common], help="add new files to the project as they appear")
+    watch.add_argument('--dir', action='append', help="folder to watch (repeatable)")
+    watch.add_argument('--ext', default='.swift', help="file extension to watch (default: .swift)")
+    watch.add_argument('--target', action='append', help="target name, repeatable (default: the app target)")
+    watch.add_argument('--phase', choices=[*PHASE_ISAS, 'none'], default='sources')
+    watch.add_argument('--type', help="lastKnownFileType (default: from the extension)")
+    watch.add_argument('--delay', type=float, default=0.5, help="seconds of quiet before a batch is applied")
+    watch.add_argument('--poll', action='store_true', help="rescan instead of using inotify")
+    watch.add_argument('--interval', type=float, default=1.0, help="seconds between rescans with --poll")
+    watch.set_defaults(handler=cmd_watch)
+
+    workspace = commands.add_parser('workspace', parents=[common],
+                                    help="check (and fix) every project of one or more workspaces in parallel")
+    workspace.add_argument('workspaces', nargs='*', help=".xcworkspace bundles (default: every one in the current directory)")
+    workspace.add_argument('--also', action='append', help="extra .xcodeproj to include (repeatable)")
+    workspace.add_argument('--fix', action='store_true', help="remove missing references and strip duplicate path prefixes")
+    workspace.add_argument('--jobs', type=int, help="worker processes (default: one per project, up to the CPU count)")
+    workspace.add_argument('--json', action='store_true', help="print the reports as JSON")
+    workspace.set_defaults(handler=cmd_workspace)
+
+    log = commands.add_parser('log', help="errors and warnings from xcodebuild logs, by file")
+    log.add_argument('logs', nargs='*', help="log files, '-' for stdin (default: build.log and build_output.log)")
+    log.add_argument('--file', help="only this source file (a path suffix such as Views/ContentView.swift)")
+    log.add_argument('--severity', choices=['error', 'warning'])
+    log.add_argument('--category', help="deprecation, actor-isolation, concurrency, unused, unreachable, "
+                                        "project, signing, configuration or other")
+    log.add_argument('--json', action='store_true', help="print the index as JSON")
+    log.set_defaults(handler=cmd_log, project=None, no_backup=False)
+
+    fix_from_log = commands.add_parser('fix-from-log', parents=[common],
+                                       help="repair or remove the references build logs report as missing")
+    fix_from_log.add_argument('logs', nargs='*', help="log files, '-' for stdin (default: the build*.log files here)")
+    fix_from_log.add_argument('--dry-run', action='store_true', help="show the changes without writing them")
+    fix_from_log.add_argument('--plan', metavar='FILE', help="write a reviewable plan of the changes instead (see apply)")
+    fix_from_log.set_defaults(handler=cmd_fix_from_log)
+
+    diff = commands.add_parser('diff', help="list objects added, removed and changed between two project files")
+    diff.add_argument('old')
+    diff.add_argument('new')
+    diff.add_argument('--json', action='store_true', help="print the changes as JSON")
+    diff.set_defaults(handler=cmd_diff, project=None, no_backup=False)
+
+    merge = commands.add_parser('merge', help="three-way merge of project files (git merge driver)")
+    merge.add_argument('files', nargs='*', metavar='BASE OURS THEIRS')
+    merge.add_argument('-o', '--output', help="write the result here instead of over OURS")
+    merge.add_argument('--install', action='store_true', help="register the merge driver in .git/config")
+    merge.set_defaults(handler=cmd_merge, project=None, no_backup=False)
+
+    bench = commands.add_parser('bench', help="benchmark the engine on synthetic projects")
+    bench.add_argument('args', nargs=argparse.REMAINDER, help="options for pbxtool.bench (see --help there)")
+    bench.set_defaults(handler=cmd_bench, project=None, no_backup=False, passthrough=True)
+
+    daemon = commands.add_parser('daemon', help="start, stop or query the background daemon")
+    daemon.add_argument('action', choices=['start', 'stop', 'status', 'run'])
+    daemon.add_argument('--socket', help="socket path (default: $PBXTOOL_SOCKET or a per-user file in $TMPDIR)")
+    daemon.set_defaults(handler=cmd_daemon, project=None, no_backup=False)
+    return parser
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    return Session().run_all(argv)
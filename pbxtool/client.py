@@ -0,0 +1,57 @@
+"""
+client.py
+Thin client for the pbxtool daemon.
+
+    python3 -m pbxtool.client check
+    python3 -m pbxtool.client add Managers/NewManager.swift
+
+Takes the same arguments as `python3 -m pbxtool`. When a daemon is running
+the command is sent to it and only its output comes back; otherwise the
+command runs in this process, so scripts can call the client either way.
+This module only imports what it needs to talk to the socket.
+"""
+
+import json
+import os
+import socket
+import sys
+
+
+def socket_path():
+    """Where the daemon listens: $PBXTOOL_SOCKET or a per-user file in $TMPDIR."""
+    path = os.environ.get('PBXTOOL_SOCKET')
+    if path:
+        return path
+    return os.path.join(os.environ.get('TMPDIR', '/tmp'), f'pbxtool-{os.getuid()}.sock')
+
+
+def request(message, path=None, timeout=60):
+    """Send one request to the daemon and return its decoded response."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(path or socket_path())
+        sock.sendall(json.dumps(message).encode('utf-8') + b'\n')
+        with sock.makefile('rb') as stream:
+            line = stream.readline()
+    if not line:
+        raise ConnectionError("Daemon closed the connection")
+    return json.loads(line)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    # Managing the daemon never goes through the daemon itself
+    if not argv or argv[0] != 'daemon':
+        try:
+            response = request({'argv': argv, 'cwd': os.getcwd()})
+        except OSError:
+            pass
+        else:
+            sys.stdout.write(response['output'])
+            return response['code']
+    from .cli import main as run_here
+    return run_here(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
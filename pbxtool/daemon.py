@@ -0,0 +1,161 @@
+"""
+daemon.py
+Keep parsed projects in memory between commands.
+
+    python3 -m pbxtool daemon start      # also: stop, status, run (foreground)
+    python3 -m pbxtool.client check      # answered by the daemon when it runs
+
+The daemon listens on a Unix socket and runs CLI commands in one long-lived
+Session, so the object graph and its indexes stay loaded and a command costs
+a stat of project.pbxproj, a walk of the project folder and the check
+itself. A project is reloaded when its file changes on disk (from the parse
+cache when only the mtime moved). Requests are handled one at a time.
+
+Protocol: the client sends one JSON line, {"argv": [...], "cwd": "..."} or
+{"op": "ping" | "stop"}, and reads one JSON line back,
+{"code": <exit code>, "output": "<everything the command printed>"}.
+"""
+
+import contextlib
+import io
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import traceback
+
+from .cli import Session
+from .client import request, socket_path
+
+
+def socket_in_use(path):
+    """True when a daemon is answering on `path`."""
+    try:
+        request({'op': 'ping'}, path, timeout=1)
+    except OSError:
+        return False
+    return True
+
+
+class Daemon:
+    """Unix-socket server running CLI commands against a shared Session."""
+
+    def __init__(self, path=None):
+        self.path = path or socket_path()
+        self.session = Session()
+        self.running = False
+
+    def handle(self, message):
+        op = message.get('op', 'run')
+        if op == 'ping':
+            return {'code': 0, 'output': f'pbxtool daemon {os.getpid()} on {self.path}\n'}
+        if op == 'stop':
+            self.running = False
+            return {'code': 0, 'output': '✅ Daemon stopped\n'}
+
+        from .snapshot import cached_snapshot
+
+        # Files may have been added or deleted since the last request
+        cached_snapshot.cache_clear()
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+            try:
+                os.chdir(message.get('cwd') or '/')
+                code = self.session.run_all(message.get('argv', []))
+            except Exception:
+                traceback.print_exc()
+                code = 3
+        return {'code': code, 'output': output.getvalue()}
+
+    def serve(self):
+        if os.path.exists(self.path):
+            if socket_in_use(self.path):
+                raise RuntimeError(f"A daemon is already running on {self.path}")
+            os.unlink(self.path)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            server.bind(self.path)
+            os.chmod(self.path, 0o600)
+            server.listen()
+            self.running = True
+            while self.running:
+                connection, _ = server.accept()
+                with connection, connection.makefile('rwb') as stream:
+                    line = stream.readline()
+                    if not line:
+                        continue
+                    try:
+                        response = self.handle(json.loads(line))
+                    except ValueError:
+                        response = {'code': 2, 'output': '❌ Malformed request\n'}
+                    stream.write(json.dumps(response).encode('utf-8') + b'\n')
+                    stream.flush()
+        finally:
+            server.close()
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(self.path)
+
+
+def start(path):
+    """Launch a detached daemon and wait until it answers."""
+    if socket_in_use(path):
+        print(f"✅ Daemon already running on {path}")
+        return 0
+    env = dict(os.environ)
+    package_parent = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, (package_parent, env.get('PYTHONPATH'))))
+    subprocess.Popen(
+        [sys.executable, '-m', 'pbxtool.daemon', 'run', '--socket', path],
+        env=env,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    for _ in range(50):
+        if socket_in_use(path):
+            print(f"✅ Daemon started on {path}")
+            return 0
+        time.sleep(0.1)
+    print(f"❌ Daemon did not come up on {path}")
+    return 1
+
+
+def stop(path):
+    try:
+        response = request({'op': 'stop'}, path, timeout=5)
+    except OSError:
+        print("✅ No daemon running")
+        return 0
+    print(response['output'], end='')
+    return 0
+
+
+def status(path):
+    try:
+        response = request({'op': 'ping'}, path, timeout=1)
+    except OSError:
+        print("⚪ No daemon running")
+        return 1
+    print(f"🟢 {response['output']}", end='')
+    return 0
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='pbxtool daemon', description="Manage the pbxtool daemon")
+    parser.add_argument('action', choices=['start', 'stop', 'status', 'run'])
+    parser.add_argument('--socket', help="socket path (default: $PBXTOOL_SOCKET or a per-user file in $TMPDIR)")
+    args = parser.parse_args(argv)
+    path = args.socket or socket_path()
+    if args.action == 'run':
+        Daemon(path).serve()
+        return 0
+    return {'start': start, 'stop': stop, 'status': status}[args.action](path)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""
+edits.py
+Lookups and queued edits shared by the editing commands: `add`, `remove`,
+`fix-paths` and `fix-from-log` in cli.py, manifests and the watcher.
+
+The lookups raise CommandError for names they can't find, which the CLI
+shows as a message with exit code 2.
+"""
+
+import os
+
+PHASE_ISAS = {
+    'sources': 'PBXSourcesBuildPhase',
+    'resources': 'PBXResourcesBuildPhase',
+    'frameworks': 'PBXFrameworksBuildPhase',
+    'headers': 'PBXHeadersBuildPhase',
+}
+
+
+class CommandError(Exception):
+    """A command could not run; the message is shown and the exit code is 2."""
+
+
+def resolver_for(project):
+    from .paths import PathResolver
+    return PathResolver(project)
+
+
+def find_target(project, name):
+    if name is None:
+        target = project.main_target
+        if target is None:
+            raise CommandError("The project has no targets")
+        return target
+    target = project.target_named(name)
+    if target is None:
+        names = ', '.join(target.name for target in project.targets)
+        raise CommandError(f"No target named {name} (targets: {names})")
+    return target
+
+
+def find_phases(project, names, phase):
+    """The `phase` build phase of each target in `names` (default: the app target)."""
+    if phase == 'none':
+        return []
+    phases = []
+    for name in names or [None]:
+        target = find_target(project, name)
+        found = project.build_phase(target, PHASE_ISAS[phase])
+        if found is None:
+            raise CommandError(f"Target {target.name} has no {phase} build phase")
+        phases.append(found)
+    return phases
+
+
+def queue_file(transaction, path, group_id, phases, file_type):
+    """Queue a file reference built by every phase in `phases`; returns its ID."""
+    file_ref_id, _ = transaction.add_file(
+        path, group_id, phases[0].id if phases else None, file_type=file_type,
+    )
+    for phase in phases[1:]:
+        transaction.add_to_phase(file_ref_id, phase.id)
+    return file_ref_id
+
+
+def queue_membership(transaction, file_ref_id, phases):
+    """Queue build files for the phases in `phases` that don't build `file_ref_id` yet."""
+    current = {phase.id for phase in transaction.project.phases_containing(file_ref_id)}
+    for phase in phases:
+        if phase.id not in current:
+            transaction.add_to_phase(file_ref_id, phase.id)
+
+
+def find_group(project, resolver, name, folder):
+    """Group called (or at path) `name`.
+
+    Without a name, the group for `folder` or for its nearest parent
+    folder that has one (mainGroup for anything in the project folder).
+    """
+    if name:
+        group = project.group_named(name)
+        if group is None:
+            for candidate in project.groups:
+                if resolver.relative(candidate) == os.path.normpath(name):
+                    return candidate
+            raise CommandError(f"No group named {name}")
+        return group
+    group = resolver.group_for(folder)
+    if group is None:
+        raise CommandError(f"No group maps to {folder}; pass --group")
+    return group
+
+
+def commit(session, transaction, label, backup=True, plan=None):
+    """Write the transaction, backing the project up first (unless `backup`
+    is false), or with `plan` only write the plan of it to that file.
+
+    The edits are applied in memory before the backup, so a transaction
+    that turns out to change nothing leaves both the file and the backup
+    store alone.
+    """
+    project = transaction.project
+    if plan:
+        from .plan import describe, make_plan, write_plan
+
+        made = make_plan(transaction, label)
+        write_plan(made, plan)
+        print(f"📝 Plan written to {plan}: {describe(made)}")
+        print(f"💡 Apply it with: python3 -m pbxtool apply {plan}")
+        return 0
+    count = len(transaction)
+    transaction.apply()
+    if not project.modified:
+        print("✅ Nothing to change")
+        return 0
+    if backup:
+        from .backup import backup_project
+        backup = backup_project(project.path, label=label)
+        print(f"✅ Backup created: {backup['id']}")
+    project.save()
+    session.saved(project)
+    print(f"✅ Applied {count} change(s) to {project.path}")
+    return 0
@@ -0,0 +1,87 @@
+"""
+filetypes.py
+lastKnownFileType and default build phase for a file, from its extension.
+
+Uses the same values Xcode writes when a file is dragged into the project.
+"""
+
+import os
+
+FILE_TYPES = {
+    '.swift': 'sourcecode.swift',
+    '.m': 'sourcecode.c.objc',
+    '.mm': 'sourcecode.cpp.objcpp',
+    '.c': 'sourcecode.c.c',
+    '.cc': 'sourcecode.cpp.cpp',
+    '.cpp': 'sourcecode.cpp.cpp',
+    '.h': 'sourcecode.c.h',
+    '.hpp': 'sourcecode.cpp.h',
+    '.metal': 'sourcecode.metal',
+    '.intentdefinition': 'file.intentdefinition',
+    '.mlmodel': 'file.mlmodel',
+    '.xcdatamodeld': 'wrapper.xcdatamodeld',
+    '.plist': 'text.plist.xml',
+    '.xcprivacy': 'text.plist.xml',
+    '.entitlements': 'text.plist.entitlements',
+    '.strings': 'text.plist.strings',
+    '.stringsdict': 'text.plist.stringsdict',
+    '.xcstrings': 'text.json.xcstrings',
+    '.json': 'text.json',
+    '.xcconfig': 'text.xcconfig',
+    '.storekit': 'text',
+    '.txt': 'text',
+    '.csv': 'text',
+    '.md': 'net.daringfireball.markdown',
+    '.html': 'text.html',
+    '.sh': 'text.script.sh',
+    '.py': 'text.script.python',
+    '.yml': 'text.yaml',
+    '.yaml': 'text.yaml',
+    '.png': 'image.png',
+    '.jpg': 'image.jpeg',
+    '.jpeg': 'image.jpeg',
+    '.pdf': 'image.pdf',
+    '.ttf': 'file',
+    '.otf': 'file',
+    '.storyboard': 'file.storyboard',
+    '.xib': 'file.xib',
+    '.xcassets': 'folder.assetcatalog',
+    '.bundle': 'wrapper.plug-in',
+    '.framework': 'wrapper.framework',
+    '.xcframework': 'wrapper.xcframework',
+    '.a': 'archive.ar',
+    '.dylib': 'compiled.mach-o.dylib',
+}
+
+# Folders Xcode treats as a single file.
+PACKAGE_SUFFIXES = frozenset({'.xcassets', '.xcdatamodeld', '.bundle', '.framework', '.xcframework'})
+
+# Types compiled by a Sources phase; frameworks and libraries are linked.
+SOURCE_PREFIXES = ('sourcecode.', 'file.intentdefinition', 'file.mlmodel', 'wrapper.xcdatamodeld')
+LINKED_TYPES = ('wrapper.framework', 'wrapper.xcframework', 'archive.ar', 'compiled.mach-o.dylib')
+
+
+def file_type_for(path):
+    """lastKnownFileType for `path` ('file' when the extension is unknown)."""
+    return FILE_TYPES.get(os.path.splitext(path)[1].lower(), 'file')
+
+
+def phase_for(file_type):
+    """Build phase a file of `file_type` usually belongs to.
+
+    One of 'sources', 'frameworks', 'resources' or 'none' (headers, which
+    only matter to targets with a Headers phase).
+    """
+    if file_type in ('sourcecode.c.h', 'sourcecode.cpp.h'):
+        return 'none'
+    if file_type.startswith(SOURCE_PREFIXES):
+        return 'sources'
+    if file_type in LINKED_TYPES:
+        return 'frameworks'
+    return 'resources'
+
+
+def in_package(rel_path):
+    """True when `rel_path` lies inside a folder Xcode treats as one file."""
+    parents = rel_path.split('/')[:-1]
+    return any(os.path.splitext(part)[1] in PACKAGE_SUFFIXES for part in parents)
@@ -0,0 +1,67 @@
+"""
+ids.py
+Deterministic object IDs.
+
+Object IDs are derived from what the object is rather than drawn at random:
+the sha1 of (kind, scope, path) truncated to Xcode's 24 hex digits, where
+the scope is whatever the object belongs to (the group for a file
+reference or group, the build phase, and so its target, for a build file).
+Adding the same file to the same place therefore always yields the same
+ID, so a script that runs twice finds its own objects with one dictionary
+lookup instead of searching the file text.
+
+A candidate that is already taken by an object of another kind (or by an
+earlier, different key in the same batch) is re-hashed with a counter
+until it is free; the result is still deterministic for a given project.
+"""
+
+import hashlib
+from itertools import count
+
+
+def stable_id(kind, scope, path, salt=0):
+    """24-character uppercase hex ID for (kind, scope, path)."""
+    key = f'{kind}\0{scope or ""}\0{path or ""}'
+    if salt:
+        key += f'\0{salt}'
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:24].upper()
+
+
+class IDAllocator:
+    """Mints stable, collision-checked IDs for one project."""
+
+    def __init__(self, project):
+        self.project = project
+        self.assigned = {}
+        self.taken = set()
+
+    def allocate(self, kind, scope, path):
+        """ID for the `kind` object identified by `path` within `scope`.
+
+        Returns the ID of the existing object when this exact object has
+        already been added to the project (check with `object_id in
+        project`), and a fresh unused ID otherwise.
+        """
+        key = (kind, scope, path)
+        object_id = self.assigned.get(key)
+        if object_id is not None:
+            return object_id
+        objects = self.project.objects
+        for salt in count():
+            object_id = stable_id(kind, scope, path, salt)
+            if object_id in self.taken:
+                continue
+            existing = objects.get(object_id)
+            if existing is None or existing.isa == kind:
+                break
+        self.assigned[key] = object_id
+        self.taken.add(object_id)
+        return object_id
+
+    def allocate_many(self, kind, scope, paths):
+        """IDs for many objects of one kind in one scope, in order."""
+        return [self.allocate(kind, scope, path) for path in paths]
+
+    def reserve(self, object_id):
+        """Keep `object_id` from being handed out."""
+        self.taken.add(object_id)
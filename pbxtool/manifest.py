@@ -0,0 +1,245 @@
+"""
+manifest.py
+Add files to the project from a declarative manifest.
+
+    python3 -m pbxtool add --manifest project_files.json
+
+A manifest is a JSON object with a default target and a list of rules:
+
+    {
+      "target": "Itinero",
+      "rules": [
+        {"files": "Managers/*Places*.swift"},
+        {"files": "Models/*.swift", "targets": ["Itinero", "TriplyWidgetExtensionExtension"]},
+        {"files": ["Views/**/*.swift"], "exclude": "Views/Previews/**"},
+        {"files": "PrivacyInfo.xcprivacy", "group": ".", "phase": "resources"}
+      ]
+    }
+
+Each rule maps globs (relative to the project folder; `*` and `?` stay in
+one folder, `**` crosses folders) to a group, a target and a build phase:
+
+    files     glob or list of globs (required)
+    exclude   glob or list of globs to leave out
+    group     group name or path (default: the group for the file's folder)
+    target    target name (default: the manifest's target, else the app target)
+    targets   several target names; the file gets one reference and a
+              build file in the phase of each target
+    phase     sources, resources, frameworks, headers or none
+              (default: from the file type)
+    type      lastKnownFileType (default: from the extension)
+
+A file named without wildcards must exist; a manifest naming one that
+doesn't is an error and nothing is added. The first rule that matches a
+file decides where it goes. Everything is
+matched against one filesystem snapshot and queued on one transaction, so
+a manifest covering thousands of files still costs one parse and one write.
+Target phases are looked up once per (targets, phase) pair through the
+project's target index. Files that already have a reference are only added
+to the phases that don't build them yet.
+"""
+
+import json
+import os
+import re
+
+from .edits import PHASE_ISAS, CommandError, find_group, find_phases, queue_file, queue_membership, resolver_for
+from .filetypes import PACKAGE_SUFFIXES, file_type_for, in_package, phase_for
+from .snapshot import snapshot
+
+RULE_KEYS = frozenset({'files', 'exclude', 'group', 'target', 'targets', 'phase', 'type'})
+
+WILDCARDS = re.compile(r'[*?\[]')
+
+
+def as_list(value):
+    if value is None:
+        return []
+    return [value] if isinstance(value, str) else list(value)
+
+
+def glob_regex(pattern):
+    """Compile a glob in which `*` and `?` stay within one folder and `**` doesn't."""
+    parts = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith('**/', i):
+            parts.append('(?:.*/)?')
+            i += 3
+        elif pattern.startswith('**', i):
+            parts.append('.*')
+            i += 2
+        elif pattern[i] == '*':
+            parts.append('[^/]*')
+            i += 1
+        elif pattern[i] == '?':
+            parts.append('[^/]')
+            i += 1
+        elif pattern[i] == '[' and pattern.find(']', i + 1) > 0:
+            end = pattern.find(']', i + 1)
+            body = pattern[i + 1:end]
+            if body.startswith('!'):
+                body = '^' + body[1:]
+            parts.append(f'[{body}]')
+            i = end + 1
+        else:
+            parts.append(re.escape(pattern[i]))
+            i += 1
+    return re.compile(''.join(parts) + r'\Z')
+
+
+def literal_prefix(pattern):
+    """Folder part of `pattern` before its first wildcard ('.' for none)."""
+    head = WILDCARDS.split(pattern, 1)[0]
+    return head.rsplit('/', 1)[0] if '/' in head else '.'
+
+
+class Rule:
+    """One manifest rule: which files, and where they go."""
+
+    def __init__(self, spec, targets=None):
+        if isinstance(spec, str):
+            spec = {'files': spec}
+        unknown = set(spec) - RULE_KEYS
+        if unknown:
+            raise CommandError(f"Unknown manifest key(s): {', '.join(sorted(unknown))}")
+        self.patterns = [os.path.normpath(pattern) for pattern in as_list(spec.get('files'))]
+        if not self.patterns:
+            raise CommandError("Every manifest rule needs 'files'")
+        self.exclude = [glob_regex(os.path.normpath(pattern)) for pattern in as_list(spec.get('exclude'))]
+        self.group = spec.get('group')
+        self.targets = tuple(as_list(spec.get('targets', spec.get('target')))) or targets
+        self.phase = spec.get('phase')
+        if self.phase is not None and self.phase not in (*PHASE_ISAS, 'none'):
+            raise CommandError(f"Unknown phase {self.phase} (use {', '.join(PHASE_ISAS)} or none)")
+        self.file_type = spec.get('type')
+
+    def excluded(self, rel_path):
+        return any(regex.match(rel_path) for regex in self.exclude)
+
+    def missing(self, files):
+        """Patterns without wildcards that name no file in the snapshot `files`."""
+        missing = []
+        for pattern in self.patterns:
+            if not WILDCARDS.search(pattern):
+                key = files.key(pattern)
+                if key is None or not files.exists(key):
+                    missing.append(pattern)
+        return missing
+
+    def match(self, files):
+        """Relative paths in the snapshot `files` this rule selects."""
+        found = []
+        for pattern in self.patterns:
+            if not WILDCARDS.search(pattern):
+                key = files.key(pattern)
+                if key is not None and files.exists(key) and not self.excluded(key):
+                    found.append(key)
+                continue
+            regex = glob_regex(pattern)
+            prefix = literal_prefix(pattern)
+            packages = [
+                path for path in files.dirs
+                if os.path.splitext(path)[1] in PACKAGE_SUFFIXES
+                and (prefix == '.' or path.startswith(prefix + '/'))
+            ]
+            for rel_path in (*files.files_under(prefix), *sorted(packages)):
+                if regex.match(rel_path) and not in_package(rel_path) and not self.excluded(rel_path):
+                    found.append(rel_path)
+        return found
+
+
+class Manifest:
+    """Ordered rules for adding files to a project."""
+
+    def __init__(self, rules, targets=None):
+        self.targets = tuple(as_list(targets))
+        self.rules = [Rule(spec, self.targets) for spec in rules]
+
+    @classmethod
+    def load(cls, path):
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        except OSError as error:
+            raise CommandError(f"Can't read manifest {path}: {error.strerror}")
+        except ValueError as error:
+            raise CommandError(f"Manifest {path} isn't valid JSON: {error}")
+        if isinstance(data, list):
+            data = {'rules': data}
+        return cls(data.get('rules', []), data.get('targets', data.get('target')))
+
+    def entries(self, files):
+        """(rule, relative path) for every matched file, first rule first."""
+        seen = set()
+        entries = []
+        for rule in self.rules:
+            for rel_path in rule.match(files):
+                if rel_path not in seen:
+                    seen.add(rel_path)
+                    entries.append((rule, rel_path))
+        return entries
+
+    def plan(self, project, transaction=None, resolver=None, files=None):
+        """Queue every matched file on `transaction`.
+
+        Returns (transaction, report); the report has one dict per file with
+        its path, group, targets, phase, type and state ('queued' or
+        'present'). Raises CommandError, before queueing anything, when a
+        rule names a file that doesn't exist.
+        """
+        resolver = resolver or resolver_for(project)
+        files = files or snapshot(resolver.source_root)
+        missing = [pattern for rule in self.rules for pattern in rule.missing(files)]
+        if missing:
+            raise CommandError(f"The manifest names file(s) that don't exist: {', '.join(missing)}")
+        if transaction is None:
+            transaction = project.transaction()
+        groups = {}
+        phases = {}
+        refs_by_path = None
+        report = []
+        for rule, rel_path in self.entries(files):
+            full_path = os.path.join(resolver.source_root, rel_path)
+            file_type = rule.file_type or file_type_for(rel_path)
+            phase_name = rule.phase or phase_for(file_type)
+
+            key = (rule.targets, phase_name)
+            if key not in phases:
+                phases[key] = find_phases(project, rule.targets, phase_name)
+            rule_phases = phases[key]
+
+            pending = len(transaction)
+            if resolver.is_referenced(rel_path):
+                # Added by hand or by Xcode under its own ID: only make sure
+                # the targets build it
+                if refs_by_path is None:
+                    refs_by_path = {}
+                    for ref in project.file_references:
+                        refs_by_path.setdefault(resolver.resolve(ref), []).append(ref)
+                refs = refs_by_path.get(full_path, [])
+                group = project.parent_of(refs[0].id) if refs else None
+                if refs:
+                    queue_membership(transaction, refs[0].id, rule_phases)
+            else:
+                group_key = rule.group or os.path.dirname(full_path)
+                if group_key not in groups:
+                    groups[group_key] = find_group(project, resolver, rule.group, os.path.dirname(full_path))
+                group = groups[group_key]
+                group_dir = resolver.resolve(group)
+                if group_dir is None:
+                    raise CommandError(f"Can't tell which folder group {group.display_name} maps to")
+                queue_file(transaction, os.path.relpath(full_path, group_dir), group.id, rule_phases, file_type)
+            if group is None:
+                group_name = 'synchronized folder'
+            else:
+                group_name = group.display_name or 'main group'
+            report.append({
+                'path': rel_path,
+                'group': group_name,
+                'targets': [project.target_of(phase.id).name for phase in rule_phases],
+                'phase': phase_name,
+                'type': file_type,
+                'state': 'queued' if len(transaction) > pending else 'present',
+            })
+        return transaction, report
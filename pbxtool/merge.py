@@ -0,0 +1,247 @@
+"""
+merge.py
+Object-level diff and three-way merge of project.pbxproj files.
+
+    python3 -m pbxtool diff old/project.pbxproj new/project.pbxproj
+    python3 -m pbxtool merge BASE OURS THEIRS     # result is written to OURS
+
+To let git merge project files this way, .gitattributes maps *.pbxproj to
+the `pbxproj` driver and
+
+    python3 -m pbxtool merge --install
+
+registers the driver in this clone's .git/config.
+
+Both operations work on the parsed graphs. Objects are matched by ID, so a
+diff or a merge is one pass over the union of the IDs, and each object is
+compared key by key. Where both sides edited the same object the edits are
+combined key by key. For lists of object IDs (children, files, buildPhases,
+targets, ...) additions from both sides are kept and removals from either
+side are applied, which covers the usual case of two branches adding files
+to the same group and Sources phase. Two different values for the same key,
+or an object edited on one side and deleted on the other, are conflicts:
+the driver then leaves the merge to git's line-based merge-file, so the
+file gets ordinary conflict markers.
+
+The merged objects are applied to OURS and written incrementally, so
+everything that came through unchanged keeps its exact text.
+"""
+
+import subprocess
+import sys
+
+from .objects import make_object
+
+MISSING = object()
+
+
+def diff_projects(old, new):
+    """Objects added, removed and changed between two XcodeProjects.
+
+    Returns {'added': [ID, ...], 'removed': [ID, ...],
+    'changed': {ID: [key, ...]}}.
+    """
+    added = [object_id for object_id in new.objects if object_id not in old.objects]
+    removed = [object_id for object_id in old.objects if object_id not in new.objects]
+    changed = {}
+    for object_id, obj in new.objects.items():
+        before = old.objects.get(object_id)
+        if before is None or before.props == obj.props:
+            continue
+        keys = before.props.keys() | obj.props.keys()
+        changed[object_id] = sorted(
+            key for key in keys
+            if before.props.get(key, MISSING) != obj.props.get(key, MISSING)
+        )
+    return {'added': added, 'removed': removed, 'changed': changed}
+
+
+def merge_lists(base, ours, theirs):
+    """Merge two edits of a list of IDs, or return MISSING when it can't.
+
+    Items theirs removed are dropped from ours; items theirs added go after
+    the item that precedes them in theirs.
+    """
+    if not all(isinstance(item, str) for item in (*base, *ours, *theirs)):
+        return MISSING
+    base_set = set(base)
+    ours_set = set(ours)
+    theirs_set = set(theirs)
+    result = [item for item in ours if item in theirs_set or item not in base_set]
+    added = {
+        item for item in theirs
+        if item not in base_set and item not in ours_set
+    }
+    if not added:
+        return result
+    # Anchor each run of additions to the item before it in theirs
+    after = {}
+    anchor = None
+    for item in theirs:
+        if item in added:
+            after.setdefault(anchor, []).append(item)
+        else:
+            anchor = item
+    merged = after.pop(None, [])
+    for item in result:
+        merged.append(item)
+        merged.extend(after.pop(item, ()))
+    # Anchors ours removed: keep their additions at the end
+    for items in after.values():
+        merged.extend(items)
+    return merged
+
+
+def merge_value(base, ours, theirs, where, conflicts):
+    """Three-way merge of one value; MISSING stands for an absent key or object.
+
+    Unresolvable spots are appended to `conflicts` (as `where` paths) and
+    keep ours.
+    """
+    if ours == theirs:
+        return ours
+    if ours == base:
+        return theirs
+    if theirs == base:
+        return ours
+    if isinstance(ours, dict) and isinstance(theirs, dict):
+        base = base if isinstance(base, dict) else {}
+        merged = {}
+        for key in (*ours, *(key for key in theirs if key not in ours)):
+            value = merge_value(
+                base.get(key, MISSING), ours.get(key, MISSING), theirs.get(key, MISSING),
+                (*where, key), conflicts,
+            )
+            if value is not MISSING:
+                merged[key] = value
+        return merged
+    if isinstance(ours, list) and isinstance(theirs, list):
+        merged = merge_lists(base if isinstance(base, list) else [], ours, theirs)
+        if merged is not MISSING:
+            return merged
+    conflicts.append(where)
+    return ours
+
+
+def merge_projects(base, ours, theirs):
+    """Merge the changes from `base` to `theirs` into `ours`, in place.
+
+    Returns the list of conflicts, each a tuple path starting with the
+    object ID (or the root key). With conflicts nothing is changed.
+    """
+    conflicts = []
+    for key in ours.root.keys() | theirs.root.keys():
+        if key == 'objects':
+            continue
+        mine = ours.root.get(key, MISSING)
+        merged = merge_value(base.root.get(key, MISSING), mine, theirs.root.get(key, MISSING), (key,), conflicts)
+        # The incremental writer only re-emits objects, so a top-level
+        # change from theirs (an objectVersion bump) goes to the text merge
+        if merged != mine and (key,) not in conflicts:
+            conflicts.append((key,))
+
+    removals = []
+    updates = []
+    additions = []
+    seen = set()
+    for object_id in (*ours.objects, *theirs.objects, *base.objects):
+        if object_id in seen:
+            continue
+        seen.add(object_id)
+        mine = ours.objects.get(object_id)
+        other = theirs.objects.get(object_id)
+        original = base.objects.get(object_id)
+        mine_props = mine.props if mine is not None else MISSING
+        merged = merge_value(
+            original.props if original is not None else MISSING,
+            mine_props,
+            other.props if other is not None else MISSING,
+            (object_id,),
+            conflicts,
+        )
+        if merged == mine_props:
+            continue
+        if merged is MISSING:
+            removals.append(object_id)
+            continue
+        comment = (other if other is not None else mine).comment
+        if mine is None:
+            additions.append(make_object(object_id, merged, comment))
+        else:
+            updates.append(make_object(object_id, merged, comment))
+
+    if conflicts:
+        return conflicts
+    for object_id in removals:
+        ours.remove_object(object_id)
+    for obj in updates:
+        ours.replace_object(obj)
+    for obj in additions:
+        ours.add_object(obj)
+    return conflicts
+
+
+def describe(project, object_id):
+    obj = project.get(object_id)
+    if obj is None:
+        return object_id
+    return ' '.join(filter(None, (object_id, obj.isa, obj.display_name)))
+
+
+def read_project(path):
+    """Parse a project file without touching the parse cache (merge inputs are temp files)."""
+    from .parser import read_buffer
+    from .project import XcodeProject
+
+    return XcodeProject(read_buffer(path))
+
+
+def install_driver():
+    """Register the `pbxproj` merge driver in this clone's git config."""
+    settings = {
+        'merge.pbxproj.name': 'Xcode project file merge',
+        'merge.pbxproj.driver': 'python3 -m pbxtool merge %O %A %B',
+    }
+    for key, value in settings.items():
+        subprocess.run(['git', 'config', key, value], check=True)
+    print("✅ Installed the pbxproj merge driver (.gitattributes routes *.pbxproj to it)")
+    return 0
+
+
+def text_merge(base_path, ours_path, theirs_path):
+    """git's line-based merge, writing conflict markers into `ours_path`."""
+    try:
+        result = subprocess.run([
+            'git', 'merge-file', '-L', 'ours', '-L', 'base', '-L', 'theirs',
+            ours_path, base_path, theirs_path,
+        ])
+    except OSError:
+        return 1
+    return 1 if result.returncode else 0
+
+
+def merge_files(base_path, ours_path, theirs_path, output=None):
+    """Merge three project files; returns 0 when merged cleanly, 1 otherwise."""
+    from .parser import ParseError
+
+    try:
+        base, ours, theirs = (read_project(path) for path in (base_path, ours_path, theirs_path))
+    except ParseError as error:
+        print(f"⚠️  Can't parse an input ({error}); falling back to a line-based merge", file=sys.stderr)
+        return 1 if output else text_merge(base_path, ours_path, theirs_path)
+    conflicts = merge_projects(base, ours, theirs)
+    if conflicts:
+        print(f"⚠️  {len(conflicts)} conflict(s) the object merge can't resolve:", file=sys.stderr)
+        for where in conflicts:
+            object_id, *keys = where
+            name = describe(ours, object_id) if object_id in ours else object_id
+            print(f"   • {name}: {'.'.join(map(str, keys)) or 'edited on one side, deleted on the other'}",
+                  file=sys.stderr)
+        if output:
+            return 1
+        print("   Falling back to a line-based merge", file=sys.stderr)
+        return text_merge(base_path, ours_path, theirs_path) or 1
+    if not ours.save(output or ours_path) and output:
+        with open(output, 'w', encoding='utf-8') as f:
+            f.write(ours.text)
+    return 0
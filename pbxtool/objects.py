@@ -0,0 +1,257 @@
+"""
+objects.py
+Typed wrappers for the objects stored in project.pbxproj.
+
+Every entry of the `objects` dictionary becomes an instance of the class named
+by its `isa`, or of PBXObject when the isa has no dedicated class. The raw
+key/value pairs stay in `props` in file order; the classes only add
+convenience accessors on top of them.
+"""
+
+
+class PBXObject:
+    """Base class for every object in the project graph."""
+
+    __slots__ = ('id', 'props', 'comment')
+
+    def __init__(self, object_id, props, comment=None):
+        self.id = object_id
+        self.props = props
+        self.comment = comment
+
+    @property
+    def isa(self):
+        return self.props.get('isa')
+
+    def get(self, key, default=None):
+        return self.props.get(key, default)
+
+    def __getitem__(self, key):
+        return self.props[key]
+
+    def __setitem__(self, key, value):
+        self.props[key] = value
+
+    def __contains__(self, key):
+        return key in self.props
+
+    @property
+    def display_name(self):
+        """Name Xcode shows for the object, also used for its comment."""
+        return self.props.get('name') or self.comment or self.isa
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.id} {self.display_name!r}>"
+
+
+class PBXFileReference(PBXObject):
+    __slots__ = ()
+
+    @property
+    def path(self):
+        return self.props.get('path')
+
+    @property
+    def name(self):
+        return self.props.get('name')
+
+    @property
+    def source_tree(self):
+        return self.props.get('sourceTree', '<group>')
+
+    @property
+    def display_name(self):
+        if self.name:
+            return self.name
+        if self.path:
+            return self.path.rsplit('/', 1)[-1]
+        return self.isa
+
+
+class PBXReferenceProxy(PBXFileReference):
+    __slots__ = ()
+
+
+class PBXGroup(PBXObject):
+    __slots__ = ()
+
+    @property
+    def children(self):
+        return self.props.setdefault('children', [])
+
+    @property
+    def path(self):
+        return self.props.get('path')
+
+    @property
+    def name(self):
+        return self.props.get('name')
+
+    @property
+    def source_tree(self):
+        return self.props.get('sourceTree', '<group>')
+
+    @property
+    def display_name(self):
+        return self.name or self.path or self.comment
+
+
+class PBXVariantGroup(PBXGroup):
+    __slots__ = ()
+
+
+class XCVersionGroup(PBXGroup):
+    __slots__ = ()
+
+
+class PBXFileSystemSynchronizedRootGroup(PBXObject):
+    __slots__ = ()
+
+    @property
+    def path(self):
+        return self.props.get('path')
+
+    @property
+    def source_tree(self):
+        return self.props.get('sourceTree', '<group>')
+
+    @property
+    def display_name(self):
+        return self.props.get('name') or self.path
+
+
+class PBXBuildFile(PBXObject):
+    __slots__ = ()
+
+    @property
+    def file_ref(self):
+        return self.props.get('fileRef')
+
+    @property
+    def product_ref(self):
+        return self.props.get('productRef')
+
+
+class PBXBuildPhase(PBXObject):
+    """Common base for the Sources, Resources, Frameworks, ... build phases."""
+
+    __slots__ = ()
+    default_name = None
+
+    @property
+    def files(self):
+        return self.props.setdefault('files', [])
+
+    @property
+    def display_name(self):
+        return self.props.get('name') or self.default_name or self.comment
+
+
+class PBXSourcesBuildPhase(PBXBuildPhase):
+    __slots__ = ()
+    default_name = 'Sources'
+
+
+class PBXResourcesBuildPhase(PBXBuildPhase):
+    __slots__ = ()
+    default_name = 'Resources'
+
+
+class PBXFrameworksBuildPhase(PBXBuildPhase):
+    __slots__ = ()
+    default_name = 'Frameworks'
+
+
+class PBXHeadersBuildPhase(PBXBuildPhase):
+    __slots__ = ()
+    default_name = 'Headers'
+
+
+class PBXCopyFilesBuildPhase(PBXBuildPhase):
+    __slots__ = ()
+    default_name = 'CopyFiles'
+
+
+class PBXShellScriptBuildPhase(PBXBuildPhase):
+    __slots__ = ()
+    default_name = 'ShellScript'
+
+
+class PBXRezBuildPhase(PBXBuildPhase):
+    __slots__ = ()
+    default_name = 'Rez'
+
+
+class PBXTarget(PBXObject):
+    __slots__ = ()
+
+    @property
+    def name(self):
+        return self.props.get('name')
+
+    @property
+    def build_phases(self):
+        return self.props.setdefault('buildPhases', [])
+
+    @property
+    def dependencies(self):
+        return self.props.get('dependencies', [])
+
+
+class PBXNativeTarget(PBXTarget):
+    __slots__ = ()
+
+
+class PBXAggregateTarget(PBXTarget):
+    __slots__ = ()
+
+
+class PBXLegacyTarget(PBXTarget):
+    __slots__ = ()
+
+
+class PBXProject(PBXObject):
+    __slots__ = ()
+
+    @property
+    def main_group(self):
+        return self.props.get('mainGroup')
+
+    @property
+    def targets(self):
+        return self.props.get('targets', [])
+
+    @property
+    def display_name(self):
+        return 'Project object'
+
+
+ISA_TYPES = {
+    cls.__name__: cls
+    for cls in (
+        PBXFileReference,
+        PBXReferenceProxy,
+        PBXGroup,
+        PBXVariantGroup,
+        XCVersionGroup,
+        PBXFileSystemSynchronizedRootGroup,
+        PBXBuildFile,
+        PBXSourcesBuildPhase,
+        PBXResourcesBuildPhase,
+        PBXFrameworksBuildPhase,
+        PBXHeadersBuildPhase,
+        PBXCopyFilesBuildPhase,
+        PBXShellScriptBuildPhase,
+        PBXRezBuildPhase,
+        PBXNativeTarget,
+        PBXAggregateTarget,
+        PBXLegacyTarget,
+        PBXProject,
+    )
+}
+
+
+def make_object(object_id, props, comment=None):
+    """Wrap a raw object dictionary in the class matching its isa."""
+    cls = ISA_TYPES.get(props.get('isa'), PBXObject)
+    return cls(object_id, props, comment)
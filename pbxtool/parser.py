@@ -0,0 +1,226 @@
+"""
+parser.py
+Single-pass tokenizer and parser for the OpenStep-style plist used by project.pbxproj.
+
+The file is scanned once from left to right with one compiled token pattern, so
+parsing is linear in the size of the file. Nothing ever searches forward for a
+closing brace, which is what made the old `.*?` DOTALL regexes backtrack across
+object boundaries.
+
+The parser works on the raw UTF-8 bytes, usually a read-only mmap of the file
+(see read_buffer), and offsets are byte offsets. Tokens are memoryview slices
+of that buffer: whitespace and comments are never copied, and a key or value
+is decoded only when the parser turns it into data. Decoded strings are shared
+through a table keyed by their bytes, so the `isa` key, `PBXBuildFile` or an
+object ID referenced from three places are one str each instead of one per
+occurrence, which keeps the parsed graph of a large Pods project small.
+"""
+
+import mmap
+import os
+import re
+
+# Leading whitespace is part of every match, so finditer() walks the file
+# in C with one match per token; `error` catches what no token allows.
+TOKEN_PATTERN = re.compile(rb'''
+    \s*
+    (?:
+        (?P<comment>/\*.*?\*/|//[^\n]*)
+      | (?P<quoted>"(?:[^"\\]|\\.)*")
+      | (?P<punct>[{}();,=])
+      | (?P<word>(?:[^\s{}();,="/]|/(?![*/]))+)
+      | (?P<error>\S)
+    )
+''', re.VERBOSE | re.DOTALL)
+
+PUNCTUATION = {ord(char): char for char in '{}();,='}
+
+ESCAPES = {
+    'n': '\n',
+    't': '\t',
+    'r': '\r',
+    '"': '"',
+    '\\': '\\',
+}
+
+# Files at least this large are mapped instead of read into memory.
+MMAP_THRESHOLD = 1 << 20
+
+
+class ParseError(ValueError):
+    """Raised when project.pbxproj is not a well-formed OpenStep plist."""
+
+    def __init__(self, message, offset):
+        super().__init__(f"{message} at offset {offset}")
+        self.offset = offset
+
+
+def read_buffer(path):
+    """Contents of a project file as a read-only bytes-like buffer.
+
+    Large files are memory-mapped, so their bytes live in the page cache
+    rather than the heap. Writers replace the file instead of rewriting it
+    in place (see XcodeProject.save), which keeps existing mappings valid.
+    """
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < MMAP_THRESHOLD:
+            return f.read()
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def as_buffer(text):
+    """Accept project text as str (encoded once) or any bytes-like buffer."""
+    return text.encode('utf-8') if isinstance(text, str) else text
+
+
+def unquote(token):
+    """Strip the quotes from a quoted string token and resolve its escapes."""
+    body = token[1:-1]
+    if '\\' not in body:
+        return body
+    return re.sub(r'\\(.)', lambda m: ESCAPES.get(m.group(1), m.group(1)), body)
+
+
+def tokenize(buffer):
+    """Yield (kind, start, end) for every non-whitespace token.
+
+    Punctuation comes back with the character itself as its kind.
+    """
+    for m in TOKEN_PATTERN.finditer(as_buffer(buffer)):
+        kind = m.lastgroup
+        if kind == 'punct':
+            yield PUNCTUATION[m.group()[-1]], m.end() - 1, m.end()
+        elif kind == 'error':
+            raise ParseError(f"Unexpected character {m.group()[-1:]!r}", m.end() - 1)
+        else:
+            yield kind, m.start(kind), m.end()
+
+
+class Parser:
+    """Recursive-descent parser over the token stream of a project file.
+
+    Values come back as plain Python data: dicts (in file order), lists and
+    strings. While parsing the top-level `objects` dictionary the parser also
+    records, for every object, the comment that follows its ID and the source
+    span of the whole `ID = {...};` entry.
+    """
+
+    def __init__(self, buffer):
+        self.buffer = as_buffer(buffer)
+        self.view = memoryview(self.buffer)
+        self.strings = {}
+        self.tokens = tokenize(self.buffer)
+        self.token = None
+        self.comment = None
+        self.object_spans = {}
+        self.advance()
+
+    def advance(self):
+        """Move to the next significant token, remembering a trailing comment."""
+        self.comment = None
+        for token in self.tokens:
+            if token[0] == 'comment':
+                self.comment = token
+                continue
+            self.token = token
+            return
+        self.token = ('eof', len(self.buffer), len(self.buffer))
+
+    def string(self, start, end):
+        """The decoded value of the word or quoted token at [start, end)."""
+        raw = self.view[start:end]
+        value = self.strings.get(raw)
+        if value is None:
+            raw = bytes(raw)
+            value = raw.decode('utf-8')
+            if value.startswith('"'):
+                value = unquote(value)
+            self.strings[raw] = value
+        return value
+
+    def text(self, token):
+        """Source text of a token, for error messages."""
+        return bytes(self.view[token[1]:token[2]]).decode('utf-8', 'replace')
+
+    def comment_text(self):
+        """Text of the `/* ... */` comment before the current token, if any."""
+        if self.comment is None:
+            return None
+        _, start, end = self.comment
+        if self.view[start + 1] != ord('*'):
+            return None
+        return bytes(self.view[start + 2:end - 2]).decode('utf-8').strip()
+
+    def expect(self, value):
+        self.require(value)
+        self.advance()
+
+    def require(self, value):
+        if self.token[0] != value:
+            raise ParseError(f"Expected {value!r} but found {self.text(self.token)!r}", self.token[1])
+
+    def parse(self):
+        """Parse the whole document and return the root dictionary."""
+        value = self.parse_value(depth=0)
+        if self.token[0] != 'eof':
+            raise ParseError(f"Trailing content {self.text(self.token)!r}", self.token[1])
+        return value
+
+    def parse_value(self, depth):
+        kind, start, end = self.token
+        if kind == '{':
+            return self.parse_dict(depth)
+        if kind == '(':
+            return self.parse_list(depth)
+        if kind == 'quoted' or kind == 'word':
+            self.advance()
+            return self.string(start, end)
+        raise ParseError(f"Unexpected token {self.text(self.token)!r}", start)
+
+    def parse_dict(self, depth, record_spans=False):
+        self.expect('{')
+        result = {}
+        while self.token[0] != '}':
+            kind, start, end = self.token
+            if kind not in ('word', 'quoted'):
+                raise ParseError(f"Expected a key but found {self.text(self.token)!r}", start)
+            key = self.string(start, end)
+            self.advance()
+            key_comment = self.comment_text() if record_spans else None
+            self.expect('=')
+            if depth == 0 and key == 'objects':
+                self.require('{')
+                result[key] = self.parse_dict(depth + 1, record_spans=True)
+            else:
+                result[key] = self.parse_value(depth + 1)
+            end = self.token[2]
+            self.expect(';')
+            if record_spans:
+                self.object_spans[key] = (start, end, key_comment)
+        self.expect('}')
+        return result
+
+    def parse_list(self, depth):
+        self.expect('(')
+        result = []
+        while self.token[0] != ')':
+            result.append(self.parse_value(depth + 1))
+            if self.token[0] == ',':
+                self.advance()
+            elif self.token[0] != ')':
+                raise ParseError(f"Expected ',' or ')' but found {self.text(self.token)!r}", self.token[1])
+        self.expect(')')
+        return result
+
+
+def parse_plist(buffer):
+    """Parse an OpenStep plist (str, bytes or a mapped file) into plain Python data.
+
+    Returns (root, object_spans) where object_spans maps every object ID in
+    the top-level `objects` dictionary to (start, end, comment), with start
+    and end as byte offsets into the UTF-8 buffer.
+    """
+    parser = Parser(buffer)
+    root = parser.parse()
+    return root, parser.object_spans
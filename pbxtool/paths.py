@@ -0,0 +1,154 @@
+"""
+paths.py
+Resolve file references and groups to locations on disk.
+
+Xcode stores each path relative to the object's `sourceTree`: `<group>`
+means relative to the enclosing group's folder (which itself may be
+relative to its parent, up to mainGroup), `SOURCE_ROOT` means relative to
+the folder containing the .xcodeproj, `<absolute>` means as written, and
+build-setting trees such as `BUILT_PRODUCTS_DIR` or `SDKROOT` depend on the
+build environment.
+
+PathResolver walks each object's group chain once and memoizes every
+group's folder, so resolving all references costs O(depth) per reference
+on the first visit and a dictionary lookup afterwards. Build a new resolver
+after editing the group tree.
+"""
+
+import os
+
+# Build settings that can be given a folder through the environment when
+# the caller doesn't pass one.
+ENVIRONMENT_TREES = ('BUILT_PRODUCTS_DIR', 'SDKROOT', 'DEVELOPER_DIR')
+
+
+class PathResolver:
+    """Absolute, normalized paths for the objects of one project."""
+
+    def __init__(self, project, source_root=None, trees=None):
+        self.project = project
+        source_root = source_root or project.project_dir or os.getcwd()
+        self.source_root = os.path.abspath(source_root)
+        self.trees = {
+            name: os.environ[name] for name in ENVIRONMENT_TREES if os.environ.get(name)
+        }
+        self.trees.update(trees or {})
+        self.trees['SOURCE_ROOT'] = self.source_root
+        self.trees.setdefault('PROJECT_DIR', self.source_root)
+        self.cache = {}
+        self.referenced = None
+        self.synchronized = None
+        self.folders = None
+
+    def resolve(self, obj):
+        """Absolute path of a file reference or group (object or ID).
+
+        Returns None when the location depends on a build setting the
+        resolver doesn't know, or when a `<group>`-relative object isn't
+        reachable from mainGroup.
+        """
+        project = self.project
+        if isinstance(obj, str):
+            obj = project.get(obj)
+            if obj is None:
+                return None
+        cache = self.cache
+        if obj.id in cache:
+            return cache[obj.id]
+
+        # Climb to the nearest object whose folder is known, then resolve
+        # the chain back down, caching every group on the way.
+        main_group = project.main_group
+        chain = []
+        base = None
+        current = obj
+        while current is not None:
+            if current.id in cache:
+                base = cache[current.id]
+                break
+            chain.append(current)
+            source_tree = current.get('sourceTree', '<group>')
+            if source_tree != '<group>':
+                base = self.tree_root(source_tree)
+                break
+            if main_group is not None and current.id == main_group.id:
+                base = self.source_root
+                break
+            current = project.parent_of(current.id)
+
+        for item in reversed(chain):
+            if base is not None:
+                path = item.get('path')
+                if path:
+                    base = os.path.normpath(os.path.join(base, path))
+            cache[item.id] = base
+        return cache[obj.id]
+
+    def tree_root(self, source_tree):
+        """Folder a non-`<group>` sourceTree stands for, or None."""
+        if source_tree == '<absolute>':
+            return os.sep
+        return self.trees.get(source_tree)
+
+    def relative(self, obj):
+        """Path of `obj` relative to the source root, or None."""
+        path = self.resolve(obj)
+        if path is None:
+            return None
+        relative = os.path.relpath(path, self.source_root)
+        if relative == '..' or relative.startswith('..' + os.sep):
+            return None
+        return relative
+
+    def group_folders(self):
+        """{folder: group} for every group that resolves; the first group wins."""
+        if self.folders is None:
+            self.folders = {}
+            for group in self.project.groups:
+                path = self.resolve(group)
+                if path is not None:
+                    self.folders.setdefault(path, group)
+        return self.folders
+
+    def group_for(self, folder):
+        """Group for `folder`, or for its nearest parent folder that has one."""
+        folders = self.group_folders()
+        folder = os.path.normpath(os.path.join(self.source_root, folder))
+        while True:
+            group = folders.get(folder)
+            if group is not None:
+                return group
+            parent = os.path.dirname(folder)
+            if parent == folder:
+                return None
+            folder = parent
+
+    def synchronized_roots(self):
+        """Folders of PBXFileSystemSynchronizedRootGroup objects.
+
+        Xcode treats every file below such a folder as part of the project
+        without a file reference of its own.
+        """
+        if self.synchronized is None:
+            groups = self.project.objects_of('PBXFileSystemSynchronizedRootGroup')
+            self.synchronized = [path for path in map(self.resolve, groups) if path is not None]
+        return self.synchronized
+
+    def referenced_paths(self):
+        """Absolute paths of every file reference that resolves."""
+        if self.referenced is None:
+            self.referenced = {
+                path for path in map(self.resolve, self.project.file_references)
+                if path is not None
+            }
+        return self.referenced
+
+    def is_referenced(self, path):
+        """True when `path` has a file reference or lies in a synchronized folder."""
+        path = os.path.normpath(os.path.join(self.source_root, path))
+        if path in self.referenced_paths():
+            return True
+        return any(
+            path == root or path.startswith(root + os.sep)
+            for root in self.synchronized_roots()
+        )
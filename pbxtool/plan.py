@@ -0,0 +1,185 @@
+"""
+plan.py
+Reviewable change plans: work out the edits first, write them later.
+
+    python3 -m pbxtool fix-paths --plan fix.json     # nothing is written
+    python3 -m pbxtool remove Views/Old.swift --prune --plan remove.json
+    python3 -m pbxtool apply fix.json
+
+A plan is the operation queue of a Transaction, which is already plain data
+(each operation's kind and arguments, with the ID of every new object
+decided), together with the sha256 of the project file it was made against,
+counts, and an object-level diff. Making one applies the queue to the parsed
+graph in memory only; the diff compares the touched objects with their
+original text, which is re-parsed for just those objects.
+
+Applying replays the queue without re-running any check, snapshot or path
+resolution, and refuses to when the file changed since the plan was made.
+A plan that changes nothing writes nothing and takes no backup.
+"""
+
+import hashlib
+import json
+
+from .objects import make_object
+from .parser import parse_plist
+
+VERSION = 1
+
+
+class PlanError(ValueError):
+    """Raised when a plan can't be applied to the project it names."""
+
+
+def fingerprint(project):
+    """sha256 of the project text the graph was parsed from."""
+    return hashlib.sha256(project.buffer).hexdigest()
+
+
+def original_props(project, object_ids):
+    """Props of `object_ids` as they are in the parsed text, in one parse."""
+    view = memoryview(project.buffer)
+    pieces = [view[start:end] for start, end, _ in (project.spans[object_id] for object_id in object_ids)]
+    root, _ = parse_plist(b''.join((b'{', *pieces, b'}')))
+    return root
+
+
+def summary(object_id, obj):
+    return {'id': object_id, 'isa': obj.isa, 'name': obj.display_name}
+
+
+def value_change(old, new):
+    """Compact description of one changed key: list edits as +/- items."""
+    if isinstance(old, list) and isinstance(new, list):
+        old_items = set(map(repr, old))
+        new_items = set(map(repr, new))
+        change = {
+            'added': [item for item in new if repr(item) not in old_items],
+            'removed': [item for item in old if repr(item) not in new_items],
+        }
+        if change['added'] or change['removed']:
+            return change
+    return {'old': old, 'new': new}
+
+
+def diff_pending(project):
+    """Objects added, removed and changed by the unsaved edits of `project`."""
+    touched = [object_id for object_id in (*project.dirty, *project.removed) if object_id in project.spans]
+    before = original_props(project, sorted(touched)) if touched else {}
+    added = []
+    removed = []
+    changed = []
+    for object_id in sorted(project.dirty):
+        obj = project.objects[object_id]
+        old = before.get(object_id)
+        if old is None:
+            added.append(summary(object_id, obj))
+            continue
+        keys = {
+            key: value_change(old.get(key), obj.props.get(key))
+            for key in (*old, *(key for key in obj.props if key not in old))
+            if old.get(key) != obj.props.get(key)
+        }
+        if keys:
+            changed.append({**summary(object_id, obj), 'keys': keys})
+    for object_id in sorted(project.removed):
+        removed.append(summary(object_id, make_object(object_id, before[object_id], project.spans[object_id][2])))
+    return {'added': added, 'removed': removed, 'changed': changed}
+
+
+def count_by_isa(items):
+    counts = {}
+    for item in items:
+        counts[item['isa']] = counts.get(item['isa'], 0) + 1
+    return counts
+
+
+def make_plan(transaction, label=None, report=None):
+    """Apply `transaction` in memory and describe it as a plan.
+
+    The project is left edited but unsaved (project.save() would write
+    exactly what the plan describes). `report` is any extra JSON data for
+    the reviewer, such as the findings the edits are based on.
+    """
+    project = transaction.project
+    operations = [[kind, args] for kind, args in transaction.operations]
+    digest = fingerprint(project)
+    transaction.apply()
+    diff = diff_pending(project)
+    kinds = {}
+    for kind, _ in operations:
+        kinds[kind] = kinds.get(kind, 0) + 1
+    plan = {
+        'version': VERSION,
+        'project': str(project.path) if project.path else None,
+        'sha256': digest,
+        'label': label,
+        'counts': {
+            'operations': kinds,
+            **{key: count_by_isa(items) for key, items in diff.items()},
+        },
+        'diff': diff,
+        'operations': operations,
+    }
+    if report is not None:
+        plan['report'] = report
+    return plan
+
+
+def is_empty(plan):
+    return not any(plan['diff'].values())
+
+
+def describe(plan):
+    """One line of counts for a plan."""
+    counts = plan['counts']
+    parts = [f"{sum(counts[key].values())} {key}" for key in ('added', 'changed', 'removed')]
+    return f"{sum(counts['operations'].values())} operation(s): {', '.join(parts)} object(s)"
+
+
+def write_plan(plan, path):
+    """Write a plan as JSON to `path`."""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(plan, f, indent=1, ensure_ascii=False)
+        f.write('\n')
+
+
+def read_plan(path):
+    """Load a plan written by write_plan."""
+    with open(path, encoding='utf-8') as f:
+        plan = json.load(f)
+    if plan.get('version') != VERSION:
+        raise PlanError(f"Unsupported plan version {plan.get('version')!r}")
+    return plan
+
+
+def replay(project, plan):
+    """Apply the operations of `plan` to `project` in memory.
+
+    Nothing is re-analysed: the queued operations run as recorded. Raises
+    PlanError when the project text isn't the one the plan was made from.
+    Returns True when the graph changed.
+    """
+    if fingerprint(project) != plan['sha256']:
+        raise PlanError(f"{project.path} changed since the plan was made; make a new plan")
+    transaction = project.transaction()
+    transaction.operations = [(kind, args) for kind, args in plan['operations']]
+    transaction.apply()
+    return project.modified
+
+
+def apply_plan(project, plan, backup=True):
+    """Replay `plan` and write the project, backing it up first.
+
+    Returns the backup entry (or {} with `backup` off) when the file was
+    written, and None when the plan changed nothing, in which case neither
+    the file nor the backup store is touched.
+    """
+    if not replay(project, plan):
+        return None
+    entry = {}
+    if backup:
+        from .backup import backup_project
+        entry = backup_project(project.path, label=plan.get('label') or 'pbxtool apply')
+    project.save()
+    return entry
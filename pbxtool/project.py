@@ -0,0 +1,503 @@
+"""
+project.py
+In-memory model of an Xcode project.pbxproj file.
+
+Besides the objects themselves the model keeps hash indexes by isa, by file
+path and by group name, plus back-references from every child to the group
+that owns it, from every file reference to its build files, and from every
+build file to its build phase and target, and from every target to its
+build phases by isa. Questions like "which group owns this file" or "which
+Sources phase does the widget use" are dictionary lookups instead of a
+regex over the whole file.
+
+The parsed file itself is kept as `buffer`, the raw UTF-8 bytes (a read-only
+mmap for large files), and every object's span points into it; `text`
+decodes it only for the callers that want the whole file as a string.
+"""
+
+import os
+import shutil
+from collections import defaultdict
+from pathlib import Path
+
+from . import cache
+from .objects import PBXBuildPhase, PBXGroup, PBXTarget, make_object
+from .parser import as_buffer, parse_plist, read_buffer
+from .transaction import Transaction
+from .writer import serialize, serialize_incremental
+
+GROUP_ISAS = ('PBXGroup', 'PBXVariantGroup', 'XCVersionGroup')
+TARGET_ISAS = ('PBXNativeTarget', 'PBXAggregateTarget', 'PBXLegacyTarget')
+
+# isas whose `/* comment */` is their name, else their path
+COMMENTED_BY_PATH = ('PBXFileReference', *GROUP_ISAS, 'PBXFileSystemSynchronizedRootGroup')
+
+# Optional keys that hold one object ID, by the isas that have them; the
+# key is dropped when the object it points at is removed
+SCALAR_REFERENCES = {
+    'XCBuildConfiguration': 'baseConfigurationReference',
+    'XCVersionGroup': 'currentVersion',
+    **{isa: 'productReference' for isa in TARGET_ISAS},
+}
+
+APPLICATION_PRODUCT_TYPE = 'com.apple.product-type.application'
+
+
+def write_file(path, data):
+    """Replace the file at `path` with `data`, keeping its permissions.
+
+    The data goes to a temporary file that is renamed over the original, so
+    a reader never sees half a file and mappings of the old contents (this
+    or another project's buffer) stay valid instead of being truncated.
+    """
+    path = Path(os.path.realpath(path))
+    tmp = path.with_name(f'.{path.name}.tmp')
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    if path.exists():
+        shutil.copymode(path, tmp)
+    os.replace(tmp, path)
+
+
+class XcodeProject:
+    """Parsed project.pbxproj: the root dictionary plus an indexed object graph."""
+
+    def __init__(self, text, path=None):
+        self.path = Path(path) if path else None
+        self.buffer = as_buffer(text)
+        self.root, self.spans = parse_plist(self.buffer)
+        raw_objects = self.root.get('objects', {})
+        self.objects = {
+            object_id: make_object(object_id, props, self.spans[object_id][2])
+            for object_id, props in raw_objects.items()
+        }
+        self.source_isa = {object_id: obj.isa for object_id, obj in self.objects.items()}
+        self.dirty = set()
+        self.removed = set()
+        self.build_indexes()
+
+    @classmethod
+    def load(cls, path, use_cache=True):
+        """Read and parse a project.pbxproj file (or the .xcodeproj around it).
+
+        Unless `use_cache` is False, an unchanged file is loaded from the
+        pickle left by the previous run instead of being parsed again.
+        """
+        path = Path(path)
+        if path.suffix == '.xcodeproj':
+            path = path / 'project.pbxproj'
+        if use_cache:
+            project = cache.load(path)
+            if project is not None:
+                return project
+        project = cls(read_buffer(path), path)
+        if use_cache:
+            cache.store(project)
+        return project
+
+    @property
+    def text(self):
+        """The parsed (or last saved) file as a string."""
+        return str(self.buffer, 'utf-8')
+
+    def __getstate__(self):
+        # The buffer is the file on disk, often mapped: cache.load maps it
+        # again instead of pickling a copy
+        state = self.__dict__.copy()
+        state['buffer'] = None
+        return state
+
+    # Indexes
+
+    def build_indexes(self):
+        """Build every index in a single pass over the objects."""
+        self.by_isa = defaultdict(dict)
+        self.by_path = defaultdict(dict)
+        self.by_group_name = defaultdict(dict)
+        self.parents = {}
+        self.build_files_by_ref = defaultdict(dict)
+        self.phase_of_build_file = {}
+        self.target_of_phase = {}
+        self.phases_by_target = {}
+        for obj in self.objects.values():
+            self.index_object(obj)
+
+    def index_target_phases(self, target_id, skip=None):
+        """Rebuild {isa: first phase ID} for one target."""
+        target = self.objects.get(target_id)
+        phases = {}
+        if target is not None:
+            for phase_id in target.build_phases:
+                phase = self.objects.get(phase_id)
+                if phase is not None and phase_id != skip:
+                    phases.setdefault(phase.isa, phase_id)
+        self.phases_by_target[target_id] = phases
+
+    def index_object(self, obj):
+        """Add one object (and the links it owns) to the indexes."""
+        self.by_isa[obj.isa][obj.id] = None
+        path = obj.get('path')
+        if path and not isinstance(obj, PBXGroup):
+            self.by_path[path][obj.id] = None
+        if isinstance(obj, PBXGroup):
+            if obj.display_name:
+                self.by_group_name[obj.display_name][obj.id] = None
+            for child_id in obj.children:
+                self.parents[child_id] = obj.id
+        elif isinstance(obj, PBXBuildPhase):
+            for build_id in obj.files:
+                self.phase_of_build_file[build_id] = obj.id
+            if obj.id in self.target_of_phase:
+                self.index_target_phases(self.target_of_phase[obj.id])
+        elif isinstance(obj, PBXTarget):
+            for phase_id in obj.build_phases:
+                self.target_of_phase[phase_id] = obj.id
+            self.index_target_phases(obj.id)
+        if obj.isa == 'PBXBuildFile' and obj.get('fileRef'):
+            self.build_files_by_ref[obj['fileRef']][obj.id] = None
+
+    def unindex_object(self, obj):
+        """Remove one object (and the links it owns) from the indexes."""
+        self.by_isa[obj.isa].pop(obj.id, None)
+        path = obj.get('path')
+        if path:
+            self.by_path.get(path, {}).pop(obj.id, None)
+        if isinstance(obj, PBXGroup):
+            if obj.display_name:
+                self.by_group_name.get(obj.display_name, {}).pop(obj.id, None)
+            for child_id in obj.children:
+                if self.parents.get(child_id) == obj.id:
+                    del self.parents[child_id]
+        elif isinstance(obj, PBXBuildPhase):
+            for build_id in obj.files:
+                if self.phase_of_build_file.get(build_id) == obj.id:
+                    del self.phase_of_build_file[build_id]
+            if obj.id in self.target_of_phase:
+                self.index_target_phases(self.target_of_phase[obj.id], skip=obj.id)
+        elif isinstance(obj, PBXTarget):
+            for phase_id in obj.build_phases:
+                if self.target_of_phase.get(phase_id) == obj.id:
+                    del self.target_of_phase[phase_id]
+            self.phases_by_target.pop(obj.id, None)
+        if obj.isa == 'PBXBuildFile' and obj.get('fileRef'):
+            self.build_files_by_ref.get(obj['fileRef'], {}).pop(obj.id, None)
+
+    # Basic access
+
+    @property
+    def project_dir(self):
+        """Directory containing the .xcodeproj bundle."""
+        return self.path.parent.parent if self.path else None
+
+    @property
+    def root_object(self):
+        return self.objects.get(self.root.get('rootObject'))
+
+    @property
+    def main_group(self):
+        root = self.root_object
+        return self.objects.get(root.main_group) if root else None
+
+    def get(self, object_id):
+        return self.objects.get(object_id)
+
+    def __getitem__(self, object_id):
+        return self.objects[object_id]
+
+    def __contains__(self, object_id):
+        return object_id in self.objects
+
+    def __len__(self):
+        return len(self.objects)
+
+    def objects_of(self, *isas):
+        """All objects whose isa is one of `isas`, in file order within each isa."""
+        objects = self.objects
+        return [objects[object_id] for isa in isas for object_id in self.by_isa.get(isa, ())]
+
+    @property
+    def file_references(self):
+        return self.objects_of('PBXFileReference')
+
+    @property
+    def groups(self):
+        return self.objects_of(*GROUP_ISAS)
+
+    @property
+    def build_files(self):
+        return self.objects_of('PBXBuildFile')
+
+    @property
+    def targets(self):
+        return self.objects_of(*TARGET_ISAS)
+
+    @property
+    def main_target(self):
+        """The application target (the first target when there is none), or None."""
+        targets = self.targets
+        for target in targets:
+            if target.get('productType') == APPLICATION_PRODUCT_TYPE:
+                return target
+        return targets[0] if targets else None
+
+    # Lookups
+
+    def files_at_path(self, path):
+        """File references whose `path` value is exactly `path`."""
+        return [self.objects[object_id] for object_id in self.by_path.get(path, ())]
+
+    def groups_named(self, name):
+        """Groups whose name (or path, when unnamed) is `name`."""
+        return [self.objects[object_id] for object_id in self.by_group_name.get(name, ())]
+
+    def group_named(self, name):
+        """First group called `name`, or None."""
+        groups = self.groups_named(name)
+        return groups[0] if groups else None
+
+    def target_named(self, name):
+        """Target called `name`, or None."""
+        for target in self.targets:
+            if target.name == name:
+                return target
+        return None
+
+    def parent_of(self, object_id):
+        """Group that lists `object_id` among its children, or None."""
+        return self.objects.get(self.parents.get(object_id))
+
+    def build_files_for(self, file_ref_id):
+        """PBXBuildFile objects that point at `file_ref_id`."""
+        return [self.objects[object_id] for object_id in self.build_files_by_ref.get(file_ref_id, ())]
+
+    def phase_of(self, build_file_id):
+        """Build phase whose `files` list includes `build_file_id`, or None."""
+        return self.objects.get(self.phase_of_build_file.get(build_file_id))
+
+    def phases_containing(self, file_ref_id):
+        """Build phases that compile or copy `file_ref_id`."""
+        phases = []
+        for build_file in self.build_files_for(file_ref_id):
+            phase = self.phase_of(build_file.id)
+            if phase is not None:
+                phases.append(phase)
+        return phases
+
+    def target_of(self, phase_id):
+        """Target that owns the build phase `phase_id`, or None."""
+        return self.objects.get(self.target_of_phase.get(phase_id))
+
+    def targets_building(self, file_ref_id):
+        """Targets with a build phase that compiles or copies `file_ref_id`."""
+        targets = {}
+        for phase in self.phases_containing(file_ref_id):
+            target = self.target_of(phase.id)
+            if target is not None:
+                targets[target.id] = target
+        return list(targets.values())
+
+    def build_phase(self, target, isa='PBXSourcesBuildPhase'):
+        """First build phase of `isa` belonging to `target`, or None."""
+        return self.objects.get(self.phases_by_target.get(target.id, {}).get(isa))
+
+    # Editing
+    #
+    # These keep the raw `objects` dictionary and every index in sync, and
+    # record which objects the incremental writer has to re-emit. Scripts
+    # normally go through a Transaction rather than calling them directly.
+
+    @property
+    def modified(self):
+        return bool(self.dirty or self.removed)
+
+    def touch(self, object_id):
+        """Mark an object as changed so the writer re-emits it."""
+        self.dirty.add(object_id)
+
+    def add_object(self, obj):
+        """Insert a new object into the graph."""
+        if obj.id in self.objects:
+            raise KeyError(f"Object {obj.id} already exists")
+        self.objects[obj.id] = obj
+        self.root.setdefault('objects', {})[obj.id] = obj.props
+        self.index_object(obj)
+        self.removed.discard(obj.id)
+        self.touch(obj.id)
+        return obj
+
+    def remove_object(self, object_id):
+        """Delete an object and detach it from its parent group or build phase."""
+        obj = self.objects.pop(object_id)
+        self.root['objects'].pop(object_id, None)
+        parent = self.parent_of(object_id)
+        if parent is not None:
+            self.remove_child(parent.id, object_id)
+        phase = self.phase_of(object_id)
+        if phase is not None:
+            self.remove_from_phase(phase.id, object_id)
+        self.unindex_object(obj)
+        self.dirty.discard(object_id)
+        if object_id in self.spans:
+            self.removed.add(object_id)
+        return obj
+
+    def remove_objects(self, object_ids):
+        """Delete many objects at once.
+
+        Like remove_object, each is detached from its group and build phase,
+        but every affected `children` or `files` list is filtered once for
+        the whole batch, so the cost is linear in the removed objects plus
+        the lists they were in rather than their product. Surviving objects
+        that point at a removed one through a SCALAR_REFERENCES key (an
+        .xcconfig as baseConfigurationReference, a product as
+        productReference) lose that key.
+        """
+        doomed = {object_id: None for object_id in object_ids if object_id in self.objects}
+        owners = {}
+        for object_id in doomed:
+            for owner_id, key in ((self.parents.get(object_id), 'children'),
+                                  (self.phase_of_build_file.get(object_id), 'files')):
+                if owner_id is not None and owner_id not in doomed:
+                    owners[owner_id] = key
+        for owner_id, key in owners.items():
+            owner = self.objects[owner_id]
+            owner[key] = [item for item in owner.get(key, ()) if item not in doomed]
+            self.touch(owner_id)
+        if doomed:
+            for isa, key in SCALAR_REFERENCES.items():
+                for obj in self.objects_of(isa):
+                    if obj.props.get(key) in doomed and obj.id not in doomed:
+                        del obj.props[key]
+                        self.touch(obj.id)
+        for object_id in doomed:
+            obj = self.objects.pop(object_id)
+            self.root['objects'].pop(object_id, None)
+            self.unindex_object(obj)
+            self.parents.pop(object_id, None)
+            self.phase_of_build_file.pop(object_id, None)
+            self.dirty.discard(object_id)
+            if object_id in self.spans:
+                self.removed.add(object_id)
+        return list(doomed)
+
+    def replace_object(self, obj):
+        """Swap in a new version of an existing object (same ID, any props)."""
+        old = self.objects[obj.id]
+        self.unindex_object(old)
+        self.objects[obj.id] = obj
+        self.root['objects'][obj.id] = obj.props
+        self.index_object(obj)
+        self.touch(obj.id)
+        return obj
+
+    def add_child(self, group_id, child_id):
+        group = self.objects[group_id]
+        group.children.append(child_id)
+        self.parents[child_id] = group_id
+        self.touch(group_id)
+
+    def remove_child(self, group_id, child_id):
+        group = self.objects[group_id]
+        group['children'] = [item for item in group.children if item != child_id]
+        if self.parents.get(child_id) == group_id:
+            del self.parents[child_id]
+        self.touch(group_id)
+
+    def add_to_phase(self, phase_id, build_file_id):
+        phase = self.objects[phase_id]
+        phase.files.append(build_file_id)
+        self.phase_of_build_file[build_file_id] = phase_id
+        self.touch(phase_id)
+
+    def remove_from_phase(self, phase_id, build_file_id):
+        phase = self.objects[phase_id]
+        phase['files'] = [item for item in phase.files if item != build_file_id]
+        if self.phase_of_build_file.get(build_file_id) == phase_id:
+            del self.phase_of_build_file[build_file_id]
+        self.touch(phase_id)
+
+    def set_value(self, object_id, key, value):
+        """Set (or, with value None, delete) one key of an object.
+
+        Changing the name or path of a file reference or group also updates
+        its comment, and the comments other objects show for it.
+        """
+        obj = self.objects[object_id]
+        if obj.props.get(key) == value:
+            # Not touched, so a no-op edit doesn't count as a change
+            return
+        self.unindex_object(obj)
+        if value is None:
+            obj.props.pop(key, None)
+        else:
+            obj[key] = value
+        self.index_object(obj)
+        self.touch(object_id)
+        if key in ('name', 'path') and obj.isa in COMMENTED_BY_PATH:
+            self.update_comment(obj)
+
+    def update_comment(self, obj):
+        """Recompute the comment of `obj` from its name or path.
+
+        Objects whose lines show that comment are marked dirty so the
+        incremental writer re-emits them: the parent group, and each build
+        file (whose own `X in Phase` comment changes too) with its phase.
+        """
+        comment = obj.props.get('name') or obj.props.get('path')
+        if not comment or comment == obj.comment:
+            return
+        obj.comment = comment
+        self.touch(obj.id)
+        parent_id = self.parents.get(obj.id)
+        if parent_id is not None:
+            self.touch(parent_id)
+        for build_file in self.build_files_for(obj.id):
+            phase = self.phase_of(build_file.id)
+            if phase is not None:
+                build_file.comment = f'{comment} in {phase.display_name}'
+                self.touch(phase.id)
+            self.touch(build_file.id)
+        for isa, key in SCALAR_REFERENCES.items():
+            for referrer in self.objects_of(isa):
+                if referrer.props.get(key) == obj.id:
+                    self.touch(referrer.id)
+
+    def transaction(self):
+        """Start a batch of edits that is applied and serialized in one pass."""
+        return Transaction(self)
+
+    def serialize(self, full=False):
+        """Render the project as project.pbxproj text.
+
+        By default only changed objects are re-emitted and everything else is
+        copied byte-for-byte from the parsed text; `full=True` re-renders the
+        whole file in Xcode's layout.
+        """
+        if full:
+            return serialize(self)
+        data, _ = serialize_incremental(self)
+        return str(data, 'utf-8')
+
+    def save(self, path=None):
+        """Write pending changes, re-emitting only the dirty objects.
+
+        Returns True when the file was written, False when nothing changed.
+        """
+        path = Path(path) if path else self.path
+        if not self.modified:
+            return False
+        data, spans = serialize_incremental(self)
+        if path:
+            write_file(path, data)
+        self.mark_clean(data, spans)
+        if path and path == self.path:
+            cache.store(self)
+        return True
+
+    def mark_clean(self, buffer, spans):
+        """Adopt `buffer` as the new baseline after it has been written."""
+        self.buffer = buffer
+        self.spans = spans
+        self.source_isa = {object_id: obj.isa for object_id, obj in self.objects.items()}
+        self.dirty = set()
+        self.removed = set()
@@ -0,0 +1,151 @@
+"""
+snapshot.py
+In-memory snapshot of the files under a project directory.
+
+Checking every file reference with Path.exists() costs one stat call per
+reference and per candidate location. A snapshot walks the tree once with
+os.scandir (each top-level folder in its own thread; scandir releases the
+GIL while it waits on the filesystem) and answers every later existence
+check from a set. Symlinked folders are followed, as Xcode resolves
+references through them too; one that links back to a folder above it
+is listed but not entered, so loops end.
+
+    files = snapshot(PROJECT_DIR)
+    files.exists('Views/HomeView.swift')
+"""
+
+import os
+from functools import lru_cache
+from pathlib import Path
+
+# Directories that never hold project sources and can be large.
+SKIP_DIRS = frozenset({
+    '.git',
+    '.pbxbackups',
+    '.pbxcache',
+    '.build',
+    'DerivedData',
+    'build',
+})
+
+
+def identity(entry):
+    """(st_dev, st_ino) of the folder `entry` is or links to, None if unreadable."""
+    try:
+        stat = entry.stat()
+    except OSError:
+        return None
+    return stat.st_dev, stat.st_ino
+
+
+def walk(root, top, skip_dirs, above):
+    """Collect (files, dirs) under `top`, as paths relative to `root`.
+
+    `above` holds the identities of `top` and the folders above it; a
+    symlinked folder that leads back to one of them is listed but not
+    entered.
+    """
+    files = []
+    dirs = [top]
+    pending = [(top, above)]
+    while pending:
+        rel_dir, above = pending.pop()
+        try:
+            with os.scandir(os.path.join(root, rel_dir)) as entries:
+                for entry in entries:
+                    rel_path = f'{rel_dir}/{entry.name}'
+                    if entry.is_dir():
+                        dirs.append(rel_path)
+                        folder = identity(entry)
+                        if entry.name not in skip_dirs and folder is not None and folder not in above:
+                            pending.append((rel_path, above | {folder}))
+                    else:
+                        files.append(rel_path)
+        except OSError:
+            continue
+    return files, dirs
+
+
+class FileSnapshot:
+    """Every file and directory under `root`, keyed by relative POSIX path."""
+
+    def __init__(self, root, skip_dirs=SKIP_DIRS, workers=None):
+        self.root = Path(root).resolve()
+        self.files = set()
+        self.dirs = {'.'}
+        self.scan(skip_dirs, workers)
+
+    def scan(self, skip_dirs, workers):
+        root = str(self.root)
+        top_dirs = []
+        try:
+            stat = os.stat(root)
+            above = frozenset({(stat.st_dev, stat.st_ino)})
+            with os.scandir(root) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        self.dirs.add(entry.name)
+                        folder = identity(entry)
+                        if entry.name not in skip_dirs and folder is not None and folder not in above:
+                            top_dirs.append((entry.name, above | {folder}))
+                    else:
+                        self.files.add(entry.name)
+        except FileNotFoundError:
+            return
+        # Imported here: concurrent.futures is slow to import and most
+        # callers of this module only need it once the walk starts
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for files, dirs in pool.map(lambda top: walk(root, top[0], skip_dirs, top[1]), top_dirs):
+                self.files.update(files)
+                self.dirs.update(dirs)
+
+    def key(self, path):
+        """Snapshot key for `path` (absolute or relative to the root).
+
+        Returns None when the path lies outside the root.
+        """
+        relative = os.path.relpath(os.path.join(self.root, path), self.root)
+        if relative == '..' or relative.startswith('..' + os.sep):
+            return None
+        return relative.replace(os.sep, '/')
+
+    def exists(self, path):
+        key = self.key(path)
+        if key is None:
+            return os.path.exists(os.path.join(self.root, path))
+        return key in self.files or key in self.dirs
+
+    def is_dir(self, path):
+        key = self.key(path)
+        if key is None:
+            return os.path.isdir(os.path.join(self.root, path))
+        return key in self.dirs
+
+    def files_under(self, directory, suffix=''):
+        """Relative paths of the files below `directory` ending in `suffix`."""
+        prefix = self.key(directory)
+        prefix = '' if prefix == '.' else prefix + '/'
+        return sorted(
+            path for path in self.files
+            if path.startswith(prefix) and path.endswith(suffix)
+        )
+
+    def __contains__(self, path):
+        return self.exists(path)
+
+    def __len__(self):
+        return len(self.files) + len(self.dirs)
+
+
+@lru_cache(maxsize=None)
+def cached_snapshot(root):
+    return FileSnapshot(root)
+
+
+def snapshot(root, refresh=False):
+    """Shared snapshot of `root`; taken once per process unless `refresh`."""
+    root = str(Path(root).resolve())
+    if refresh:
+        cached_snapshot.cache_clear()
+    return cached_snapshot(root)
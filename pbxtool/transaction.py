@@ -0,0 +1,231 @@
+"""
+transaction.py
+Batched edits against an XcodeProject.
+
+A Transaction queues any number of adds, removes, moves and value changes.
+Nothing touches the project until commit(), which applies the queue to the
+object graph and then serializes the file exactly once, so adding N files
+costs one rewrite instead of N full-text splices.
+
+New objects get deterministic IDs (see ids.py), so queueing a file or group
+that an earlier run already added is a no-op and scripts can simply be run
+again.
+
+    with project.transaction() as txn:
+        for path in files:
+            txn.add_file(path, group_id, phase_id)
+"""
+
+from .ids import IDAllocator
+from .objects import PBXGroup, make_object
+
+
+class Transaction:
+    """Queue of edits applied to a project in one pass."""
+
+    def __init__(self, project):
+        self.project = project
+        self.operations = []
+        self.ids = IDAllocator(project)
+        self.queued = set()
+
+    def __len__(self):
+        return len(self.operations)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None and self.operations:
+            self.commit()
+        return False
+
+    def exists(self, object_id):
+        """True when `object_id` is in the project or queued for adding."""
+        return object_id in self.project or object_id in self.queued
+
+    # Queueing
+
+    def add_file(self, path, group_id, phase_id=None, file_type='sourcecode.swift',
+                 name=None, source_tree='<group>'):
+        """Queue a new file reference in `group_id`, optionally built by `phase_id`.
+
+        Returns (file_ref_id, build_file_id); build_file_id is None when no
+        phase is given. Nothing is queued for parts that already exist.
+        """
+        file_ref_id = self.ids.allocate('PBXFileReference', group_id, path)
+        if self.exists(file_ref_id):
+            build_file_id = self.add_to_phase(file_ref_id, phase_id) if phase_id else None
+            return file_ref_id, build_file_id
+        build_file_id = self.ids.allocate('PBXBuildFile', phase_id, file_ref_id) if phase_id else None
+        self.queued.update(filter(None, (file_ref_id, build_file_id)))
+        self.operations.append(('add_file', {
+            'file_ref_id': file_ref_id,
+            'build_file_id': build_file_id,
+            'path': path,
+            'group_id': group_id,
+            'phase_id': phase_id,
+            'file_type': file_type,
+            'name': name,
+            'source_tree': source_tree,
+        }))
+        return file_ref_id, build_file_id
+
+    def add_to_phase(self, file_ref_id, phase_id):
+        """Queue a build file for an existing (or queued) file reference."""
+        build_file_id = self.ids.allocate('PBXBuildFile', phase_id, file_ref_id)
+        if self.exists(build_file_id):
+            return build_file_id
+        self.queued.add(build_file_id)
+        self.operations.append(('add_to_phase', {
+            'file_ref_id': file_ref_id,
+            'build_file_id': build_file_id,
+            'phase_id': phase_id,
+        }))
+        return build_file_id
+
+    def add_group(self, parent_id, path=None, name=None, source_tree='<group>'):
+        """Queue a new group under `parent_id` and return its ID."""
+        group_id = self.ids.allocate('PBXGroup', parent_id, path or name)
+        if self.exists(group_id):
+            return group_id
+        self.queued.add(group_id)
+        self.operations.append(('add_group', {
+            'group_id': group_id,
+            'parent_id': parent_id,
+            'path': path,
+            'name': name,
+            'source_tree': source_tree,
+        }))
+        return group_id
+
+    def remove(self, object_id):
+        """Queue removal of an object, its build files and (for groups) its children.
+
+        Reference proxies standing for a removed item proxy go with it.
+        """
+        self.operations.append(('remove', {'object_id': object_id}))
+
+    def remove_many(self, object_ids, prune_empty_groups=False):
+        """Queue removal of a set of objects, applied in one pass.
+
+        With `prune_empty_groups`, groups left without children by the
+        removal are removed too, up to (not including) mainGroup.
+        """
+        self.operations.append(('remove_many', {
+            'object_ids': list(object_ids),
+            'prune_empty_groups': prune_empty_groups,
+        }))
+
+    def move(self, object_id, group_id):
+        """Queue moving a file or group into another group."""
+        self.operations.append(('move', {'object_id': object_id, 'group_id': group_id}))
+
+    def set_value(self, object_id, key, value):
+        """Queue setting (or, with value None, deleting) one key of an object."""
+        self.operations.append(('set_value', {'object_id': object_id, 'key': key, 'value': value}))
+
+    # Applying
+
+    def apply(self):
+        """Apply every queued operation to the object graph, in order."""
+        for kind, args in self.operations:
+            getattr(self, f'apply_{kind}')(**args)
+        applied = len(self.operations)
+        self.operations = []
+        self.queued = set()
+        return applied
+
+    def commit(self, write=True):
+        """Apply the queue, serialize once and (optionally) write the file.
+
+        Only objects touched by the queued operations are re-emitted; the
+        file is left alone when the operations turned out to be no-ops.
+        Returns the new project text.
+        """
+        self.apply()
+        project = self.project
+        if write and project.path:
+            project.save()
+            return project.text
+        return project.serialize()
+
+    def apply_add_file(self, file_ref_id, build_file_id, path, group_id, phase_id,
+                       file_type, name, source_tree):
+        project = self.project
+        props = {'isa': 'PBXFileReference', 'lastKnownFileType': file_type}
+        if name:
+            props['name'] = name
+        props['path'] = path
+        props['sourceTree'] = source_tree
+        project.add_object(make_object(file_ref_id, props, name or path))
+        if group_id:
+            project.add_child(group_id, file_ref_id)
+        if phase_id:
+            self.apply_add_to_phase(file_ref_id, build_file_id, phase_id)
+
+    def apply_add_to_phase(self, file_ref_id, build_file_id, phase_id):
+        project = self.project
+        file_ref = project[file_ref_id]
+        phase = project[phase_id]
+        props = {'isa': 'PBXBuildFile', 'fileRef': file_ref_id}
+        comment = f'{file_ref.comment or file_ref.display_name} in {phase.display_name}'
+        project.add_object(make_object(build_file_id, props, comment))
+        project.add_to_phase(phase_id, build_file_id)
+
+    def apply_add_group(self, group_id, parent_id, path, name, source_tree):
+        project = self.project
+        props = {'isa': 'PBXGroup', 'children': []}
+        if name:
+            props['name'] = name
+        if path:
+            props['path'] = path
+        props['sourceTree'] = source_tree
+        project.add_object(make_object(group_id, props, name or path))
+        project.add_child(parent_id, group_id)
+
+    def apply_remove(self, object_id):
+        self.apply_remove_many([object_id], False)
+
+    def apply_remove_many(self, object_ids, prune_empty_groups):
+        project = self.project
+        # A reference proxy can't exist without the item proxy it stands for
+        proxies = {proxy.get('remoteRef'): proxy.id for proxy in project.objects_of('PBXReferenceProxy')}
+        doomed = {}
+        pending = list(reversed(object_ids))
+        while pending:
+            object_id = pending.pop()
+            obj = project.get(object_id)
+            if obj is None or object_id in doomed:
+                continue
+            doomed[object_id] = None
+            if isinstance(obj, PBXGroup):
+                pending.extend(obj.children)
+            pending.extend(build_file.id for build_file in project.build_files_for(object_id))
+            if object_id in proxies:
+                pending.append(proxies[object_id])
+
+        if prune_empty_groups:
+            root = project.root_object
+            keep = {root.get('mainGroup'), root.get('productRefGroup')} if root else set()
+            candidates = {project.parents.get(object_id) for object_id in doomed}
+            while candidates:
+                group_id = candidates.pop()
+                group = project.get(group_id)
+                if group is None or group_id in doomed or group_id in keep or not isinstance(group, PBXGroup):
+                    continue
+                if group.children and all(child in doomed for child in group.children):
+                    doomed[group_id] = None
+                    candidates.add(project.parents.get(group_id))
+
+        project.remove_objects(doomed)
+
+    def apply_move(self, object_id, group_id):
+        project = self.project
+        parent = project.parent_of(object_id)
+        if parent is not None:
+            project.remove_child(parent.id, object_id)
+        project.add_child(group_id, object_id)
+
+    def apply_set_value(self, object_id, key, value):
+        self.project.set_value(object_id, key, value)
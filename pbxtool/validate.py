@@ -0,0 +1,225 @@
+"""
+validate.py
+Referential integrity check of a parsed project.
+
+    python3 -m pbxtool validate
+    python3 -m pbxtool validate -p Pods/Pods.xcodeproj --json
+
+Every object is visited once. For its isa, REFERENCES says which keys hold
+object IDs and which isas they may point at, and REQUIRED which keys it must
+have. One pass therefore finds:
+
+    dangling-reference    an ID (fileRef, children, buildPhases, remoteRef,
+                          ...) with no object behind it
+    wrong-isa             an ID pointing at the wrong kind of object
+    missing-key           a key the isa can't do without
+    duplicate-entry       the same ID twice in one list
+    multiple-owners       a child, build file, phase or configuration listed
+                          by two owners
+    duplicate-build-file  one file built twice by the same phase
+    unreferenced          an object nothing points at (e.g. a build file
+                          left behind by a text-level removal)
+
+Findings are plain dicts (severity, code, object, isa, key, value, message)
+yielded as they are found, so they can be printed or dumped as JSON.
+"""
+
+from .project import GROUP_ISAS, TARGET_ISAS
+
+PHASE_ISAS = (
+    'PBXSourcesBuildPhase',
+    'PBXResourcesBuildPhase',
+    'PBXFrameworksBuildPhase',
+    'PBXHeadersBuildPhase',
+    'PBXCopyFilesBuildPhase',
+    'PBXShellScriptBuildPhase',
+    'PBXRezBuildPhase',
+)
+FILE_ISAS = ('PBXFileReference', 'PBXReferenceProxy', 'PBXVariantGroup', 'XCVersionGroup')
+CHILD_ISAS = (*FILE_ISAS, *GROUP_ISAS, 'PBXFileSystemSynchronizedRootGroup')
+PACKAGE_ISAS = ('XCRemoteSwiftPackageReference', 'XCLocalSwiftPackageReference')
+PRODUCT_ISAS = ('XCSwiftPackageProductDependency',)
+EXCEPTION_ISAS = (
+    'PBXFileSystemSynchronizedBuildFileExceptionSet',
+    'PBXFileSystemSynchronizedGroupBuildPhaseMembershipExceptionSet',
+)
+
+TARGET_REFERENCES = {
+    'buildConfigurationList': ('XCConfigurationList',),
+    'buildPhases': PHASE_ISAS,
+    'buildRules': ('PBXBuildRule',),
+    'dependencies': ('PBXTargetDependency',),
+    'productReference': ('PBXFileReference', 'PBXReferenceProxy'),
+    'packageProductDependencies': PRODUCT_ISAS,
+    'fileSystemSynchronizedGroups': ('PBXFileSystemSynchronizedRootGroup',),
+}
+
+# isa: {key holding IDs: isas the referenced objects may have}
+REFERENCES = {
+    'PBXProject': {
+        'mainGroup': GROUP_ISAS,
+        'productRefGroup': GROUP_ISAS,
+        'buildConfigurationList': ('XCConfigurationList',),
+        'targets': TARGET_ISAS,
+        'packageReferences': PACKAGE_ISAS,
+    },
+    **{isa: {'children': CHILD_ISAS} for isa in GROUP_ISAS},
+    'XCVersionGroup': {'children': CHILD_ISAS, 'currentVersion': FILE_ISAS},
+    'PBXFileSystemSynchronizedRootGroup': {'exceptions': EXCEPTION_ISAS},
+    'PBXFileSystemSynchronizedBuildFileExceptionSet': {'target': TARGET_ISAS},
+    'PBXBuildFile': {'fileRef': FILE_ISAS, 'productRef': PRODUCT_ISAS},
+    **{isa: {'files': ('PBXBuildFile',)} for isa in PHASE_ISAS},
+    **{isa: TARGET_REFERENCES for isa in TARGET_ISAS},
+    'PBXTargetDependency': {
+        'target': TARGET_ISAS,
+        'targetProxy': ('PBXContainerItemProxy',),
+        'productRef': PRODUCT_ISAS,
+    },
+    'PBXContainerItemProxy': {'containerPortal': ('PBXProject', 'PBXFileReference')},
+    'PBXReferenceProxy': {'remoteRef': ('PBXContainerItemProxy',)},
+    'XCConfigurationList': {'buildConfigurations': ('XCBuildConfiguration',)},
+    'XCBuildConfiguration': {'baseConfigurationReference': ('PBXFileReference',)},
+    'XCSwiftPackageProductDependency': {'package': PACKAGE_ISAS},
+}
+
+# isa: keys it must have; a tuple means any one of them will do
+REQUIRED = {
+    'PBXProject': ('mainGroup', 'buildConfigurationList', 'targets'),
+    **{isa: ('children', 'sourceTree') for isa in GROUP_ISAS},
+    'PBXFileReference': ('sourceTree', ('path', 'name')),
+    'PBXReferenceProxy': ('remoteRef', 'sourceTree', 'path'),
+    'PBXBuildFile': (('fileRef', 'productRef'),),
+    **{isa: ('files',) for isa in PHASE_ISAS},
+    'PBXNativeTarget': ('name', 'buildConfigurationList', 'buildPhases', 'productType'),
+    'PBXAggregateTarget': ('name', 'buildConfigurationList', 'buildPhases'),
+    'PBXLegacyTarget': ('name', 'buildConfigurationList', 'buildPhases'),
+    'PBXTargetDependency': (('target', 'targetProxy', 'productRef'),),
+    'PBXContainerItemProxy': ('containerPortal', 'proxyType', 'remoteGlobalIDString'),
+    'XCConfigurationList': ('buildConfigurations',),
+    'XCBuildConfiguration': ('name', 'buildSettings'),
+    'XCSwiftPackageProductDependency': ('productName',),
+}
+
+# Lists whose members belong to exactly one owner.
+EXCLUSIVE_KEYS = frozenset({'children', 'files', 'buildPhases', 'buildConfigurations'})
+
+# Objects of these isas are only ever reached through a reference.
+REFERENCED_ISAS = frozenset(
+    isa for keys in REFERENCES.values() for isas in keys.values() for isa in isas
+)
+
+ERROR = 'error'
+WARNING = 'warning'
+
+
+def finding(severity, code, obj, key, value, message):
+    return {
+        'severity': severity,
+        'code': code,
+        'object': obj.id if obj is not None else None,
+        'isa': obj.isa if obj is not None else None,
+        'key': key,
+        'value': value,
+        'message': message,
+    }
+
+
+def describe(obj, object_id=None):
+    """`isa ID (name)` for messages."""
+    if obj is None:
+        return object_id
+    name = obj.display_name
+    return f"{obj.isa} {obj.id}" + (f" ({name})" if name and name != obj.isa else '')
+
+
+def validate(project):
+    """Yield every integrity finding of `project`, in one pass over its objects."""
+    objects = project.objects
+    root_id = project.root.get('rootObject')
+    if root_id not in objects:
+        yield finding(ERROR, 'dangling-reference', None, 'rootObject', root_id,
+                      f"rootObject {root_id} doesn't exist")
+    referenced = {root_id}
+    owners = {}
+    phase_files = []
+
+    for obj in objects.values():
+        isa = obj.isa
+        for required in REQUIRED.get(isa, ()):
+            alternatives = required if isinstance(required, tuple) else (required,)
+            if not any(key in obj.props for key in alternatives):
+                yield finding(ERROR, 'missing-key', obj, ' or '.join(alternatives), None,
+                              f"{describe(obj)} has no {' or '.join(alternatives)}")
+
+        for key, allowed in REFERENCES.get(isa, {}).items():
+            value = obj.get(key)
+            if value is None:
+                continue
+            listed = isinstance(value, list)
+            seen = set()
+            for target_id in value if listed else (value,):
+                if listed:
+                    if target_id in seen:
+                        yield finding(WARNING, 'duplicate-entry', obj, key, target_id,
+                                      f"{describe(obj)} lists {target_id} twice in {key}")
+                        continue
+                    seen.add(target_id)
+                target = objects.get(target_id) if isinstance(target_id, str) else None
+                if target is None:
+                    yield finding(ERROR, 'dangling-reference', obj, key, target_id,
+                                  f"{describe(obj)} {key} points at missing object {target_id}")
+                    continue
+                referenced.add(target_id)
+                if target.isa not in allowed:
+                    yield finding(ERROR, 'wrong-isa', obj, key, target_id,
+                                  f"{describe(obj)} {key} points at {describe(target)}, "
+                                  f"expected {' or '.join(allowed)}")
+                    continue
+                if key in EXCLUSIVE_KEYS:
+                    owner_id = owners.setdefault((key, target_id), obj.id)
+                    if owner_id != obj.id:
+                        yield finding(ERROR, 'multiple-owners', obj, key, target_id,
+                                      f"{describe(target)} is in {key} of both "
+                                      f"{describe(objects[owner_id])} and {describe(obj)}")
+            if key == 'files':
+                phase_files.append((obj, value))
+
+        if isa == 'PBXContainerItemProxy' and obj.get('containerPortal') == root_id:
+            # Proxies into this project name one of its own objects
+            remote_id = obj.get('remoteGlobalIDString')
+            if remote_id is not None and remote_id not in objects:
+                yield finding(ERROR, 'dangling-reference', obj, 'remoteGlobalIDString', remote_id,
+                              f"{describe(obj)} remoteGlobalIDString points at missing object {remote_id}")
+        elif isa == 'PBXProject':
+            target_attributes = obj.get('attributes', {}).get('TargetAttributes', {})
+            for target_id in target_attributes:
+                if target_id not in objects:
+                    yield finding(WARNING, 'dangling-reference', obj, 'attributes.TargetAttributes', target_id,
+                                  f"{describe(obj)} has TargetAttributes for missing target {target_id}")
+
+    for phase, build_file_ids in phase_files:
+        built = {}
+        for build_file_id in build_file_ids:
+            build_file = objects.get(build_file_id)
+            file_ref = build_file.get('fileRef') if build_file is not None else None
+            if file_ref is None:
+                continue
+            if file_ref in built and built[file_ref] != build_file_id:
+                yield finding(WARNING, 'duplicate-build-file', phase, 'files', build_file_id,
+                              f"{describe(phase)} builds {describe(objects.get(file_ref), file_ref)} "
+                              f"twice ({built[file_ref]} and {build_file_id})")
+            built.setdefault(file_ref, build_file_id)
+
+    for object_id, obj in objects.items():
+        if object_id not in referenced and obj.isa in REFERENCED_ISAS:
+            yield finding(WARNING, 'unreferenced', obj, None, None,
+                          f"Nothing points at {describe(obj)}")
+
+
+def summarize(findings):
+    """Counts of findings by severity and by code."""
+    summary = {ERROR: 0, WARNING: 0, 'codes': {}}
+    for item in findings:
+        summary[item['severity']] += 1
+        summary['codes'][item['code']] = summary['codes'].get(item['code'], 0) + 1
+    return summary
@@ -0,0 +1,232 @@
+"""
+watch.py
+Keep project.pbxproj in step with the source folders while you work.
+
+    python3 -m pbxtool watch
+    python3 -m pbxtool watch --dir Models --target Itinero --target TriplyWidgetExtensionExtension
+
+New files under the watched folders are added to the group for their folder
+and to the Sources phase of the app target (or of each --target); deleted
+files lose their references, and groups left empty by that go too.
+Events are debounced: the watcher waits until the folders have been quiet
+for --delay seconds, then compares a fresh snapshot with the previous one
+and applies every create, delete and rename in that burst as one
+transaction, so generating 50 files in Libraries/WishKit costs one backup
+and one rewrite of project.pbxproj. A rename is a delete plus a create.
+
+On Linux changes are reported by inotify (through libc, there's no stdlib
+binding). Elsewhere, or with --poll, the folders are rescanned every
+--interval seconds instead.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+
+from .checks import ORPHAN_DIRS
+from .edits import CommandError, commit, find_group, find_phases, queue_file, resolver_for
+from .filetypes import file_type_for
+from .snapshot import snapshot
+
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, 'O_CLOEXEC', 0o2000000)
+
+WATCH_MASK = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+
+EVENT = struct.Struct('iIII')  # wd, mask, cookie, len; then `len` bytes of name
+
+DEFAULT_DELAY = 0.5
+DEFAULT_INTERVAL = 1.0
+
+
+class Inotify:
+    """Recursive inotify watch over a set of folders.
+
+    Only reports that something changed; the watcher works out what from
+    a snapshot, so dropped or overflowed events can't leave it out of step.
+    """
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+        self.libc = libc
+        self.watches = {}
+
+    def add_tree(self, top):
+        for directory, subdirs, _ in os.walk(top):
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+            if wd >= 0:
+                self.watches[wd] = directory
+
+    def wait(self, timeout=None):
+        """Block up to `timeout` seconds; True if events arrived."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return False
+        self.read()
+        return True
+
+    def read(self):
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT.unpack_from(data, offset)
+            offset += EVENT.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if mask & IN_IGNORED:
+                self.watches.pop(wd, None)
+            elif mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO) and wd in self.watches:
+                # Watch new folders too; files created in them before the
+                # watch existed are picked up by the snapshot anyway
+                self.add_tree(os.path.join(self.watches[wd], os.fsdecode(name)))
+
+    def close(self):
+        os.close(self.fd)
+
+
+class Poller:
+    """Fallback for systems without inotify: rescan and compare."""
+
+    def __init__(self, scan, interval=DEFAULT_INTERVAL):
+        self.scan = scan
+        self.interval = interval
+        self.last = None
+
+    def add_tree(self, top):
+        pass
+
+    def wait(self, timeout=None):
+        time.sleep(self.interval if timeout is None else min(timeout, self.interval))
+        current = self.scan()
+        changed = self.last is not None and current != self.last
+        self.last = current
+        return changed
+
+    def close(self):
+        pass
+
+
+class Watcher:
+    """Apply file creates and deletes under `dirs` to the project in batches."""
+
+    def __init__(self, session, project_path, dirs=ORPHAN_DIRS, suffix='.swift', targets=None,
+                 phase='sources', file_type=None, delay=DEFAULT_DELAY, backup=True):
+        self.session = session
+        self.project_path = project_path
+        self.suffix = suffix
+        self.targets = targets
+        self.phase = phase
+        self.file_type = file_type
+        self.delay = delay
+        self.backup = backup
+        self.root = str(resolver_for(session.project(project_path)).source_root)
+        self.dirs = [name for name in dirs if os.path.isdir(os.path.join(self.root, name))]
+
+    def scan(self):
+        """Relative paths of the watched files currently on disk."""
+        files = snapshot(self.root, refresh=True)
+        return frozenset(
+            rel_path
+            for name in self.dirs
+            for rel_path in files.files_under(name, self.suffix)
+        )
+
+    def sync(self, created, deleted):
+        """Queue every change in the batch and write them in one commit."""
+        project = self.session.project(self.project_path)
+        resolver = resolver_for(project)
+        phases = find_phases(project, self.targets, self.phase)
+
+        transaction = project.transaction()
+        if deleted:
+            by_path = {}
+            for ref in project.file_references:
+                path = resolver.resolve(ref)
+                if path is not None:
+                    by_path.setdefault(path, []).append(ref.id)
+            doomed = []
+            for rel_path in sorted(deleted):
+                for ref_id in by_path.get(os.path.join(self.root, rel_path), []):
+                    print(f"   - {rel_path}")
+                    doomed.append(ref_id)
+            if doomed:
+                transaction.remove_many(doomed, prune_empty_groups=True)
+        for rel_path in sorted(created):
+            if resolver.is_referenced(rel_path):
+                continue
+            full_path = os.path.join(self.root, rel_path)
+            group = find_group(project, resolver, None, os.path.dirname(full_path))
+            group_dir = resolver.resolve(group)
+            if group_dir is None:
+                print(f"   ⚠️  {rel_path}: can't tell which folder group {group.display_name} maps to")
+                continue
+            print(f"   + {rel_path} → {group.display_name or 'main group'}")
+            queue_file(
+                transaction,
+                os.path.relpath(full_path, group_dir),
+                group.id,
+                phases,
+                self.file_type or file_type_for(rel_path),
+            )
+        return commit(self.session, transaction, 'pbxtool watch', backup=self.backup)
+
+    def run(self, backend):
+        for name in self.dirs:
+            backend.add_tree(os.path.join(self.root, name))
+        known = self.scan()
+        print(f"👀 Watching {', '.join(self.dirs)} for *{self.suffix} ({len(known)} file(s))")
+        print("   Press Ctrl+C to stop")
+        try:
+            while True:
+                if not backend.wait():
+                    continue
+                # Debounce: keep collecting until the burst is over
+                while backend.wait(self.delay):
+                    pass
+                current = self.scan()
+                created = current - known
+                deleted = known - current
+                if not created and not deleted:
+                    continue
+                print(f"🔄 {len(created)} new, {len(deleted)} deleted")
+                try:
+                    self.sync(created, deleted)
+                except CommandError as error:
+                    print(f"❌ {error}")
+                known = current
+        except KeyboardInterrupt:
+            print()
+            return 0
+        finally:
+            backend.close()
+
+
+def backend_for(watcher, poll=False, interval=DEFAULT_INTERVAL):
+    """inotify where the kernel has it, polling otherwise."""
+    if not poll and sys.platform.startswith('linux'):
+        try:
+            return Inotify()
+        except (OSError, AttributeError):
+            pass
+    return Poller(watcher.scan, interval)
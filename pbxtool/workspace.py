@@ -0,0 +1,112 @@
+"""
+workspace.py
+Check and fix every project of an Xcode workspace at once.
+
+    python3 -m pbxtool workspace                      # every .xcworkspace here
+    python3 -m pbxtool workspace Itinero.xcworkspace --fix
+    python3 -m pbxtool workspace --also Developer/SwiftUI/Triply/Triply.xcodeproj
+
+The member projects are read from the workspace's contents.xcworkspacedata
+(FileRef and nested Group locations). Each project is parsed, checked and
+optionally fixed in its own worker process, since parsing is CPU-bound and
+the projects are independent; the parent only collects the reports.
+"""
+
+import os
+from xml.etree import ElementTree
+
+from . import checks, load_project
+from .paths import PathResolver
+from .snapshot import snapshot
+
+
+def workspace_projects(workspace):
+    """Absolute paths of the .xcodeproj bundles a workspace lists, in order."""
+    workspace = os.path.abspath(workspace)
+    container = os.path.dirname(workspace)
+    tree = ElementTree.parse(os.path.join(workspace, 'contents.xcworkspacedata'))
+    projects = []
+
+    def visit(element, base):
+        for child in element:
+            kind, _, path = child.get('location', '').partition(':')
+            if kind == 'group':
+                location = os.path.join(base, path)
+            elif kind == 'container':
+                location = os.path.join(container, path)
+            elif kind == 'absolute':
+                location = path
+            elif kind == 'self':
+                # project.xcworkspace inside a .xcodeproj
+                location = container
+            else:
+                location = base
+            location = os.path.normpath(location)
+            if child.tag == 'Group':
+                visit(child, location)
+            elif child.tag == 'FileRef' and location.endswith('.xcodeproj'):
+                projects.append(location)
+
+    visit(tree.getroot(), container)
+    return projects
+
+
+def check_project(path, fix=False, backup=True):
+    """Check (and with `fix`, repair) one project; returns a picklable report.
+
+    Fixing strips duplicated group folders from file paths, then removes
+    the references to files that still don't exist (and the groups that
+    leaves empty), in one transaction.
+    """
+    report = {
+        'project': path,
+        'references': 0,
+        'missing': [],
+        'duplicates': [],
+        'orphans': [],
+        'fixed': 0,
+        'backup': None,
+        'error': None,
+    }
+    try:
+        project = load_project(path)
+        resolver = PathResolver(project)
+        files = snapshot(resolver.source_root)
+        missing, existing = checks.missing_files(project, resolver, files)
+        duplicates = checks.duplicate_paths(project, resolver, files)
+        report['references'] = len(missing) + len(existing)
+        # A reference that only looks missing because of a repeated folder
+        # gets its path fixed, not removed
+        repaired = {item['id'] for item in duplicates}
+        missing = [ref for ref in missing if ref.id not in repaired]
+        report['missing'] = [resolver.relative(ref) or ref.path for ref in missing]
+        report['duplicates'] = [{key: fix[key] for key in ('old', 'new', 'group')} for fix in duplicates]
+        report['orphans'] = checks.orphaned_files(project, resolver, files)
+        if fix and (missing or duplicates):
+            transaction = project.transaction()
+            for item in duplicates:
+                transaction.set_value(item['id'], 'path', item['new'])
+            if missing:
+                transaction.remove_many([ref.id for ref in missing], prune_empty_groups=True)
+            count = len(transaction)
+            # Applied before the backup, so edits that change nothing leave
+            # the file and the backup store alone
+            transaction.apply()
+            if project.modified:
+                if backup:
+                    from .backup import backup_project
+                    report['backup'] = backup_project(project.path, label='pbxtool workspace --fix')['id']
+                project.save()
+                report['fixed'] = count
+    except Exception as error:
+        report['error'] = f"{type(error).__name__}: {error}"
+    return report
+
+
+def process(paths, fix=False, backup=True, jobs=None):
+    """Run check_project over `paths` in a process pool; reports in input order."""
+    if len(paths) <= 1 or jobs == 1:
+        return [check_project(path, fix, backup) for path in paths]
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=jobs or min(len(paths), os.cpu_count() or 1)) as pool:
+        return list(pool.map(check_project, paths, [fix] * len(paths), [backup] * len(paths)))
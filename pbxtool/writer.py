@@ -0,0 +1,281 @@
+"""
+writer.py
+Serialize an XcodeProject back to project.pbxproj text in Xcode's own layout.
+
+Objects are grouped into `/* Begin <isa> section */` blocks sorted by isa and
+then by ID, keys are written with `isa` first and the rest sorted, and
+references to other objects carry the same `/* comment */` Xcode writes.
+
+serialize_incremental() is what the tools use when saving: it copies the
+original bytes of every untouched object verbatim from the project's buffer
+and only re-emits objects that were added or changed, so an unmodified
+project round-trips byte-for-byte and an edit produces the minimal diff.
+"""
+
+import re
+from bisect import bisect_right
+from collections import Counter, defaultdict
+
+HEADER = '// !$*UTF8*$!\n'
+
+# Objects Xcode writes on a single line.
+INLINE_ISAS = frozenset({
+    'PBXBuildFile',
+    'PBXFileReference',
+    'PBXFileSystemSynchronizedRootGroup',
+})
+
+# Keys whose ID values Xcode leaves without a comment.
+UNCOMMENTED_KEYS = frozenset({
+    'remoteGlobalIDString',
+    'TestTargetID',
+})
+
+# Dictionaries whose contents (keys and values) are never commented.
+UNCOMMENTED_DICTS = frozenset({
+    'attributes',
+})
+
+SAFE_STRING = re.compile(r'[A-Za-z0-9_$./:]+')
+
+ESCAPES = {
+    '\\': '\\\\',
+    '"': '\\"',
+    '\n': '\\n',
+    '\t': '\\t',
+    '\r': '\\r',
+}
+
+
+def quote(value):
+    """Return `value` as Xcode writes it: bare when safe, quoted otherwise."""
+    if SAFE_STRING.fullmatch(value) and '//' not in value:
+        return value
+    return '"' + ''.join(ESCAPES.get(ch, ch) for ch in value) + '"'
+
+
+def sort_keys(props):
+    """Xcode's key order: `isa` first, then the remaining keys sorted."""
+    keys = sorted(key for key in props if key != 'isa')
+    if 'isa' in props:
+        keys.insert(0, 'isa')
+    return keys
+
+
+class Writer:
+    """Formats values of one project, looking up comments for referenced IDs."""
+
+    def __init__(self, project):
+        self.project = project
+        self.objects = project.objects
+
+    def reference(self, value, commented=True):
+        """Quote `value` and, when it is an object ID, append its comment."""
+        text = quote(value)
+        if commented:
+            obj = self.objects.get(value)
+            if obj is not None and obj.comment:
+                text += f' /* {obj.comment} */'
+        return text
+
+    def value(self, value, indent, inline, commented=True):
+        if isinstance(value, dict):
+            return self.dict(value, indent, inline, commented)
+        if isinstance(value, list):
+            return self.list(value, indent, inline, commented)
+        return self.reference(value, commented)
+
+    def dict(self, props, indent, inline, commented=True):
+        if inline:
+            if not props:
+                return '{}'
+            body = ''.join(
+                f'{self.reference(key, False)} = {self.entry(key, props[key], indent, True, commented)}; '
+                for key in sort_keys(props)
+            )
+            return '{' + body + '}'
+        pad = '\t' * (indent + 1)
+        lines = [
+            f'{pad}{self.reference(key, commented)} = {self.entry(key, props[key], indent + 1, False, commented)};\n'
+            for key in sort_keys(props)
+        ]
+        return '{\n' + ''.join(lines) + '\t' * indent + '}'
+
+    def list(self, items, indent, inline, commented=True):
+        if inline:
+            if not items:
+                return '()'
+            return '(' + ''.join(f'{self.value(item, indent, True, commented)}, ' for item in items) + ')'
+        pad = '\t' * (indent + 1)
+        lines = [f'{pad}{self.value(item, indent + 1, False, commented)},\n' for item in items]
+        return '(\n' + ''.join(lines) + '\t' * indent + ')'
+
+    def entry(self, key, value, indent, inline, commented):
+        commented = commented and key not in UNCOMMENTED_KEYS and key not in UNCOMMENTED_DICTS
+        return self.value(value, indent, inline, commented)
+
+    def object(self, obj):
+        """One `ID /* comment */ = {...};` line (or block), newline included."""
+        key = self.reference(obj.id)
+        inline = obj.isa in INLINE_ISAS
+        return f'\t\t{key} = {self.dict(obj.props, 2, inline)};\n'
+
+    def sections(self):
+        """The body of the `objects` dictionary, grouped into isa sections."""
+        by_isa = {}
+        for obj in self.objects.values():
+            by_isa.setdefault(obj.isa, []).append(obj)
+        blocks = []
+        for isa in sorted(by_isa):
+            body = ''.join(self.object(obj) for obj in sorted(by_isa[isa], key=lambda o: o.id))
+            blocks.append(f'\n/* Begin {isa} section */\n{body}/* End {isa} section */\n')
+        return ''.join(blocks)
+
+    def document(self):
+        root = self.project.root
+        lines = [HEADER, '{\n']
+        for key in sorted(root):
+            if key == 'objects':
+                lines.append('\tobjects = {\n' + self.sections() + '\t};\n')
+            else:
+                lines.append(f'\t{self.reference(key, False)} = {self.value(root[key], 1, False)};\n')
+        lines.append('}\n')
+        return ''.join(lines)
+
+
+def serialize(project):
+    """Render the whole project as project.pbxproj text."""
+    return Writer(project).document()
+
+
+SECTION_PATTERN = re.compile(rb'^/\* Begin (\w+) section \*/\n', re.MULTILINE)
+
+
+def line_bounds(buffer, start, end):
+    """Expand [start, end) to whole lines, trailing newline included."""
+    line_start = buffer.rfind(b'\n', 0, start) + 1
+    line_end = buffer.find(b'\n', end)
+    return line_start, len(buffer) if line_end < 0 else line_end + 1
+
+
+def marker(kind, isa):
+    return f'/* {kind} {isa} section */'.encode('utf-8')
+
+
+def serialize_incremental(project):
+    """Render the project, re-emitting only dirty objects.
+
+    Returns (data, spans): the new file as UTF-8 bytes, and every object ID
+    mapped to its location in them, in the same form the parser produces.
+    """
+    buffer = project.buffer
+    spans = project.spans
+    if not project.modified:
+        return bytes(buffer), spans
+
+    writer = Writer(project)
+    objects = project.objects
+    source_isa = project.source_isa
+    edits = []
+
+    def edit(start, end, replacement='', object_id=None):
+        edits.append((start, end, len(edits), replacement.encode('utf-8'), object_id))
+
+    # Sections whose every original object is gone and which get nothing new
+    # are dropped as a whole, Begin/End markers included.
+    survivors = Counter(
+        source_isa[object_id] for object_id in spans
+        if object_id not in project.removed
+    )
+    inserts = defaultdict(list)
+    for object_id in project.dirty:
+        obj = objects[object_id]
+        if object_id not in spans or source_isa.get(object_id) != obj.isa:
+            inserts[obj.isa].append(obj)
+            if object_id in spans:
+                survivors[source_isa[object_id]] -= 1
+    dropped = set()
+    for object_id in project.removed:
+        isa = source_isa[object_id]
+        if survivors[isa] <= 0 and not inserts.get(isa) and isa not in dropped:
+            dropped.add(isa)
+            begin = buffer.find(marker('Begin', isa))
+            _, end = line_bounds(buffer, begin, buffer.find(marker('End', isa), begin))
+            if buffer[end:end + 1] == b'\n':
+                end += 1
+            elif buffer[begin - 2:begin] == b'\n\n':
+                begin -= 1
+            edit(begin, end)
+
+    for object_id in project.removed:
+        if source_isa[object_id] not in dropped:
+            edit(*line_bounds(buffer, *spans[object_id][:2]))
+
+    for object_id in project.dirty:
+        obj = objects[object_id]
+        if object_id in spans and source_isa.get(object_id) == obj.isa:
+            edit(*line_bounds(buffer, *spans[object_id][:2]), writer.object(obj), object_id)
+        elif object_id in spans:
+            edit(*line_bounds(buffer, *spans[object_id][:2]))
+
+    sections = None
+    for isa, new_objects in inserts.items():
+        new_objects.sort(key=lambda o: o.id)
+        end_marker = buffer.find(marker('End', isa))
+        if end_marker >= 0:
+            members = sorted(
+                (object_id, line_bounds(buffer, *spans[object_id][:2])[0])
+                for object_id in project.by_isa.get(isa, ())
+                if object_id in spans and source_isa.get(object_id) == isa
+            )
+            member_ids = [object_id for object_id, _ in members]
+            for obj in new_objects:
+                index = bisect_right(member_ids, obj.id)
+                position = members[index][1] if index < len(members) else end_marker
+                edit(position, position, writer.object(obj), obj.id)
+            continue
+        if sections is None:
+            sections = [(m.group(1).decode('ascii'), m.start()) for m in SECTION_PATTERN.finditer(buffer)]
+        following = [start for name, start in sections if name > isa]
+        if following:
+            position = following[0]
+            header, footer = f'/* Begin {isa} section */\n', f'/* End {isa} section */\n\n'
+        else:
+            last_end = buffer.rfind(b'/* End ')
+            if last_end >= 0:
+                position = line_bounds(buffer, last_end, last_end)[1]
+            else:
+                position = buffer.find(b'objects = {\n') + len(b'objects = {\n')
+            header, footer = f'\n/* Begin {isa} section */\n', f'/* End {isa} section */\n'
+        edit(position, position, header)
+        for obj in new_objects:
+            edit(position, position, writer.object(obj), obj.id)
+        edit(position, position, footer)
+
+    edits.sort()
+    view = memoryview(buffer)
+    pieces = []
+    new_spans = {}
+    cursor = 0
+    out = 0
+    starts = []
+    shifts = []
+    for start, end, _, replacement, object_id in edits:
+        pieces.append(view[cursor:start])
+        out += start - cursor
+        if object_id is not None:
+            new_spans[object_id] = (out + 2, out + len(replacement) - 1, objects[object_id].comment)
+        pieces.append(replacement)
+        out += len(replacement)
+        cursor = max(cursor, end)
+        starts.append(end)
+        shifts.append(out - cursor)
+    pieces.append(view[cursor:])
+
+    for object_id, (start, end, _) in spans.items():
+        if object_id in new_spans or object_id not in objects:
+            continue
+        index = bisect_right(starts, start) - 1
+        shift = shifts[index] if index >= 0 else 0
+        new_spans[object_id] = (start + shift, end + shift, objects[object_id].comment)
+    return b''.join(pieces), new_spans
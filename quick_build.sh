@@ -6,6 +6,7 @@ set -e
 
 PROJECT_NAME="Triply"
 SCHEME="Triply"
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 
 echo "🔨 Building $PROJECT_NAME..."
 
@@ -20,17 +21,24 @@ if [ "$1" == "clean" ]; then
     xcodebuild clean -project "$PROJECT_NAME.xcodeproj" -scheme "$SCHEME" 2>/dev/null || true
 fi
 
-# Build
+# Build; the summary of the log exits with 1 when it has errors, which is
+# reported after it instead of stopping the script under set -e
 echo "📦 Building..."
+status=0
 xcodebuild \
     -project "$PROJECT_NAME.xcodeproj" \
     -scheme "$SCHEME" \
     -destination 'generic/platform=iOS Simulator' \
     build \
-    2>&1 | grep -E "(error:|warning:|BUILD SUCCEEDED|BUILD FAILED)" | head -10
+    2>&1 | tee build_output.log \
+    | PYTHONPATH="$SCRIPT_DIR${PYTHONPATH:+:$PYTHONPATH}" python3 -m pbxtool log - || status=$?
 
 echo ""
-echo "✅ Build complete!"
+echo "✅ Build complete! (full log: build_output.log, query it with: python3 -m pbxtool log --file PATH)"
+if [ $status -ne 0 ]; then
+    echo "❌ The build log has errors (see above)"
+fi
+exit $status
 
 
 